@@ -5,8 +5,29 @@
 # References: Coursera: Mathematics for Machine learning.
 
 
+import os
+import tempfile
+from collections import namedtuple
+
 import numpy as np
 import numpy.linalg as la
+import scipy.linalg as sla
+import scipy.sparse as sps
+from scipy.sparse.csgraph import maximum_bipartite_matching, structural_rank
+
+from IdentifyingSpecialMatrices import SpecialMatrix
+
+# Result of gsBasisRankRevealing.
+#   basis             : orthonormal basis of column space as columns, shape (n, rank), None
+#                       for sparse matrix of large structural rank (basis would be dense).
+#   rank              : numerical rank.
+#   conditionEstimate : |R[0, 0]| / |R[rank - 1, rank - 1]| of column pivoted QR, estimate of
+#                       largest / smallest kept singular value.
+#   permutation       : column order of pivoting, columns permutation[:rank] of input are
+#                       linearly independent.
+#   diagonal          : |R[j, j]| of pivoted QR, non increasing, estimates singular values.
+RankRevealingBasis = namedtuple('RankRevealingBasis',
+                                ['basis', 'rank', 'conditionEstimate', 'permutation', 'diagonal'])
 
 class GrahmSchmidtOrthonormal(object):
     
@@ -25,6 +46,10 @@ class GrahmSchmidtOrthonormal(object):
         """ create an all zero matrix of shape (4,4) """
         self.inputmatrix = np.zeros((4,4))
         self.zeroapprox = 1e-14 # That's 1×10⁻¹⁴ = 0.00000000000001
+        # sparse matrix gets dense sketch and basis only if structural rank + oversample is at
+        # most this fraction of its nonempty rows and sketch is at most sparseDenseBytes.
+        self.sparseDenseFraction = 0.125
+        self.sparseDenseBytes = 2**30
         return
     
     # Following function will perform the Gram-Schmidt procedure for
@@ -129,7 +154,433 @@ class GrahmSchmidtOrthonormal(object):
         # Finally, we return the result:
         return orthoNormalMatrix, dimensions
     
+    # gsBasis works on one matrix and runs a python double loop over its columns.
+    # When we have to orthonormalise tens of thousands of small bases (for example
+    # features of a batch), python loop overhead is most of the time.
+    # gsBasisBatch takes stack of matrices of shape (B, n, m), i.e., B matrices
+    # each with m vectors of size n as columns, and returns orthonormal bases of
+    # same shape and rank of every matrix. Same as gsBasis, vector which is linearly
+    # dependent on previous vectors becomes zero column.
+    # Two methods are supported
+    #   'mgs'         : Modified Gram-Schmidt vectorised over the batch. Loop runs
+    #                   over columns only (m steps), every step works on all B
+    #                   matrices at once. After column j is normalised, its overlap
+    #                   is subtracted from all later columns at once.
+    #   'householder' : Householder QR of LAPACK (numpy.linalg.qr on stack, blocked
+    #                   Householder reflections), which keeps columns orthonormal
+    #                   to machine precision even for ill-conditioned matrices, where
+    #                   Gram-Schmidt loses orthogonality. Signs are fixed so columns
+    #                   match Gram-Schmidt. Householder without pivoting can not
+    #                   give zero columns for dependent vectors, so rank deficient
+    #                   matrices (and matrices with more vectors than size, m > n)
+    #                   are done by Modified Gram-Schmidt twice (second pass makes
+    #                   result orthonormal again).
+    def gsBasisBatch(self, inputMatrices, method='mgs') :
+        stack = np.asarray(inputMatrices, dtype=np.float64)
+        single = stack.ndim == 2
+        if single :
+            stack = stack[np.newaxis]
+        if stack.ndim != 3 :
+            raise ValueError('inputMatrices must have shape (B, n, m), got %s' % (stack.shape,))
+        if method == 'mgs' :
+            orthoNormalMatrices, ranks = self.__mgsBatch(stack, passes=1)
+        elif method == 'householder' :
+            orthoNormalMatrices, ranks = self.__householderBatch(stack)
+        else :
+            raise ValueError("method must be 'mgs' or 'householder', got %r" % (method,))
+        
+        if single :
+            return orthoNormalMatrices[0], int(ranks[0])
+        return orthoNormalMatrices, ranks
+    
+    # gsBasis decides that a vector is dependent when what is left of it after subtracting
+    # overlaps has norm below fixed zeroapprox (1e-14). That is wrong for scaled data
+    # (vectors of length 1e-15 are all "dependent", dependent vectors of length 1e3 are
+    # not, since rounding error is about 1e-16 * 1e3) and for ill-conditioned data, where
+    # Gram-Schmidt loses orthogonality. Full SVD gives right rank but is slow for tall matrices.
+    # gsBasisRankRevealing uses column pivoted QR, A P = Q R. At every step pivoting picks
+    # the column with most left after subtracting previous ones, so |R[j, j]| is non
+    # increasing and drops where rank ends. Rank is number of |R[j, j]| above
+    # rtol * |R[0, 0]| (relative tolerance, default max(n, m) * machine epsilon like
+    # numpy.linalg.matrix_rank), so it does not depend on scale of the matrix.
+    # Pivoted QR of LAPACK (geqp3) is slow for tall matrices (half of its work is matrix
+    # vector products), so tall matrix (n >= m) is first reduced by blocked Householder
+    # QR without pivoting, A = Q0 R0, and pivoted QR is done on small R0 (m x m), which
+    # has same singular values as A:  A P = Q0 (R0 P) = (Q0 Q1) R.
+    # randomized=True uses randomized range finder (Halko, Martinsson, Tropp) for tall
+    # matrices of low rank: Y = A G with Gaussian G of l columns (l = rank + oversample)
+    # has same column space as A with high probability, Q0 = orth(Y) and pivoted QR is
+    # done on small Q0^T A (l x m). Cost is O(n m l) instead of O(n m^2). powerIterations
+    # (1 or 2) multiply by A A^T again, needed when singular values decay slowly. If targetRank
+    # is not given, l is doubled until rank found is below l - oversample, matrix of rank
+    # above about m / 4 is done by deterministic mode.
+    # scipy.sparse matrix is not made dense. Its structural rank (largest number of
+    # nonzeros no two in same row or column, by bipartite matching) is an upper bound of
+    # rank found in about O(nnz).
+    #   1. Small structural rank (sketch at most self.sparseDenseFraction of nonempty rows
+    #      and self.sparseDenseBytes): one randomized sketch of structural rank + oversample
+    #      columns finds whole column space (with sparse matrix products only). Rows without
+    #      nonzeros are left out of sketch. Memory is dense sketch of (nonempty rows) x
+    #      (rank + oversample) and basis, not n x m.
+    #   2. Otherwise basis would be dense too (e.g. n x n for sparse identity), so only
+    #      rank is found and basis is None: rows and columns of the bipartite matching
+    #      give square submatrix B of size structural rank, which is factored by
+    #      SpecialMatrix.isSingularSparse (SuperLU after COLAMD ordering, memory is nonzeros
+    #      of L and U). rank(B) <= rank <= structural rank, so non singular B means rank is
+    #      structural rank and matched columns are independent. conditionEstimate is then
+    #      1-norm condition estimate of B, diagonal |U[k, k]| pivots of LU (largest first).
+    #      rtol is then threshold of pivot relative to |B| for isSingularSparse (its default
+    #      if None). Singular B falls back to 1. if sketch fits in self.sparseDenseBytes, else
+    #      ValueError is raised, rank below large structural rank needs sparse rank revealing
+    #      QR, which is not available here.
+    def gsBasisRankRevealing(self, inputmatrix, rtol=None, randomized=False, targetRank=None,
+                             oversample=10, powerIterations=0, seed=None) :
+        if sps.issparse(inputmatrix) :
+            return self.__sparseRankRevealing(inputmatrix, rtol, oversample, powerIterations, seed)
+        matrix = np.asarray(inputmatrix)
+        if matrix.ndim != 2 :
+            raise ValueError('inputmatrix must be 2 dimensional, got shape %s' % (matrix.shape,))
+        if matrix.dtype != np.float64 :
+            matrix = matrix.astype(np.float64)
+        size, numVectors = matrix.shape
+        if rtol is None :
+            rtol = max(size, numVectors) * np.finfo(np.float64).eps
+        
+        if randomized and size >= numVectors :
+            rng = np.random.default_rng(seed)
+            sketchSize = min(numVectors, (targetRank if targetRank else 32) + oversample)
+            while True :
+                sketch = self.__rangeFinder(matrix, sketchSize, powerIterations, rng)
+                result = self.__pivotedBasis(sketch, sketch.T @ matrix, rtol)
+                if targetRank or result.rank <= sketchSize - oversample :
+                    return result
+                if 8 * sketchSize > numVectors :
+                    # rank is above about m / 4, larger sketch saves little over deterministic QR.
+                    break
+                sketchSize = 2 * sketchSize
+        
+        if size >= numVectors and numVectors > 0 :
+            reduced, upper = sla.qr(matrix, mode='economic', check_finite=False)
+            return self.__pivotedBasis(reduced, upper, rtol)
+        return self.__pivotedBasis(None, matrix, rtol)
+    
+    def __sparseRankRevealing(self, inputmatrix, rtol, oversample, powerIterations, seed) :
+        """ gsBasisRankRevealing of scipy.sparse matrix. """
+        matrix = sps.csc_matrix(inputmatrix, dtype=np.float64)
+        matrix.eliminate_zeros()
+        size, numVectors = matrix.shape
+        structuralRank = structural_rank(matrix) if matrix.nnz else 0
+        if structuralRank == 0 :
+            return RankRevealingBasis(np.zeros((size, 0)), 0, np.inf, np.arange(numVectors), np.zeros(0))
+        # empty rows add nothing to column space, basis is zero there.
+        rows = np.unique(matrix.indices)
+        sketchSize = min(structuralRank + oversample, numVectors, len(rows))
+        denseFits = 8.0 * sketchSize * len(rows) <= self.sparseDenseBytes
+        if sketchSize > self.sparseDenseFraction * len(rows) or not denseFits :
+            result = self.__sparseMatchedRank(matrix, structuralRank, rtol)
+            if result is not None :
+                return result
+            if not denseFits :
+                raise ValueError('sparse %d x %d matrix has rank below its structural rank %d, '
+                                 'finding it needs a dense basis of %.1f GB'
+                                 % (size, numVectors, structuralRank, 8.0 * sketchSize * len(rows) / 2**30))
+        if rtol is None :
+            rtol = max(size, numVectors) * np.finfo(np.float64).eps
+        compact = matrix[rows]
+        sketch = self.__rangeFinder(compact, sketchSize, powerIterations, np.random.default_rng(seed))
+        result = self.__pivotedBasis(sketch, np.asarray((compact.T @ sketch).T), rtol)
+        basis = np.zeros((size, result.rank))
+        basis[rows] = result.basis
+        return result._replace(basis=basis)
+    
+    def __sparseMatchedRank(self, matrix, structuralRank, rtol) :
+        """ Rank of sparse matrix from LU of square submatrix of its bipartite matching, None if
+            submatrix is singular (rank may be below structural rank). """
+        # matched row of every column, -1 for unmatched column.
+        matchedRows = maximum_bipartite_matching(matrix.tocsr(), perm_type='row')
+        columns = np.flatnonzero(matchedRows >= 0)
+        square = matrix[:, columns][matchedRows[columns]]
+        specMat = SpecialMatrix()
+        if specMat.isSingularSparse(square, rtol) :
+            return None
+        unmatched = np.flatnonzero(matchedRows < 0)
+        diagonal = np.sort(np.abs(specMat.sparseFactorization.U.diagonal()))[::-1]
+        return RankRevealingBasis(None, structuralRank, specMat.conditionEstimate(),
+                                  np.concatenate([columns, unmatched]), diagonal)
+    
+    def __rangeFinder(self, matrix, sketchSize, powerIterations, rng) :
+        """ Orthonormal basis (n, sketchSize) of randomized sketch of column space of matrix. """
+        orthonormal = lambda vectors : sla.qr(vectors, mode='economic', check_finite=False)[0]
+        sketch = orthonormal(matrix @ rng.standard_normal((matrix.shape[1], sketchSize)))
+        for _ in range(powerIterations) :
+            # orthonormalise after every product, otherwise small singular values are lost.
+            sketch = orthonormal(matrix @ orthonormal(matrix.T @ sketch))
+        return sketch
+    
+    def __pivotedBasis(self, reduced, small, rtol) :
+        """ Column pivoted QR of small (A = reduced @ small, reduced orthonormal or None for identity). """
+        if small.size == 0 :
+            return RankRevealingBasis(np.zeros((small.shape[0] if reduced is None else reduced.shape[0], 0)),
+                                      0, 1.0, np.arange(small.shape[1]), np.zeros(0))
+        pivotedQ, pivotedR, permutation = sla.qr(small, mode='economic', pivoting=True, check_finite=False)
+        diagonal = np.abs(np.diagonal(pivotedR))
+        rank = int(np.sum(diagonal > rtol * diagonal[0])) if diagonal[0] > 0 else 0
+        basis = pivotedQ[:, :rank] if reduced is None else reduced @ pivotedQ[:, :rank]
+        conditionEstimate = diagonal[0] / diagonal[rank - 1] if rank else np.inf
+        return RankRevealingBasis(basis, rank, conditionEstimate, permutation, diagonal)
+    
+    # gsBasis and gsBasisRankRevealing need whole matrix in RAM (gsBasis even makes a
+    # copy). gsBasisOutOfCore orthonormalises tall matrix (n x m, n >= m) which is on disk,
+    # np.memmap or path of .npy file, and writes orthonormal Q to .npy file at outputPath
+    # (returned as np.memmap), with R (m x m) such that A = Q R.
+    # It is TSQR (tall skinny QR) with row blocks of blockRows rows:
+    #   1. every row block is factored in RAM, A_i = Q_i R_i, Q_i is written to output rows
+    #      of the block and R_i to stack of R factors (temporary .npy file),
+    #   2. stack of R factors (numBlocks * m x m) is itself factored, R_stack = Q' R, by
+    #      same procedure (in RAM when it fits in one block),
+    #   3. every output block is multiplied by its m x m part of Q', Q_i Q'_i.
+    # Columns of Q = diag(Q_1 .. Q_k) Q' are orthonormal, since Q' and every Q_i are.
+    # Signs are fixed so diagonal of R is non negative, like Gram-Schmidt.
+    # Peak RAM is a few row blocks (blockRows x m), default block is 64MB, it does not
+    # depend on n. Q of rank deficient matrix still has orthonormal columns, rank can be
+    # found from R, e.g. gsBasisRankRevealing(R), since R has same singular values as A.
+    def gsBasisOutOfCore(self, inputmatrix, outputPath, blockRows=None) :
+        if isinstance(inputmatrix, (str, os.PathLike)) :
+            inputmatrix = np.load(inputmatrix, mmap_mode='r')
+        if inputmatrix.ndim != 2 or inputmatrix.shape[0] < inputmatrix.shape[1] :
+            raise ValueError('inputmatrix must be tall 2 dimensional (n >= m), got shape %s'
+                             % (inputmatrix.shape,))
+        size, numVectors = inputmatrix.shape
+        if blockRows is None :
+            blockRows = (64 << 20) // (8 * max(numVectors, 1))
+        # block must have at least 2 m rows, otherwise stack of R factors is not smaller than input.
+        blockRows = max(int(blockRows), 2 * numVectors, 1)
+        
+        orthoNormalMatrix = np.lib.format.open_memmap(outputPath, mode='w+', dtype=np.float64,
+                                                      shape=(size, numVectors))
+        workDir = tempfile.mkdtemp(prefix='tsqr', dir=os.path.dirname(os.path.abspath(outputPath)))
+        try :
+            upper = self.__tsqr(inputmatrix, orthoNormalMatrix, blockRows, workDir, 0)
+        finally :
+            for name in os.listdir(workDir) :
+                os.remove(os.path.join(workDir, name))
+            os.rmdir(workDir)
+        orthoNormalMatrix.flush()
+        return orthoNormalMatrix, upper
+    
+    def __tsqr(self, matrix, output, blockRows, workDir, level) :
+        """ Writes Q of matrix (on disk) to output, returns R with non negative diagonal. """
+        size, numVectors = matrix.shape
+        if size <= blockRows :
+            orthoNormal, upper = la.qr(np.asarray(matrix, dtype=np.float64))
+            signs = np.where(np.diagonal(upper) < 0, -1.0, 1.0)
+            output[:] = orthoNormal * signs
+            return upper * signs[:, np.newaxis]
+        
+        # 1. factor every row block, keep its R.
+        starts = range(0, size, blockRows)
+        uppers = np.lib.format.open_memmap(os.path.join(workDir, 'r%d.npy' % level), mode='w+',
+                                           dtype=np.float64, shape=(len(starts) * numVectors, numVectors))
+        for blockIdx, start in enumerate(starts) :
+            stop = min(start + blockRows, size)
+            block = np.asarray(matrix[start:stop], dtype=np.float64)
+            orthoNormal, upper = la.qr(block)
+            # last block can have k < m rows, then Q_i (k x k) is padded with zero columns
+            # and R_i (k x m) with zero rows.
+            output[start:stop, :orthoNormal.shape[1]] = orthoNormal
+            output[start:stop, orthoNormal.shape[1]:] = 0.0
+            uppers[blockIdx * numVectors:(blockIdx + 1) * numVectors] = 0.0
+            uppers[blockIdx * numVectors:blockIdx * numVectors + upper.shape[0]] = upper
+        del orthoNormal, block
+        
+        # 2. factor stack of R factors the same way.
+        stacked = np.lib.format.open_memmap(os.path.join(workDir, 'q%d.npy' % level), mode='w+',
+                                            dtype=np.float64, shape=uppers.shape)
+        upper = self.__tsqr(uppers, stacked, blockRows, workDir, level + 1)
+        
+        # 3. Q of block is Q_i times its part of Q of stack.
+        for blockIdx, start in enumerate(starts) :
+            stop = min(start + blockRows, size)
+            output[start:stop] = output[start:stop] @ stacked[blockIdx * numVectors:(blockIdx + 1) * numVectors]
+        del uppers, stacked
+        return upper
+    
+    def __mgsBatch(self, stack, passes=1) :
+        """ Modified Gram-Schmidt on stack (B, n, m), returns (bases, ranks). """
+        # Work on transposed copy (B, m, n), so that every vector is contiguous in memory.
+        vectors = np.array(stack.transpose(0, 2, 1), dtype=np.float64)
+        numVectors = vectors.shape[1]
+        for _ in range(passes) :
+            independent = np.zeros(vectors.shape[:2], dtype=bool)
+            for currVecIdx in range(numVectors) :
+                current = vectors[:, currVecIdx, :]
+                norms = np.sqrt(np.einsum('bi,bi->b', current, current))
+                # normalise vectors with something left, set others to zero.
+                independent[:, currVecIdx] = norms > self.zeroapprox
+                scale = np.zeros_like(norms)
+                np.divide(1.0, norms, out=scale, where=independent[:, currVecIdx])
+                current *= scale[:, np.newaxis]
+                if currVecIdx + 1 < numVectors :
+                    # subtract overlap with current vector from all later vectors at once.
+                    later = vectors[:, currVecIdx + 1:, :]
+                    overlaps = later @ current[:, :, np.newaxis]
+                    later -= overlaps * current[:, np.newaxis, :]
+        
+        return vectors.transpose(0, 2, 1), independent.sum(axis=1)
+    
+    def __householderBatch(self, stack) :
+        """ Householder QR on stack (B, n, m), returns (bases, ranks). """
+        numMatrices, size, numVectors = stack.shape
+        if numVectors > size :
+            return self.__mgsBatch(stack, passes=2)
+        
+        orthoNormalMatrices, upper = la.qr(stack)
+        # diagonal of R is length of part of vector j not explained by previous vectors,
+        # i.e., same as norm tested by Gram-Schmidt.
+        diagonal = np.diagonal(upper, axis1=1, axis2=2)
+        fullRank = np.all(np.abs(diagonal) > self.zeroapprox, axis=1)
+        # Gram-Schmidt columns have positive overlap with input vectors.
+        orthoNormalMatrices = orthoNormalMatrices * np.where(diagonal < 0, -1.0, 1.0)[:, np.newaxis, :]
+        ranks = np.full(numMatrices, numVectors)
+        if not fullRank.all() :
+            deficient = ~fullRank
+            orthoNormalMatrices[deficient], ranks[deficient] = self.__mgsBatch(stack[deficient], passes=2)
+        
+        return orthoNormalMatrices, ranks
+    
 
+class IncrementalOrthonormalBasis(object):
+    
+    ''' Orthonormal basis built incrementally from a stream of vectors.
+        Vectors are added one at a time (add) or in blocks (extend), basis is
+        not rebuilt from scratch on every insert like gsBasis.
+        Input: vectors of size n.
+    '''
+    
+    # Information about implementation (not the abstraction)
+    # Basis vectors are kept as rows of a preallocated buffer (capacity x n), so that
+    # every basis vector is contiguous and adding a vector does not copy the basis.
+    # When buffer is full its capacity is doubled (at most n rows, since there can not
+    # be more than n orthonormal vectors of size n). Memory is O(n * rank).
+    # New vector v is made orthogonal to basis Q by classical Gram-Schmidt,
+    #     w = v - Q^T (Q v)
+    # which is two matrix vector products, O(n * rank). Classical Gram-Schmidt loses
+    # orthogonality when v is almost in span of Q (cancellation), so if norm of w
+    # dropped below norm of v / sqrt(2) the projection is done once more
+    # (Gram-Schmidt twice, "twice is enough" by Kahan and Parlett), which makes w
+    # orthogonal to machine precision.
+    # Residual of v is |w| / |v|, i.e., part of v not in span of basis (1 for vector
+    # orthogonal to basis, 0 for vector in span). Vector whose residual is not above
+    # tolerance is linearly dependent and is not added. Tolerance is relative, so
+    # result does not depend on scale of vectors.
+    
+    def __init__(self, size, tolerance=1e-10, capacity=16):
+        """ create empty basis for vectors of length size """
+        if size < 1 :
+            raise ValueError('size must be positive')
+        self.size = size
+        self.tolerance = tolerance
+        self.dimension = 0
+        self.reorthogonalisations = 0
+        self.__rows = np.zeros((min(max(capacity, 1), size), size))
+        # residual of every vector passed to add or extend, in order.
+        self.__residuals = []
+        return
+    
+    @property
+    def basis(self) :
+        """ Orthonormal basis vectors as columns, shape (size, dimension), read only view. """
+        basis = self.__rows[:self.dimension].T
+        basis.flags.writeable = False
+        return basis
+    
+    @property
+    def residuals(self) :
+        """ Residual of every vector passed to add or extend, in order. """
+        return np.array(self.__residuals)
+    
+    def add(self, vector) :
+        # Adds vector to basis if it is not in span of basis.
+        # Returns residual of vector (0 if it is a zero vector).
+        vector = self.__checkVectors(vector, 1)[:, 0]
+        residual = self.__addVector(vector)
+        self.__residuals.append(residual)
+        return residual
+    
+    def extend(self, block) :
+        # Adds vectors which are columns of block (shape (size, k)) in order.
+        # Whole block is first projected out of existing basis with two matrix matrix
+        # products per pass (BLAS 3), then its columns are added one at a time
+        # against vectors of basis added from this block only.
+        # Returns residuals of all columns.
+        block = self.__checkVectors(block, 2)
+        norms = la.norm(block, axis=0)
+        existing = self.__rows[:self.dimension]
+        remainders = block - existing.T @ (existing @ block)
+        # second pass for columns which lost too much (same rule as add).
+        lost = la.norm(remainders, axis=0) < norms / np.sqrt(2.0)
+        if lost.any() and self.dimension :
+            self.reorthogonalisations += int(lost.sum())
+            remainders[:, lost] -= existing.T @ (existing @ remainders[:, lost])
+        
+        first = self.dimension
+        residuals = np.zeros(block.shape[1])
+        for column in range(block.shape[1]) :
+            residuals[column] = self.__addVector(remainders[:, column], norms[column], first)
+        self.__residuals.extend(residuals.tolist())
+        return residuals
+    
+    def residual(self, vector) :
+        # Residual of vector against basis without adding it, i.e., distance of vector
+        # from span of basis relative to its length.
+        vector = self.__checkVectors(vector, 1)[:, 0]
+        norm = la.norm(vector)
+        if norm == 0 :
+            return 0.0
+        existing = self.__rows[:self.dimension]
+        remainder = vector - existing.T @ (existing @ vector)
+        remainder -= existing.T @ (existing @ remainder)
+        return la.norm(remainder) / norm
+    
+    def __checkVectors(self, vectors, numDims) :
+        """ Converts input to float array of vector (numDims 1) or columns (numDims 2). """
+        vectors = np.array(vectors, dtype=np.float64)
+        if vectors.ndim != numDims or vectors.shape[0] != self.size :
+            raise ValueError('expected %s of length %d, got shape %s'
+                             % ('vector' if numDims == 1 else 'columns', self.size, vectors.shape))
+        return vectors.reshape(self.size, -1)
+    
+    def __addVector(self, vector, norm=None, first=0) :
+        """ Orthogonalises vector against basis rows from first on (earlier rows are
+            already projected out when norm of original vector is given) and appends it. """
+        if norm is None :
+            norm = la.norm(vector)
+        if norm == 0 :
+            return 0.0
+        rows = self.__rows[first:self.dimension]
+        remainder = vector - rows.T @ (rows @ vector)
+        remainderNorm = la.norm(remainder)
+        if remainderNorm < norm / np.sqrt(2.0) and self.dimension :
+            # Gram-Schmidt twice against whole basis.
+            self.reorthogonalisations += 1
+            rows = self.__rows[:self.dimension]
+            remainder -= rows.T @ (rows @ remainder)
+            remainderNorm = la.norm(remainder)
+        residual = remainderNorm / norm
+        if residual <= self.tolerance or self.dimension == self.size :
+            return residual
+        
+        if self.dimension == self.__rows.shape[0] :
+            # buffer is full, double its capacity.
+            grown = np.zeros((min(2 * self.__rows.shape[0], self.size), self.size))
+            grown[:self.dimension] = self.__rows[:self.dimension]
+            self.__rows = grown
+        self.__rows[self.dimension] = remainder / remainderNorm
+        self.dimension += 1
+        return residual
+    
+    def __len__(self) :
+        return self.dimension
     
     
 if __name__ == "__main__":
@@ -4,17 +4,45 @@
 # File name: IdentifyingMatrices.py
 # References: Coursera: Mathematics for Machine learning.
 
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
+import scipy.linalg as sla
+import scipy.sparse as sps
+import scipy.sparse.linalg as spla
+from scipy.sparse.csgraph import structural_rank
 
 class MatrixIsSingular(Exception): pass
 
 class MatrixWrongShape(Exception): pass
 
+# Result of SpecialMatrix.classify.
+#   singular            : pivot (LU) or eigenvalue (symmetric) not above tolerance.
+#   rank                : numerical rank.
+#   rankDeficient       : rank < n.
+#   nearSingular        : conditionEstimate above conditionLimit (or singular).
+#   conditionEstimate   : 1-norm condition number estimate (LU) or 2-norm condition
+#                         number (symmetric, from eigenvalues), inf if singular.
+#   symmetric           : A = A^T.
+#   orthogonal          : A^T A = I.
+#   repeatedEigenvalues : two eigenvalues (almost) equal, None if spectral=False.
+#   defective           : repeated eigenvalue without enough eigenvectors, None if spectral=False.
+#   diagonalizable      : not defective, None if spectral=False.
+#   factorization       : MatrixFactorization, reuse it for solve, inverse and determinant.
+MatrixReport = namedtuple('MatrixReport',
+                          ['singular', 'rank', 'rankDeficient', 'nearSingular', 'conditionEstimate',
+                           'symmetric', 'orthogonal', 'repeatedEigenvalues', 'defective',
+                           'diagonalizable', 'factorization'])
+
 class SpecialMatrix(object):
-    """ To determine if an inverse exists. Input matrix shape (4,4)"""
+    """ To determine if an inverse exists. Input matrix shape (n,n)"""
     # Information about implementation (not the abstraction)
     # Convert the given matrix to echelon form, and testing.
-    # Echelon form is shown below
+    # Echelon form is shown below (for 4 x 4)
     #  [[1, x, y, z],
     #   [0, 1, a, b],
     #   [0, 0, 1, c],
@@ -22,99 +50,488 @@ class SpecialMatrix(object):
     #  ]
     # if this fails by leaving zeros that can’t be removed on the leading diagonal. 
     # then matix is singular and does not have inverse.
+    # Row k is fixed by partial pivoting: row (k or below) with largest |value| in column k
+    # is swapped into row k, divided by that value, and its multiples are subtracted from
+    # rows below to make column k zero there. Rounding leaves tiny values instead of exact
+    # zeros (e.g. for row 3 = row 1 + row 2), so "zero" is |value| <= tolerance * |matrix|,
+    # where |matrix| is infinity norm (largest row sum of |values|). For exactly singular
+    # random matrices rounding left last pivot up to about 1e4 * epsilon * |matrix| (once in
+    # 100000 matrices), so default tolerance is n * 1e-12. Matrices with condition number
+    # above about 1e11 are then singular too, which is what we want before inversion.
+    # Matrix is copied into preallocated buffer self.matrix and eliminated in place, no new
+    # rows are allocated.
+    # Zeros made below diagonal are not stored, buffer keeps multiplier of every row and
+    # pivot instead, so after elimination it holds factorization P A = L U (Crout form):
+    # L (lower, pivots on diagonal) on and below diagonal, echelon form U (unit upper,
+    # 1 on diagonal is not stored) above diagonal, rows of A in order self.permutation.
+    # Rows are fixed in blocks of self.blockSize rows: inside a block only block columns
+    # are eliminated, then rest of block rows is U12 = L11^-1 A12 (triangular solve) and
+    # rows below get A22 - L21 U12 (one matrix product), which is much faster for large n.
     
     def __init__(self):
-        """ create an all zero matrix of shape (4,4) """
+        """ create (4,4) working buffer, it is resized to (n,n) on first use """
         self.matrix = np.zeros((4,4))
+        self.batch = np.zeros((0,4,4))
+        self.zeroapprox = 1e-12 # relative, multiplied by n * |matrix|
+        self.eigenapprox = 1e-6 # relative, for repeated eigenvalues and dependent eigenvectors
+        self.conditionLimit = 1.0 / np.sqrt(np.finfo(np.float64).eps) # near singular above it, about 6.7e7
+        self.blockSize = 64
+        self.permutation = np.arange(4)
+        self.factored = False # True if last isSingular left factorization of non singular matrix
+        self.sparseFactorization = None # SuperLU of last sparse matrix given to isSingular
         return
     
-    def isSingular(self, mat):
-        # check if input shape is (4,4) and copyt to member element.
-        if(mat.shape[0] != 4 or mat.shape[0] != 4 ):
+    def isSingular(self, mat, tolerance=None):
+        if sps.issparse(mat) :
+            return self.isSingularSparse(mat, tolerance)
+        # check if input shape is (n,n) and copy to member element.
+        mat = np.asarray(mat)
+        if(mat.ndim != 2 or mat.shape[0] != mat.shape[1] or mat.shape[0] == 0):
             raise MatrixWrongShape
-        else:
-            self.matrix = np.array(mat, dtype=np.float_) 
-            
+        if self.matrix.shape != mat.shape :
+            self.matrix = np.empty(mat.shape)
+        np.copyto(self.matrix, mat, casting='unsafe')
+        threshold = self.__threshold(self.matrix, tolerance)
+        # 1-norm (largest column sum) for condition estimate.
+        self.norm = np.abs(self.matrix).sum(axis=0).max()
+        self.permutation = np.arange(mat.shape[0])
+        self.factored = False
+        self.sparseFactorization = None
+        
+        size = self.matrix.shape[0]
         try:
-            self.__fixRowZero()
-            self.__fixRowOne()
-            self.__fixRowTwo()
-            self.__fixRowThree()
+            for blockStart in range(0, size, self.blockSize) :
+                blockEnd = min(blockStart + self.blockSize, size)
+                for rowIdx in range(blockStart, blockEnd) :
+                    self.__fixRow(rowIdx, threshold, blockEnd)
+                self.__fixRowsBelow(blockStart, blockEnd)
         except MatrixIsSingular:
             return True
         
+        self.factored = True
         return False
-
-    def __fixRowZero(self) :
-        """ For Row Zero, all we require is the first element is equal to 1."""
-        # We'll divide the row by the value of matrix[0, 0].
-        # This will get us in trouble though if matrix[0, 0] equals 0, so first we'll test for that,
-        # and if this is true, we'll add one of the lower rows to the first one before the division.
-        # We'll repeat the test going down each lower row until we can do the division.
-    
-        if self.matrix[0,0] == 0 :
-            self.matrix[0] = self.matrix[0] + self.matrix[1]
-        if self.matrix[0,0] == 0 :
-            self.matrix[0] = self.matrix[0] + self.matrix[2]
-        if self.matrix[0,0] == 0 :
-            self.matrix[0] = self.matrix[0] + self.matrix[3]
-        if self.matrix[0,0] == 0 :
+    
+    # conditionEstimate estimates 1-norm condition number |A| |A^-1| of matrix with
+    # Hager's method as improved by Higham (LAPACK dlacon), using factorization isSingular
+    # leaves in buffer (SuperLU self.sparseFactorization for sparse matrix). |A^-1| = max |A^-1 x| over x with |x| = 1 (1-norm), which is
+    # largest column sum of A^-1. Starting from x = [1/n, .., 1/n] every step solves
+    # y = A^-1 x and z = A^-T sign(y), z is gradient of |A^-1 x|, and x moves to unit
+    # vector e_j of largest |z_j| until it does not grow any more (usually 2 to 3 steps,
+    # at most 5). Higham's extra vector with alternating signs catches matrices where
+    # this stops too early. Every solve is two triangular solves, O(n^2), so estimate
+    # costs O(n^2) after O(n^3) elimination, while np.linalg.cond needs SVD.
+    # Estimate is not above true condition number (up to rounding) and in practice within
+    # factor 3 of it.
+    # Returns inf for singular matrix. If mat is None, matrix of last isSingular is used.
+    def conditionEstimate(self, mat=None, tolerance=None):
+        if mat is not None and self.isSingular(mat, tolerance) :
+            return np.inf
+        if not self.factored :
+            return np.inf
+        if self.sparseFactorization is not None :
+            size = self.sparseFactorization.shape[0]
+        else :
+            size = self.matrix.shape[0]
+        x = np.full(size, 1.0 / size)
+        estimate = 0.0
+        signs = None
+        for _ in range(5) :
+            y = self.__solve(x)
+            estimate = max(estimate, np.abs(y).sum())
+            newSigns = np.where(y >= 0, 1.0, -1.0)
+            if signs is not None and np.array_equal(newSigns, signs) :
+                break
+            signs = newSigns
+            z = self.__solve(signs, transposed=True)
+            maxIdx = np.argmax(np.abs(z))
+            if np.abs(z[maxIdx]) <= z @ x :
+                break
+            x = np.zeros(size)
+            x[maxIdx] = 1.0
+        # Higham's alternating vector [1, -(1 + 1/(n-1)), 1 + 2/(n-1), ..].
+        alternating = (-1.0) ** np.arange(size) * (1.0 + np.arange(size) / max(size - 1, 1))
+        estimate = max(estimate, 2.0 * np.abs(self.__solve(alternating)).sum() / (3.0 * size))
+        return self.norm * estimate
+    
+    # isNearSingular is True for singular matrix and for matrix whose condition estimate
+    # is above conditionLimit (default self.conditionLimit, 1 / sqrt(epsilon)), i.e.,
+    # solving with it can lose more than half of the digits.
+    def isNearSingular(self, mat, conditionLimit=None, tolerance=None):
+        if conditionLimit is None :
+            conditionLimit = self.conditionLimit
+        return bool(self.conditionEstimate(mat, tolerance) > conditionLimit)
+    
+    # isSingularSparse tests scipy.sparse matrix without making it dense (n x n dense
+    # matrix with a million rows would need 8TB).
+    #   1. Structural rank, i.e., largest number of nonzeros no two in same row or column
+    #      (maximum bipartite matching of rows and columns), is found in about O(nnz).
+    #      If it is below n, every matrix with this pattern of nonzeros is singular (e.g.
+    #      empty row or column), no elimination is needed.
+    #   2. Otherwise sparse LU with partial pivoting (SuperLU) after COLAMD column ordering,
+    #      which keeps fill-in (new nonzeros made by elimination) small. Pivot
+    #      |U[k, k]| <= tolerance * |matrix| means singular, like in isSingular. Rounding
+    #      error of pivot grows with number of rows subtracted from its row, which is n for
+    #      dense matrix and number of nonzeros in row of L here, so default tolerance is
+    #      self.zeroapprox times largest number of nonzeros in a row of L.
+    # LU is kept in self.sparseFactorization (SuperLU, has solve) for reuse, e.g. by
+    # conditionEstimate.
+    def isSingularSparse(self, mat, tolerance=None):
+        if(mat.ndim != 2 or mat.shape[0] != mat.shape[1] or mat.shape[0] == 0):
+            raise MatrixWrongShape
+        mat = sps.csc_matrix(mat, dtype=np.float64)
+        mat.eliminate_zeros()
+        self.sparseFactorization = None
+        self.factored = False
+        # 1-norm (largest column sum) for condition estimate.
+        self.norm = abs(mat).sum(axis=0).max()
+        if structural_rank(mat) < mat.shape[0] :
+            return True
+        try:
+            factorization = spla.splu(mat, permc_spec='COLAMD')
+        except RuntimeError:
+            # SuperLU found exactly zero pivot.
+            return True
+        if tolerance is None :
+            tolerance = self.zeroapprox * np.diff(factorization.L.tocsr().indptr).max()
+        threshold = tolerance * abs(mat).sum(axis=1).max()
+        if np.any(np.abs(factorization.U.diagonal()) <= threshold) :
+            return True
+        self.sparseFactorization = factorization
+        self.factored = True
+        return False
+    
+    # isSingularBatch does same elimination on stack of matrices (B, n, n) at once, loop
+    # runs over rows only (n steps) and every step works on all B matrices. Matrix with
+    # no pivot above its threshold is marked singular, its pivot is set to 1 so that
+    # elimination goes on without division by zero (result of that matrix is not used).
+    # Returns bool array (B,), or bool for a single (n, n) matrix.
+    def isSingularBatch(self, mats, tolerance=None):
+        mats = np.asarray(mats)
+        single = mats.ndim == 2
+        if single :
+            mats = mats[np.newaxis]
+        if(mats.ndim != 3 or mats.shape[1] != mats.shape[2] or mats.shape[1] == 0):
+            raise MatrixWrongShape
+        if self.batch.shape != mats.shape :
+            self.batch = np.empty(mats.shape)
+        np.copyto(self.batch, mats, casting='unsafe')
+        batch = self.batch
+        numMatrices, size, _ = batch.shape
+        threshold = self.__threshold(batch, tolerance)
+        singular = np.zeros(numMatrices, dtype=bool)
+        matrixIdx = np.arange(numMatrices)
+        
+        for rowIdx in range(size) :
+            # partial pivoting, swap row with largest |value| in column rowIdx into rowIdx.
+            pivotIdx = rowIdx + np.argmax(np.abs(batch[:, rowIdx:, rowIdx]), axis=1)
+            swap = pivotIdx != rowIdx
+            if swap.any() :
+                swapIdx = matrixIdx[swap]
+                pivotRows = batch[swapIdx, pivotIdx[swap]]
+                batch[swapIdx, pivotIdx[swap]] = batch[swapIdx, rowIdx]
+                batch[swapIdx, rowIdx] = pivotRows
+            pivots = batch[:, rowIdx, rowIdx]
+            zeroPivot = np.abs(pivots) <= threshold
+            singular |= zeroPivot
+            pivots[zeroPivot] = 1.0
+            # divide row by pivot and subtract its multiples from rows below.
+            batch[:, rowIdx, rowIdx:] /= pivots[:, np.newaxis]
+            if rowIdx + 1 < size :
+                batch[:, rowIdx + 1:, rowIdx:] -= (batch[:, rowIdx + 1:, rowIdx, np.newaxis]
+                                                   * batch[:, np.newaxis, rowIdx, rowIdx:])
+        
+        if single :
+            return bool(singular[0])
+        return singular
+    
+    # classify reports every property of matrix from one factorization, and returns the
+    # factorization (MatrixReport.factorization) so that later solve, inverse or
+    # determinant does not factor the matrix again, as isSingular followed by
+    # np.linalg.inv and np.linalg.det does.
+    #   symmetric matrix : eigen decomposition (eigh). Eigenvalues give singularity and
+    #                      rank (number of |eigenvalue| above tolerance), exact 2-norm
+    #                      condition number, and repeated eigenvalues. Symmetric matrix
+    #                      is always diagonalizable.
+    #   other matrix     : LU with partial pivoting. Pivot not above tolerance (same test
+    #                      as isSingular) means singular, 1-norm condition number is
+    #                      estimated from LU in O(n^2) (LAPACK gecon). LU does not reveal
+    #                      rank, so only for singular matrix rank is found from column
+    #                      pivoted QR. If spectral is True, eigen decomposition is done
+    #                      (once, kept in factorization) for eigenvalue properties.
+    # Eigenvalues of defective matrix split by about epsilon^(1/k) (k repeated
+    # eigenvalues), so eigenvalues closer than self.eigenapprox * |matrix| are repeated,
+    # for symmetric matrix too. With spectral False eigenvalue properties are None.
+    # Repeated eigenvalue is defective if its eigenvectors are (almost) dependent, i.e.,
+    # smallest / largest singular value of them is below self.eigenapprox.
+    def classify(self, mat, tolerance=None, conditionLimit=None, spectral=True):
+        mat = np.asarray(mat)
+        if(mat.ndim != 2 or mat.shape[0] != mat.shape[1] or mat.shape[0] == 0):
+            raise MatrixWrongShape
+        mat = np.array(mat, dtype=np.float64)
+        size = mat.shape[0]
+        if conditionLimit is None :
+            conditionLimit = self.conditionLimit
+        threshold = self.__threshold(mat, tolerance)
+        norm = np.abs(mat).sum(axis=-1).max()
+        symmetric = bool(np.abs(mat - mat.T).max() <= threshold)
+        orthogonal = bool(np.abs(mat.T @ mat - np.eye(size)).max() <= size * self.zeroapprox)
+        
+        if symmetric :
+            factorization = MatrixFactorization(mat, 'eigh')
+            values, _ = factorization.eigen()
+            magnitudes = np.abs(values)
+            rank = int(np.sum(magnitudes > threshold))
+            singular = rank < size
+            conditionEstimate = np.inf if singular else magnitudes.max() / magnitudes.min()
+        else :
+            factorization = MatrixFactorization(mat, 'lu')
+            pivots = np.abs(np.diagonal(factorization.lu))
+            singular = bool(np.any(pivots <= threshold))
+            if singular :
+                upper = sla.qr(mat, mode='r', pivoting=True, check_finite=False)[0]
+                rank = int(np.sum(np.abs(np.diagonal(upper)) > threshold))
+                conditionEstimate = np.inf
+            else :
+                rank = size
+                reciprocal, _ = sla.lapack.dgecon(factorization.lu, np.abs(mat).sum(axis=0).max(), norm='1')
+                conditionEstimate = np.inf if reciprocal == 0 else 1.0 / reciprocal
+        factorization.singular = singular
+        nearSingular = bool(singular or conditionEstimate > conditionLimit)
+        
+        repeated = defective = diagonalizable = None
+        if symmetric and spectral :
+            # same closeness as other matrices, so nearly symmetric matrix does not change answer.
+            repeated = bool(size > 1 and np.min(np.diff(values)) <= self.eigenapprox * norm)
+            defective, diagonalizable = False, True
+        elif spectral :
+            values, vectors = factorization.eigen()
+            close = np.abs(values[:, np.newaxis] - values[np.newaxis, :]) <= self.eigenapprox * norm
+            repeated = bool(np.any(close.sum(axis=1) > 1))
+            defective = False
+            for eigIdx in np.flatnonzero(close.sum(axis=1) > 1) :
+                singularValues = np.linalg.svd(vectors[:, close[eigIdx]], compute_uv=False)
+                if singularValues[-1] < self.eigenapprox * singularValues[0] :
+                    defective = True
+                    break
+            diagonalizable = not defective
+        
+        return MatrixReport(singular, rank, rank < size, nearSingular, conditionEstimate, symmetric,
+                            orthogonal, repeated, defective, diagonalizable, factorization)
+    
+    def __threshold(self, mat, tolerance) :
+        """ Largest |value| of pivot which is treated as zero, per matrix. """
+        if tolerance is None :
+            tolerance = mat.shape[-1] * self.zeroapprox
+        return tolerance * np.abs(mat).sum(axis=-1).max(axis=-1)
+    
+    def __fixRow(self, rowIdx, threshold, blockEnd) :
+        """ For row k we want data in format [0, .., 0, 1, a, b, ..] with 1 at position k """
+        # Row with largest |value| in column rowIdx (rowIdx or below) is swapped into rowIdx.
+        # If that value is zero too, all rows below are zero in column rowIdx and matrix is singular.
+        # Next we want the diagonal element to be equal to one, we divide the row (up to
+        # blockEnd) by it. Pivot itself stays on diagonal, it is part of L.
+        # Finally we set the elements below diagonal element to zero, by subtracting
+        # multiples of the row from lower rows (columns up to blockEnd). Multipliers stay
+        # in column rowIdx, they are part of L.
+        matrix = self.matrix
+        pivotIdx = rowIdx + np.argmax(np.abs(matrix[rowIdx:, rowIdx]))
+        if abs(matrix[pivotIdx, rowIdx]) <= threshold :
             raise MatrixIsSingular()
-        self.matrix[0] = self.matrix[0] / self.matrix[0,0]
+        if pivotIdx != rowIdx :
+            matrix[[rowIdx, pivotIdx]] = matrix[[pivotIdx, rowIdx]]
+            self.permutation[[rowIdx, pivotIdx]] = self.permutation[[pivotIdx, rowIdx]]
+        matrix[rowIdx, rowIdx + 1:blockEnd] /= matrix[rowIdx, rowIdx]
+        if rowIdx + 1 < matrix.shape[0] :
+            matrix[rowIdx + 1:, rowIdx + 1:blockEnd] -= np.outer(matrix[rowIdx + 1:, rowIdx],
+                                                                 matrix[rowIdx, rowIdx + 1:blockEnd])
         return
     
+    def __fixRowsBelow(self, blockStart, blockEnd) :
+        """ Finishes rows blockStart:blockEnd right of block and updates rows below them. """
+        matrix = self.matrix
+        if blockEnd == matrix.shape[0] :
+            return
+        # U12 = L11^-1 A12, then A22 = A22 - L21 U12.
+        matrix[blockStart:blockEnd, blockEnd:] = sla.solve_triangular(
+            matrix[blockStart:blockEnd, blockStart:blockEnd], matrix[blockStart:blockEnd, blockEnd:],
+            lower=True, check_finite=False)
+        matrix[blockEnd:, blockEnd:] -= matrix[blockEnd:, blockStart:blockEnd] @ matrix[blockStart:blockEnd, blockEnd:]
+        return
+    
+    def __solve(self, b, transposed=False) :
+        """ Solves A x = b (or A^T x = b) with factorization P A = L U in buffer. """
+        if self.sparseFactorization is not None :
+            return self.sparseFactorization.solve(b, trans='T' if transposed else 'N')
+        matrix = self.matrix
+        if not transposed :
+            # L U x = P b
+            y = sla.solve_triangular(matrix, b[self.permutation], lower=True, check_finite=False)
+            return sla.solve_triangular(matrix, y, lower=False, unit_diagonal=True, check_finite=False)
+        # A^T = U^T L^T P, so U^T w = b, L^T v = w, x = P^T v.
+        w = sla.solve_triangular(matrix, b, lower=False, unit_diagonal=True, trans='T', check_finite=False)
+        v = sla.solve_triangular(matrix, w, lower=True, trans='T', check_finite=False)
+        x = np.empty_like(v)
+        x[self.permutation] = v
+        return x
+ 
+    
+class MatrixFactorization(object):
+    """ LU (or symmetric eigen) factorization of matrix, computed once and reused. """
+    # Information about implementation (not the abstraction)
+    # Solve, inverse and determinant are all done from one factorization.
+    #   'lu'   : P A = L U with partial pivoting (LAPACK getrf), solve is two triangular
+    #            solves, O(n^2), determinant is product of diagonal of U with sign of P.
+    #   'eigh' : A = V diag(w) V^T for symmetric A, solve is V (V^T b / w).
+    # Eigen decomposition (for eigenvalue properties) is computed when first asked and
+    # kept, for 'eigh' it is the factorization itself.
+    # numFactorizations counts factorizations done, to check that nothing is factored twice.
+    
+    def __init__(self, mat, kind='lu', singular=False):
+        """ factor mat (n,n), kind is 'lu' or 'eigh' """
+        self.matrix = mat
+        self.kind = kind
+        self.singular = singular
+        self.numFactorizations = 1
+        self.__eigen = None
+        if kind == 'lu' :
+            # getrf directly (not lu_factor), which warns on exactly singular matrix.
+            self.lu, self.pivots, _ = sla.lapack.dgetrf(mat)
+        elif kind == 'eigh' :
+            self.__eigen = np.linalg.eigh(mat)
+        else :
+            raise ValueError("kind must be 'lu' or 'eigh', got %r" % (kind,))
+        return
+    
+    def eigen(self):
+        # Eigenvalues and eigenvectors (as columns), computed once.
+        if self.__eigen is None :
+            self.__eigen = np.linalg.eig(self.matrix)
+            self.numFactorizations += 1
+        return self.__eigen
     
-    def __fixRowOne(self) :
-        """ For row 1 we want data in format [0, 1, a, b] """
-        # First we'll set the sub-diagonal elements to zero, i.e. matrix[1,0].
-        # Next we want the diagonal element to be equal to one.
-        # We'll divide the row by the value of A[1, 1].
-        # Again, we need to test if this is zero.
-        # If so, we'll add a lower row and repeat setting the sub-diagonal elements to zero.
-        self.matrix[1] = self.matrix[1] - self.matrix[1,0] * self.matrix[0]
-        if self.matrix[1,1] == 0 :
-            self.matrix[1] = self.matrix[1] + self.matrix[2]
-            self.matrix[1] = self.matrix[1] - self.matrix[1,0] * self.matrix[0]
-        if self.matrix[1,1] == 0 :
-            self.matrix[1] = self.matrix[1] + self.matrix[3]
-            self.matrix[1] = self.matrix[1] - self.matrix[1,0] * self.matrix[0]
-        if self.matrix[1,1] == 0 :
+    def solve(self, b):
+        # Solution x of A x = b, b is a vector or matrix of right hand sides.
+        if self.singular :
             raise MatrixIsSingular()
-        self.matrix[1] = self.matrix[1] / self.matrix[1,1]
-        return 
+        if self.kind == 'lu' :
+            return sla.lu_solve((self.lu, self.pivots), b, check_finite=False)
+        values, vectors = self.__eigen
+        projected = vectors.T @ b
+        return vectors @ (projected / (values if projected.ndim == 1 else values[:, np.newaxis]))
+    
+    def inverse(self):
+        return self.solve(np.eye(self.matrix.shape[0]))
     
+    def determinant(self):
+        if self.kind == 'lu' :
+            # every pivots[i] != i is a row swap, which changes sign.
+            swaps = np.count_nonzero(self.pivots != np.arange(len(self.pivots)))
+            return (-1.0) ** swaps * np.prod(np.diagonal(self.lu))
+        return np.prod(self.__eigen[0])
 
-    def __fixRowTwo(self) :
-        """ For row 2 we want data in format [0, 0, 1, a] """
-        # First we'll set the sub-diagonal elements to zero, i.e. matrix[2,0] and matrix[2,1].
-        self.matrix[2] = self.matrix[2] - self.matrix[2,0] * self.matrix[0]
-        self.matrix[2] = self.matrix[2] - self.matrix[2,1] * self.matrix[1]
-        # Next we'll test that the diagonal element is not zero and want diagnaol element to 1
-        if self.matrix[2,2] == 0 :
-            self.matrix[2] = self.matrix[2] + self.matrix[3]
-            self.matrix[2] = self.matrix[2] - self.matrix[2,0] * self.matrix[0]
-            self.matrix[2] = self.matrix[2] - self.matrix[2,1] * self.matrix[1]     
-        if self.matrix[2,2] == 0 :
-            raise MatrixIsSingular()
-        self.matrix[2] = self.matrix[2] / self.matrix[2,2]
-                    
+
+class MatrixScreener(object):
+    """ Screens stream of matrices for singularity with isSingularBatch in a thread pool. """
+    # Information about implementation (not the abstraction)
+    # Matrices (from a queue, generator or (B, n, n) array) are cut into chunks of
+    # chunkSize matrices, every chunk is one contiguous (chunkSize, n, n) array. A chunk
+    # ends early when n changes. Chunks are classified by isSingularBatch in numThreads
+    # threads, numpy releases GIL inside its loops, so threads run at the same time.
+    # Every thread has its own SpecialMatrix (its buffer is not shared).
+    # screen is a generator, it yields bool array of every chunk in input order (result
+    # of chunk k is yielded after results of chunks before it, even if it is done first).
+    # At most 2 * numThreads chunks are in flight, so memory is bounded for endless streams.
+    # Per chunk seconds (time in isSingularBatch) and throughput are kept for tuning chunk
+    # size: small chunks spend most time in python per row steps, large chunks give late
+    # first results and more memory.
+    
+    def __init__(self, chunkSize=4096, numThreads=None, tolerance=None):
+        """ chunkSize matrices per chunk, numThreads threads (default number of cpus) """
+        if chunkSize < 1 :
+            raise ValueError('chunkSize must be positive')
+        self.chunkSize = chunkSize
+        self.numThreads = numThreads or os.cpu_count() or 1
+        self.tolerance = tolerance
+        self.__local = threading.local()
+        self.resetStats()
         return
     
-    def __fixRowThree(self) :
-        """ For row 3 we want data in format [0, 0, 0, 1] """
-        # First we'll set the sub-diagonal elements to zero, i.e. matrix[2,0] and matrix[2,1].
-        self.matrix[3] = self.matrix[3] - self.matrix[3,0] * self.matrix[0]
-        self.matrix[3] = self.matrix[3] - self.matrix[3,1] * self.matrix[1]
-        self.matrix[3] = self.matrix[3] - self.matrix[3,2] * self.matrix[2]
-        # Next we'll test that the diagonal element is not zero and want diagnaol element to 1
-        
-        if self.matrix[3,3] == 0 :
-           raise MatrixIsSingular()
-        self.matrix[3] = self.matrix[3] / self.matrix[3,3]
-            
+    def resetStats(self):
+        self.chunkSeconds = []
+        self.numMatrices = 0
+        self.seconds = 0.0
         return
- 
     
+    def screen(self, matrices):
+        # Yields singular flags (bool array) of every chunk of matrices, in order.
+        start = time.perf_counter()
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.numThreads) as pool :
+            try:
+                for chunk in self.__chunks(matrices) :
+                    pending.append(pool.submit(self.__screenChunk, chunk))
+                    while len(pending) >= 2 * self.numThreads or (pending and pending[0].done()) :
+                        yield self.__collect(pending.popleft())
+                while pending :
+                    yield self.__collect(pending.popleft())
+            finally:
+                # generator closed early, chunks not started yet are dropped.
+                for future in pending :
+                    future.cancel()
+                self.seconds += time.perf_counter() - start
+        return
+    
+    def stats(self):
+        # Throughput and per chunk timing of all screen calls since resetStats.
+        chunkSeconds = np.array(self.chunkSeconds)
+        busy = chunkSeconds.sum()
+        return {'matrices'          : self.numMatrices,
+                'chunks'            : len(chunkSeconds),
+                'chunkSize'         : self.chunkSize,
+                'threads'           : self.numThreads,
+                'seconds'           : self.seconds,
+                'matricesPerSecond' : self.numMatrices / self.seconds if self.seconds > 0 else 0.0,
+                # throughput of one thread while it works on a chunk.
+                'matricesPerChunkSecond' : self.numMatrices / busy if busy > 0 else 0.0,
+                'meanChunkSeconds'  : float(chunkSeconds.mean()) if len(chunkSeconds) else 0.0,
+                'p50ChunkSeconds'   : float(np.percentile(chunkSeconds, 50)) if len(chunkSeconds) else 0.0,
+                'p99ChunkSeconds'   : float(np.percentile(chunkSeconds, 99)) if len(chunkSeconds) else 0.0,
+                'maxChunkSeconds'   : float(chunkSeconds.max()) if len(chunkSeconds) else 0.0}
+    
+    def __chunks(self, matrices):
+        """ Contiguous (k, n, n) arrays of at most chunkSize matrices, in input order. """
+        if isinstance(matrices, np.ndarray) and matrices.ndim == 3 :
+            for start in range(0, len(matrices), self.chunkSize) :
+                yield np.ascontiguousarray(matrices[start:start + self.chunkSize])
+            return
+        chunk = []
+        for matrix in matrices :
+            matrix = np.asarray(matrix)
+            if chunk and (len(chunk) == self.chunkSize or matrix.shape != chunk[0].shape) :
+                yield np.stack(chunk)
+                chunk = []
+            chunk.append(matrix)
+        if chunk :
+            yield np.stack(chunk)
+        return
+    
+    def __screenChunk(self, chunk):
+        """ Runs in pool thread, returns (singular flags, seconds). """
+        specMat = getattr(self.__local, 'specMat', None)
+        if specMat is None :
+            specMat = self.__local.specMat = SpecialMatrix()
+        start = time.perf_counter()
+        singular = specMat.isSingularBatch(chunk, self.tolerance)
+        return singular, time.perf_counter() - start
+    
+    def __collect(self, future):
+        """ Result of chunk, with its timing added to stats. """
+        singular, seconds = future.result()
+        self.chunkSeconds.append(seconds)
+        self.numMatrices += len(singular)
+        return singular
+
+
 if __name__ == "__main__":
     
     A = np.array([
@@ -126,6 +543,10 @@ if __name__ == "__main__":
     
     specMat = SpecialMatrix()
     print('given matrix is singlular', specMat.isSingular(A) ) 
+    print('given matrices are singlular', specMat.isSingularBatch([A, np.eye(4)]) ) 
+    report = specMat.classify(A)
+    print('singular', report.singular, 'rank', report.rank, 'symmetric', report.symmetric,
+          'diagonalizable', report.diagonalizable)
     
     # To check our code is right verify like below
     
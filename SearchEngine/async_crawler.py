@@ -0,0 +1,165 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://docs.python.org/3/library/asyncio-queue.html
+
+
+My Notes:
+    WebCrawler fetches one page at a time, so crawl time is sum of latencies of
+    all pages. Most of that time is spent waiting for network.
+
+    AsyncCrawler keeps up to max_concurrency fetches in flight using asyncio
+    worker tasks which pull urls from a shared CrawlFrontier:
+        1. Fetch function is pluggable. Coroutine functions are awaited, plain
+           functions (like dummy_web_cache.get_page) run in a thread pool.
+        2. Politeness: at most per_host_limit fetches are in flight for one host
+           and successive fetches to a host start at least per_host_delay
+           seconds apart.
+        3. Budget: at most budget pages are fetched.
+    Every fetched page is handed to on_page(url, content) callback which indexes
+    page and returns its out links. Callback runs on event loop thread, so
+    crawler state (index, graph) is never touched from two threads.
+"""
+
+import asyncio
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from dummy_web_cache import get_page
+from frontier import CrawlFrontier
+
+
+class AsyncCrawler:
+    '''
+    Class AsyncCrawler crawls web concurrently with bounded number of fetches
+    in flight and per host politeness limits.
+    '''
+    def __init__(self, fetch = get_page, max_concurrency : int = 8,
+                 per_host_limit : int = 2, per_host_delay : float = 0.0) -> None:
+        '''
+        Constructor for async crawler class
+
+            Parameters
+            ----------
+            fetch : callable
+                fetch(url) -> html string. Plain function or coroutine function.
+            max_concurrency : int
+                maximum number of fetches in flight.
+            per_host_limit : int
+                maximum number of fetches in flight to one host.
+            per_host_delay : float
+                minimum seconds between start of two fetches to one host.
+
+            Returns
+            -------
+            None
+        '''
+        self.fetch           = fetch
+        self.max_concurrency = max_concurrency
+        self.per_host_limit  = per_host_limit
+        self.per_host_delay  = per_host_delay
+        self.fetched         = 0
+        return
+
+    def crawl(self, seed_pages : list, budget : int, on_page,
+              frontier : CrawlFrontier = None) -> int:
+        '''
+        Crawls web from seed pages until there are no more links or budget
+        pages are fetched.
+
+        Parameters
+        ----------
+        seed_pages : list
+            urls to start crawling from.
+        budget : int
+            maximum number of pages to fetch.
+        on_page : callable
+            on_page(url, content) -> list of out links, called for every
+            fetched page.
+        frontier : CrawlFrontier
+            frontier holding urls to crawl and visited urls. New breadth
+            first frontier if None.
+
+        Returns
+        -------
+        int
+            number of pages fetched.
+
+        '''
+        return asyncio.run(self.crawl_async(seed_pages, budget, on_page, frontier))
+
+    async def crawl_async(self, seed_pages : list, budget : int, on_page,
+                          frontier : CrawlFrontier = None) -> int:
+        ''' Coroutine version of crawl, for callers already in event loop. '''
+        if frontier is None:
+            frontier = CrawlFrontier('bfs')
+        frontier.extend(seed_pages)
+        self.fetched = 0
+        host_slots   = {}
+        host_next    = {}
+        dispatched   = 0
+        in_flight    = 0
+        errors       = []
+        # woken up whenever a fetch completes, i.e., frontier may have new urls.
+        changed      = asyncio.Condition()
+
+        executor = None
+        if not inspect.iscoroutinefunction(self.fetch):
+            executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        loop = asyncio.get_running_loop()
+
+        async def fetch_politely(url):
+            host = urlsplit(url).netloc
+            slots = host_slots.get(host)
+            if slots is None:
+                slots = host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+            async with slots:
+                if self.per_host_delay:
+                    now = time.monotonic()
+                    start = max(now, host_next.get(host, now))
+                    host_next[host] = start + self.per_host_delay
+                    if start > now:
+                        await asyncio.sleep(start - now)
+                if executor is None:
+                    return await self.fetch(url)
+                return await loop.run_in_executor(executor, self.fetch, url)
+
+        async def worker():
+            nonlocal dispatched, in_flight
+            while True:
+                async with changed:
+                    # wait while frontier is empty but running fetches may add links.
+                    while not frontier and in_flight and not errors:
+                        await changed.wait()
+                    if not frontier or dispatched >= budget or errors:
+                        return
+                    url = frontier.pop()
+                    dispatched += 1
+                    in_flight  += 1
+                try:
+                    try:
+                        content = await fetch_politely(url)
+                    except Exception:
+                        # failed fetch is an empty page, same as dummy_web_cache.get_page.
+                        content = ""
+                    self.fetched += 1
+                    frontier.extend(on_page(url, content or ""))
+                except Exception as error:
+                    # stop crawling, error is raised once running fetches finish.
+                    errors.append(error)
+                finally:
+                    async with changed:
+                        in_flight -= 1
+                        changed.notify_all()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+        if errors:
+            raise errors[0]
+        return self.fetched
@@ -0,0 +1,281 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://en.wikipedia.org/wiki/Okapi_BM25
+           Turtle and Flood, Query evaluation: strategies and optimizations (MaxScore)
+
+
+My Notes:
+    Search results used to be ordered only by page rank, i.e., a page which
+    mentions keyword once in a footer is as good as a page about keyword.
+
+    BM25 score of document d for query keywords t is
+        sum over t of idf(t) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(d) / avg_len))
+        idf(t) = log(1 + (N - df(t) + 0.5) / (df(t) + 0.5))
+    where tf is frequency of t in d, df(t) number of documents with t and N
+    number of documents. Final score is linear blend with page rank
+        score = bm25 + rank_weight * rank(d) / max rank
+    Document length normalisation and idf of every term are precomputed once.
+
+    Top-k uses MaxScore early termination:
+        1. Upper bound of every keyword is its best score over its postings
+           (computed on first use and kept).
+        2. Documents of rarest keyword are scored first, k-th best score is
+           threshold.
+        3. Keywords with smallest upper bounds whose sum (plus rank weight)
+           stays below threshold are non essential: document containing only
+           those keywords can not reach top-k, so their postings (e.g. 'the')
+           are never scanned, only candidates are looked up in them.
+        4. Candidates of essential keywords whose upper bound is below
+           threshold are dropped before looking up non essential keywords.
+"""
+
+import math
+
+import numpy as np
+
+
+class BM25Scorer:
+    '''
+    Class BM25Scorer scores documents of inverted index (or index segment)
+    with BM25 blended with page rank and selects top-k documents.
+    '''
+    def __init__(self, index, doc_ranks : np.ndarray, k1 : float = 1.2, b : float = 0.75,
+                 rank_weight : float = 1.0) -> None:
+        '''
+        Constructor for BM25 scorer class
+
+            Parameters
+            ----------
+            index : InvertedIndex or IndexSegment
+                content index with document lengths.
+            doc_ranks : np.ndarray
+                page rank of every document indexed by document id.
+            k1 : float
+                term frequency saturation.
+            b : float
+                document length normalisation, 0 (none) to 1 (full).
+            rank_weight : float
+                weight of page rank (scaled to [0, 1]) added to BM25 score,
+                must not be negative.
+
+            Returns
+            -------
+            None
+        '''
+        if rank_weight < 0:
+            raise ValueError('rank_weight must not be negative')
+        self.index       = index
+        self.k1          = k1
+        self.b           = b
+        self.rank_weight = rank_weight
+        lengths = np.asarray(index.doc_lengths, dtype=np.float64)
+        # removed pages (recrawl) keep document id with length 0 and are not counted.
+        n_docs = int(np.count_nonzero(lengths))
+        average_length = lengths.sum() / n_docs if n_docs else 0.0
+        # k1 * (1 - b + b * len(d) / avg_len) of every document.
+        if average_length > 0:
+            self.norms = k1 * (1.0 - b + b * lengths / average_length)
+        else:
+            self.norms = np.full(len(lengths), k1 * (1.0 - b))
+        doc_ranks = np.asarray(doc_ranks, dtype=np.float64)
+        max_rank = doc_ranks.max() if len(doc_ranks) else 0.0
+        if max_rank > 0:
+            self.rank_scores = rank_weight * doc_ranks / max_rank
+        else:
+            self.rank_scores = np.zeros(len(doc_ranks))
+        self.idf = {term: math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                    for term, df in index.document_frequencies().items()}
+        self.upper_bounds = {}
+        # number of documents fully scored, to see effect of early termination.
+        self.scored = 0
+        return
+
+    def _term_scores(self, term : str, tfs : np.ndarray, doc_ids : np.ndarray) -> np.ndarray:
+        '''
+            Private function for internal purpose. BM25 part of term for
+            documents doc_ids with term frequencies tfs.
+        '''
+        tfs = tfs.astype(np.float64)
+        return self.idf[term] * tfs * (self.k1 + 1.0) / (tfs + self.norms[doc_ids])
+
+    def upper_bound(self, term : str) -> float:
+        '''
+        Returns best BM25 part of term over all its documents, computed on
+        first call and kept.
+        '''
+        bound = self.upper_bounds.get(term)
+        if bound is None:
+            doc_ids = np.asarray(self.index.doc_ids(term), dtype=np.int64)
+            tfs = np.asarray(self.index.freqs(term))
+            bound = self.upper_bounds[term] = float(self._term_scores(term, tfs, doc_ids).max())
+        return bound
+
+    def score(self, keywords : list, doc_ids : np.ndarray) -> np.ndarray:
+        '''
+        Returns blended score of every document of sorted document ids doc_ids.
+
+        Parameters
+        ----------
+        keywords : list
+            query keywords.
+        doc_ids : np.ndarray
+            sorted document ids.
+
+        Returns
+        -------
+        np.ndarray
+            float64 score of every document.
+
+        '''
+        doc_ids = np.asarray(doc_ids, dtype=np.uint32)
+        scores = self.rank_scores[doc_ids].copy()
+        for term in self._known(keywords):
+            scores += self._partial(term, doc_ids)
+        self.scored += len(doc_ids)
+        return scores
+
+    def _known(self, keywords : list) -> list:
+        ''' Private function for internal purpose. Indexed keywords without duplicates. '''
+        return [term for term in dict.fromkeys(keywords) if term in self.idf]
+
+    def _partial(self, term : str, doc_ids : np.ndarray) -> np.ndarray:
+        '''
+            Private function for internal purpose. BM25 part of term for
+            documents doc_ids, 0 for documents without term.
+        '''
+        tfs = self.index.term_frequencies(term, doc_ids)
+        return self._term_scores(term, tfs, doc_ids)
+
+    def _term_doc_ids(self, term : str) -> np.ndarray:
+        ''' Private function for internal purpose. Sorted uint32 document ids of term. '''
+        return np.array(self.index.doc_ids(term), dtype=np.uint32)
+
+    def top_k(self, keywords : list, k : int, doc_ids : np.ndarray = None) -> tuple:
+        '''
+        Returns best k documents for keywords, best score first. Documents
+        with same score stay in crawl order.
+
+        Parameters
+        ----------
+        keywords : list
+            query keywords, document matches if it contains any keyword.
+        k : int
+            number of documents to return.
+        doc_ids : np.ndarray
+            if given only these sorted documents are ranked (e.g. result of
+            boolean query), otherwise MaxScore selection over postings.
+
+        Returns
+        -------
+        tuple (np.ndarray, np.ndarray)
+            (document ids, scores).
+
+        '''
+        terms = self._known(keywords)
+        if k <= 0:
+            return np.zeros(0, dtype=np.uint32), np.zeros(0)
+        if doc_ids is None:
+            if not terms:
+                return np.zeros(0, dtype=np.uint32), np.zeros(0)
+            doc_ids, scores = self._max_score(terms, k)
+        else:
+            doc_ids = np.asarray(doc_ids, dtype=np.uint32)
+            scores = self.score(terms, doc_ids)
+        return self._best(doc_ids, scores, k)
+
+    def top_k_exhaustive(self, keywords : list, k : int) -> tuple:
+        '''
+        Same as top_k but scores every document containing any keyword,
+        reference for MaxScore.
+        '''
+        terms = self._known(keywords)
+        if not terms:
+            return np.zeros(0, dtype=np.uint32), np.zeros(0)
+        doc_ids = np.unique(np.concatenate([self._term_doc_ids(term) for term in terms]))
+        return self._best(doc_ids, self.score(terms, doc_ids), k)
+
+    def _best(self, doc_ids : np.ndarray, scores : np.ndarray, k : int) -> tuple:
+        ''' Private function for internal purpose. Best k by score, ties in crawl order. '''
+        order = np.lexsort((doc_ids, -scores))[:k]
+        return doc_ids[order], scores[order]
+
+    def _max_score(self, terms : list, k : int) -> tuple:
+        '''
+            Private function for internal purpose. Returns (candidate document
+            ids, scores) which contain top k documents for terms.
+        '''
+        # threshold: k-th best score among documents of rarest term.
+        rarest = min(terms, key=self.index.document_frequency)
+        seed = self._term_doc_ids(rarest)
+        seed_scores = self.score(terms, seed)
+        if len(seed) < k:
+            return self._exhaustive(terms, seed, seed_scores)
+        threshold = np.partition(seed_scores, len(seed) - k)[len(seed) - k]
+
+        non_essential = []
+        bound = self.rank_weight
+        for term in sorted(terms, key=self.upper_bound):
+            if bound + self.upper_bound(term) >= threshold:
+                break
+            bound += self.upper_bound(term)
+            non_essential.append(term)
+        if not non_essential:
+            return self._exhaustive(terms, seed, seed_scores)
+        essential = [term for term in terms if term not in non_essential]
+
+        candidates = np.unique(np.concatenate([self._term_doc_ids(term) for term in essential]))
+        # seed documents are already scored.
+        candidates = candidates[~np.isin(candidates, seed, assume_unique=True)]
+        parts = {term: self._partial(term, candidates) for term in essential}
+        partial = self.rank_scores[candidates] + sum(parts.values())
+        keep = partial + (bound - self.rank_weight) >= threshold
+        candidates = candidates[keep]
+        for term in essential:
+            parts[term] = parts[term][keep]
+        for term in non_essential:
+            parts[term] = self._partial(term, candidates)
+        # same summation order as score(), so scores equal exhaustive scoring.
+        scores = self.rank_scores[candidates].copy()
+        for term in terms:
+            scores += parts[term]
+        self.scored += len(candidates)
+        return np.concatenate([seed, candidates]), np.concatenate([seed_scores, scores])
+
+    def _exhaustive(self, terms : list, seed : np.ndarray, seed_scores : np.ndarray) -> tuple:
+        ''' Private function for internal purpose. Scores all remaining documents of terms. '''
+        doc_ids = np.unique(np.concatenate([self._term_doc_ids(term) for term in terms]))
+        rest = doc_ids[~np.isin(doc_ids, seed, assume_unique=True)]
+        return np.concatenate([seed, rest]), np.concatenate([seed_scores, self.score(terms, rest)])
+
+
+if __name__ == '__main__':
+    # MaxScore top-k must equal scoring every matching document.
+    from inverted_index import InvertedIndex
+
+    rng = np.random.default_rng(7)
+    vocabulary = ['w%d' % rank for rank in range(500)]
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    weights /= weights.sum()
+    index = InvertedIndex()
+    for doc_id in range(2000):
+        index.add_document('http://example.com/%d.html' % doc_id,
+                           rng.choice(vocabulary, size=int(rng.integers(5, 200)), p=weights))
+    scorer = BM25Scorer(index, rng.random(len(index.urls)))
+    exhaustive_scored = maxscore_scored = 0
+    for _ in range(200):
+        keywords = list(rng.choice(vocabulary, size=int(rng.integers(1, 5)), p=weights))
+        if rng.random() < 0.5:
+            keywords.append(vocabulary[int(rng.integers(100, len(vocabulary)))])
+        for k in [1, 10, 100, 5000]:
+            scorer.scored = 0
+            expected_ids, expected_scores = scorer.top_k_exhaustive(keywords, k)
+            exhaustive_scored += scorer.scored
+            scorer.scored = 0
+            doc_ids, scores = scorer.top_k(keywords, k)
+            maxscore_scored += scorer.scored
+            assert np.array_equal(doc_ids, expected_ids), (keywords, k)
+            assert np.array_equal(scores, expected_scores), (keywords, k)
+    assert len(scorer.top_k(['w0'], 0)[0]) == 0
+    print('MaxScore top-k equals exhaustive scoring, scored %d of %d documents'
+          % (maxscore_scored, exhaustive_scored))
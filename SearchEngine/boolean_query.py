@@ -0,0 +1,342 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://nlp.stanford.edu/IR-book/html/htmledition/faster-postings-list-intersection-via-skip-pointers-1.html
+
+
+My Notes:
+    MySeachEngine.lookup used to accept one exact keyword. Query is now parsed
+    into a tree of AND, OR, NOT, phrase and keyword nodes:
+        Hummus AND recipe        both keywords (AND is optional: Hummus recipe)
+        Hummus OR babaganoush    any of keywords
+        Hummus NOT garlic        first keyword without second
+        "kathleen hummus"        keywords next to each other in this order
+        (Hummus OR falafel) AND recipe
+        hum* AND recipe          keyword starting with 'hum' (trailing wildcard)
+    NOT binds tighter than AND which binds tighter than OR. Query of single
+    word is always an exact keyword (so keywords like 'AND' or '(1)' still work)
+    unless it ends with wildcard '*'.
+
+    Before evaluation expand_query normalizes keywords (normalized index) and
+    replaces every wildcard by OR of most frequent matching terms of
+    vocabulary (vocabulary.py).
+
+    Query is evaluated into sorted numpy arrays of document ids:
+        1. AND starts from keyword with fewest documents and only checks those
+           candidates in postings of other keywords (index.filter_doc_ids),
+           i.e., skip search by binary search or skip blocks, so cost depends on
+           rarest keyword and not on postings length of 'the'.
+        2. NOT inside AND removes candidates found in postings of keyword, NOT
+           alone is complement over live (not removed) documents.
+        3. Phrase is AND of its keywords followed by a position check: position
+           of i-th keyword minus i must be same position in same document.
+"""
+
+import re
+
+import numpy as np
+
+TERM   = 'TERM'
+PHRASE = 'PHRASE'
+AND    = 'AND'
+OR     = 'OR'
+NOT    = 'NOT'
+PREFIX = 'PREFIX'
+
+_TOKEN_RE = re.compile(r'"[^"]*"?|[()]|[^\s()"]+')
+
+
+def parse_query(query : str) -> tuple:
+    '''
+    Parses query into tree of tuples
+        (TERM, keyword), (PHRASE, [keyword, ...]), (NOT, node),
+        (AND, [node, ...]), (OR, [node, ...]), (PREFIX, prefix)
+
+    Parameters
+    ----------
+    query : str
+        query text, see module notes for syntax.
+
+    Returns
+    -------
+    tuple
+        root node of query, None for empty query. Raises ValueError for
+        malformed query (e.g. unbalanced parenthesis).
+
+    '''
+    words = query.split()
+    if not words:
+        return None
+    if len(words) == 1 and '"' not in query:
+        return _keyword_node(words[0])
+    tokens = _TOKEN_RE.findall(query)
+    node, position = _parse_or(tokens, 0)
+    if position != len(tokens):
+        raise ValueError('unexpected %r in query %r' % (tokens[position], query))
+    return node
+
+
+def _parse_or(tokens : list, position : int) -> tuple:
+    ''' Private function for internal purpose. or := and (OR and)* '''
+    node, position = _parse_and(tokens, position)
+    nodes = [node]
+    while position < len(tokens) and tokens[position] == OR:
+        node, position = _parse_and(tokens, position + 1)
+        nodes.append(node)
+    return (nodes[0] if len(nodes) == 1 else (OR, nodes)), position
+
+
+def _parse_and(tokens : list, position : int) -> tuple:
+    ''' Private function for internal purpose. and := not ([AND] not)* '''
+    node, position = _parse_not(tokens, position)
+    nodes = [node]
+    while position < len(tokens) and tokens[position] not in (OR, ')'):
+        if tokens[position] == AND:
+            position += 1
+        node, position = _parse_not(tokens, position)
+        nodes.append(node)
+    return (nodes[0] if len(nodes) == 1 else (AND, nodes)), position
+
+
+def _parse_not(tokens : list, position : int) -> tuple:
+    ''' Private function for internal purpose. not := NOT not | ( or ) | phrase | keyword '''
+    if position >= len(tokens):
+        raise ValueError('query ends unexpectedly')
+    token = tokens[position]
+    if token == NOT:
+        node, position = _parse_not(tokens, position + 1)
+        return (NOT, node), position
+    if token == '(':
+        node, position = _parse_or(tokens, position + 1)
+        if position >= len(tokens) or tokens[position] != ')':
+            raise ValueError('missing ) in query')
+        return node, position + 1
+    if token in (AND, OR, ')'):
+        raise ValueError('unexpected %r in query' % token)
+    if token.startswith('"'):
+        keywords = token.strip('"').split()
+        if not keywords:
+            raise ValueError('empty phrase in query')
+        if len(keywords) == 1:
+            return (TERM, keywords[0]), position + 1
+        return (PHRASE, keywords), position + 1
+    return _keyword_node(token), position + 1
+
+
+def _keyword_node(token : str) -> tuple:
+    ''' Private function for internal purpose. Keyword or trailing wildcard node of token. '''
+    if len(token) > 1 and token.endswith('*'):
+        return (PREFIX, token[:-1])
+    return (TERM, token)
+
+
+def expand_query(node : tuple, expand, normalize = None) -> tuple:
+    '''
+    Returns query tree ready for evaluation.
+
+    Parameters
+    ----------
+    node : tuple
+        query tree from parse_query.
+    expand : callable
+        expand(prefix) -> list of terms starting with prefix, e.g.
+        Vocabulary.expand. Wildcard node becomes OR of these terms.
+    normalize : callable
+        normalize(keyword) -> index term (vocabulary.normalize_term), None
+        keeps keywords as they are.
+
+    Returns
+    -------
+    tuple
+        query tree without PREFIX nodes. Wildcard without terms and phrase
+        without keywords become (OR, []) which matches no document.
+
+    '''
+    if node is None:
+        return None
+    kind = node[0]
+    if kind == TERM:
+        return (TERM, normalize(node[1])) if normalize else node
+    if kind == PREFIX:
+        prefix = normalize(node[1]) if normalize else node[1]
+        return (OR, [(TERM, term) for term in expand(prefix)])
+    if kind == PHRASE:
+        keywords = node[1]
+        if normalize:
+            keywords = [keyword for keyword in map(normalize, keywords) if keyword]
+        if not keywords:
+            return (OR, [])
+        return (TERM, keywords[0]) if len(keywords) == 1 else (PHRASE, keywords)
+    if kind == NOT:
+        return (NOT, expand_query(node[1], expand, normalize))
+    return (kind, [expand_query(child, expand, normalize) for child in node[1]])
+
+
+def is_free_text(query : str) -> bool:
+    '''
+    Returns True if query is only keywords, i.e., has no AND, OR, NOT,
+    parenthesis or quoted phrases. Ranked search matches free text query
+    documents containing any keyword.
+    '''
+    words = query.split()
+    if len(words) == 1:
+        return '"' not in query
+    return not any(word in (AND, OR, NOT) or '"' in word or '(' in word or ')' in word
+                   for word in words)
+
+
+def query_keywords(node : tuple) -> list:
+    '''
+    Returns keywords of query tree which documents should contain, i.e.,
+    keywords under NOT are left out. Used to score boolean query results.
+    '''
+    if node is None or node[0] == NOT:
+        return []
+    if node[0] == TERM:
+        return [node[1]]
+    if node[0] == PHRASE:
+        return list(node[1])
+    return [keyword for child in node[1] for keyword in query_keywords(child)]
+
+
+def intersect_doc_ids(doc_ids : np.ndarray, other : np.ndarray) -> np.ndarray:
+    '''
+    Returns sorted document ids present in both sorted arrays. Shorter array
+    is binary searched in longer one, O(m log n) for lengths m <= n.
+    '''
+    if len(doc_ids) > len(other):
+        doc_ids, other = other, doc_ids
+    if len(doc_ids) == 0:
+        return doc_ids
+    found = np.searchsorted(other, doc_ids)
+    found[found == len(other)] = 0
+    return doc_ids[other[found] == doc_ids]
+
+
+def _difference(doc_ids : np.ndarray, other : np.ndarray) -> np.ndarray:
+    ''' Private function for internal purpose. Sorted doc_ids not present in sorted other. '''
+    if len(doc_ids) == 0 or len(other) == 0:
+        return doc_ids
+    found = np.searchsorted(other, doc_ids)
+    found[found == len(other)] = 0
+    return doc_ids[other[found] != doc_ids]
+
+
+def _document_frequency(node : tuple, index) -> int:
+    '''
+        Private function for internal purpose. Estimated number of documents
+        of node, used to evaluate cheapest part of AND first.
+    '''
+    if node[0] == TERM:
+        return index.document_frequency(node[1])
+    if node[0] == PHRASE:
+        return min(index.document_frequency(keyword) for keyword in node[1])
+    if node[0] == AND:
+        return min([_document_frequency(child, index) for child in node[1] if child[0] != NOT]
+                   + [len(index.urls)])
+    if node[0] == OR:
+        return sum(_document_frequency(child, index) for child in node[1])
+    return len(index.urls)
+
+
+def _term_doc_ids(index, keyword : str) -> np.ndarray:
+    ''' Private function for internal purpose. Sorted uint32 document ids of keyword. '''
+    doc_ids = index.doc_ids(keyword)
+    if doc_ids is None:
+        return np.zeros(0, dtype=np.uint32)
+    # copy, numpy view of postings must not outlive query (postings may grow).
+    return np.array(doc_ids, dtype=np.uint32)
+
+
+def _filter(node : tuple, index, doc_ids : np.ndarray) -> np.ndarray:
+    '''
+        Private function for internal purpose. Returns candidates doc_ids
+        which match node, without evaluating node over whole index when
+        node is a keyword or phrase.
+    '''
+    kind = node[0]
+    if kind == TERM:
+        return index.filter_doc_ids(node[1], doc_ids)
+    if kind == PHRASE:
+        return _match_phrase(node[1], index, doc_ids)
+    if kind == NOT:
+        return _difference(doc_ids, _filter(node[1], index, doc_ids))
+    if kind == AND:
+        for child in sorted(node[1], key=lambda child: _document_frequency(child, index)):
+            doc_ids = _filter(child, index, doc_ids)
+        return doc_ids
+    return intersect_doc_ids(doc_ids, evaluate_query(node, index))
+
+
+def _match_phrase(keywords : list, index, doc_ids : np.ndarray = None) -> np.ndarray:
+    '''
+        Private function for internal purpose. Returns documents (of doc_ids
+        if given) where keywords appear next to each other in given order.
+    '''
+    order = sorted(range(len(keywords)), key=lambda i: index.document_frequency(keywords[i]))
+    for i in order:
+        if doc_ids is None:
+            doc_ids = _term_doc_ids(index, keywords[i])
+        else:
+            doc_ids = index.filter_doc_ids(keywords[i], doc_ids)
+        if len(doc_ids) == 0:
+            return doc_ids
+    # phrase starts at position p of document d if i-th keyword is at p + i,
+    # so (d, position - i) keys of all keywords must intersect.
+    starts = None
+    document = np.arange(len(doc_ids), dtype=np.int64)
+    for i in order:
+        counts, positions = index.positions(keywords[i], doc_ids)
+        positions = positions.astype(np.int64) - i
+        keys = (np.repeat(document, counts) << 32) | (positions & 0xffffffff)
+        keys = keys[positions >= 0]
+        starts = keys if starts is None else intersect_doc_ids(starts, keys)
+        if len(starts) == 0:
+            break
+    return doc_ids[np.unique(starts >> 32)]
+
+
+def evaluate_query(node : tuple, index) -> np.ndarray:
+    '''
+    Evaluates parsed query over index.
+
+    Parameters
+    ----------
+    node : tuple
+        query tree from parse_query.
+    index : InvertedIndex or IndexSegment
+        content index, phrases need positional index.
+
+    Returns
+    -------
+    np.ndarray
+        sorted uint32 document ids matching query.
+
+    '''
+    if node is None:
+        return np.zeros(0, dtype=np.uint32)
+    kind = node[0]
+    if kind == TERM:
+        return _term_doc_ids(index, node[1])
+    if kind == PHRASE:
+        return _match_phrase(node[1], index)
+    if kind == NOT:
+        return _filter(node, index, index.live_doc_ids())
+    if kind == AND:
+        children = sorted(node[1], key=lambda child: (child[0] == NOT,
+                                                      _document_frequency(child, index)))
+        if children[0][0] == NOT:
+            doc_ids = index.live_doc_ids()
+        else:
+            doc_ids = evaluate_query(children[0], index)
+            children = children[1:]
+        for child in children:
+            if len(doc_ids) == 0:
+                break
+            doc_ids = _filter(child, index, doc_ids)
+        return doc_ids
+    # OR: union of sorted document ids.
+    if not node[1]:
+        return np.zeros(0, dtype=np.uint32)
+    return np.unique(np.concatenate([evaluate_query(child, index) for child in node[1]])
+                     ).astype(np.uint32)
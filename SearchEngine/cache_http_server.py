@@ -0,0 +1,197 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://docs.python.org/3/library/http.server.html
+
+
+My Notes:
+    Local HTTP stand-in for the web. Server serves pages of a dictionary
+    {url: html} (by default dummy_web_cache.cache) so crawler can be tested
+    with real HTTP fetches without network.
+
+    Server works as HTTP proxy: client sends absolute url in request line
+    (GET http://udacity.com/cs101x/urank/index.html HTTP/1.1) and server looks
+    up that url in dictionary. So pages keep their original urls (and hosts)
+    while everything is served from 127.0.0.1. Request without absolute url is
+    looked up as http://<Host header><path>.
+
+    latency (seconds) is slept before every response to simulate slow servers.
+
+    Every response has ETag (hash of page) and Last-Modified (time server
+    first saw this version of page) headers. Conditional GET with matching
+    If-None-Match (or If-Modified-Since not older than page) gets
+    304 Not Modified without body, like real servers, so page store
+    (page_store.py) can be tested against changing pages.
+"""
+
+import email.utils
+import hashlib
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dummy_web_cache import cache
+
+
+class _CacheRequestHandler(BaseHTTPRequestHandler):
+    ''' Serves pages of CacheHTTPServer.pages. '''
+
+    def do_GET(self):
+        server = self.server.cache_server
+        url = self.path
+        if not url.startswith('http'):
+            url = 'http://' + self.headers.get('Host', '') + url
+        if server.latency:
+            time.sleep(server.latency)
+        content = server.pages.get(url)
+        if content is None:
+            server.count_request()
+            self.send_error(404)
+            return
+        body = content.encode('utf-8')
+        etag, last_modified = server.version(url, body)
+        if self._not_modified(etag, last_modified):
+            server.count_request(not_modified=True)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', email.utils.formatdate(last_modified, usegmt=True))
+            self.end_headers()
+            return
+        server.count_request()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', email.utils.formatdate(last_modified, usegmt=True))
+        self.end_headers()
+        self.wfile.write(body)
+        return
+
+    def _not_modified(self, etag : str, last_modified : float) -> bool:
+        ''' Private function for internal purpose. True if client copy of page is current. '''
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            # If-None-Match takes precedence over If-Modified-Since (RFC 7232).
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return etag in tags or '*' in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is None:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+
+    def log_message(self, format, *args):
+        # keep test and benchmark output clean.
+        return
+
+
+class _ThreadingHTTPServer(ThreadingHTTPServer):
+    # default backlog of 5 refuses connections of concurrent crawler.
+    request_queue_size = 128
+
+
+class CacheHTTPServer:
+    '''
+    Class CacheHTTPServer runs threaded HTTP server on 127.0.0.1 in background
+    thread which serves pages of a {url: html} dictionary.
+    '''
+    def __init__(self, pages : dict = None, latency : float = 0.0, port : int = 0) -> None:
+        '''
+        Constructor for cache http server class
+
+            Parameters
+            ----------
+            pages : dict
+                {url: html} pages to be served, dummy_web_cache.cache if None.
+            latency : float
+                seconds to wait before sending every response.
+            port : int
+                port to listen on, 0 picks a free port.
+
+            Returns
+            -------
+            None
+        '''
+        self.pages    = cache if pages is None else pages
+        self.latency  = latency
+        self.requests = 0
+        # requests answered with 304 Not Modified.
+        self.not_modified = 0
+        # url -> (etag, last modified time) of last version served.
+        self._versions = {}
+        self._lock    = threading.Lock()
+        self.httpd    = _ThreadingHTTPServer(('127.0.0.1', port), _CacheRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.cache_server = self
+        self.address  = 'http://127.0.0.1:%d' % self.httpd.server_address[1]
+        # urllib opener which sends requests for any url to this server.
+        self.opener   = urllib.request.build_opener(
+            urllib.request.ProxyHandler({'http': self.address}))
+        self._thread  = None
+        return
+
+    def count_request(self, not_modified : bool = False):
+        ''' Counts requests served, used by tests and benchmarks. '''
+        with self._lock:
+            self.requests += 1
+            if not_modified:
+                self.not_modified += 1
+        return
+
+    def version(self, url : str, body : bytes) -> tuple:
+        '''
+        Returns (etag, last modified time) of page url with content body. Last
+        modified time is time when server first served this content of url.
+        '''
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        with self._lock:
+            version = self._versions.get(url)
+            if version is None or version[0] != etag:
+                version = self._versions[url] = (etag, time.time())
+        return version
+
+    def start(self) -> 'CacheHTTPServer':
+        ''' Starts serving in background thread. '''
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        ''' Stops server and closes listening socket. '''
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+        return
+
+    def get_page(self, url : str) -> str:
+        '''
+        Fetches url through this server, same contract as dummy_web_cache.get_page.
+
+        Parameters
+        ----------
+        url : str
+            url of page.
+
+        Returns
+        -------
+        str
+            html of page or empty string.
+
+        '''
+        try:
+            with self.opener.open(url) as response:
+                return response.read().decode()
+        except Exception:
+            return ""
+
+    def __enter__(self) -> 'CacheHTTPServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+        return
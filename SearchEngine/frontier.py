@@ -0,0 +1,185 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://nlp.stanford.edu/IR-book/html/htmledition/the-url-frontier-1.html
+
+
+My Notes:
+    Crawler used to keep to_crawl and crawled urls in python lists and checked
+    membership with `item not in list`, i.e., crawling was quadratic in number
+    of discovered links.
+
+    CrawlFrontier keeps urls waiting to be crawled in a deque (or a heap for
+    priority order) paired with a hash set for O(1) membership checks, and a
+    separate visited set of urls already handed out for crawling.
+        dfs      : last discovered url is crawled first (original crawler order).
+        bfs      : first discovered url is crawled first.
+        priority : url with highest score is crawled first. Score is rank of
+                   url from priority ({url: rank} or callable), by default
+                   number of in links discovered so far (cheap page rank estimate).
+"""
+
+import heapq
+from collections import deque
+from collections.abc import Sequence
+
+
+class CrawlFrontier:
+    '''
+    Class CrawlFrontier maintains urls to be crawled and urls already crawled
+    with O(1) push, pop and membership checks.
+    '''
+    ORDERS = ('dfs', 'bfs', 'priority')
+
+    def __init__(self, order : str = 'dfs', priority = None) -> None:
+        '''
+        Constructor for crawl frontier class
+
+            Parameters
+            ----------
+            order : str
+                'dfs', 'bfs' or 'priority'.
+            priority : dict or callable
+                priority order only, {url: rank} or rank(url) of urls. If None
+                urls are ranked by number of in links discovered so far.
+
+            Returns
+            -------
+            None
+        '''
+        if order not in self.ORDERS:
+            raise ValueError('order must be one of %s' % (self.ORDERS,))
+        self.order    = order
+        self.priority = priority
+        self.visited  = set()
+        self._pending = set()
+        self._queue   = deque()
+        # priority order: heap of (-score, sequence, url), stale entries are skipped.
+        self._heap    = []
+        self._scores  = {}
+        self._counter = 0
+        return
+
+    def _score(self, url : str) -> float:
+        '''
+            Private function for internal purpose. Returns score of url in
+            priority order.
+        '''
+        if self.priority is None:
+            return self._scores.get(url, 0) + 1
+        if callable(self.priority):
+            return self.priority(url)
+        return self.priority.get(url, 0.0)
+
+    def push(self, url : str) -> bool:
+        '''
+        Adds url to frontier if it is neither waiting nor visited.
+
+        Parameters
+        ----------
+        url : str
+            discovered url.
+
+        Returns
+        -------
+        bool
+            True if url was added.
+
+        '''
+        if url in self.visited:
+            return False
+        if self.order == 'priority':
+            pending = url in self._pending
+            if pending and self.priority is not None:
+                return False
+            # new in link raises score of a waiting url, old heap entry becomes stale.
+            score = self._score(url)
+            self._scores[url] = score
+            self._counter += 1
+            heapq.heappush(self._heap, (-score, self._counter, url))
+            self._pending.add(url)
+            return not pending
+        if url in self._pending:
+            return False
+        self._pending.add(url)
+        self._queue.append(url)
+        return True
+
+    def extend(self, urls) -> None:
+        ''' Adds all urls to frontier, see push. '''
+        for url in urls:
+            self.push(url)
+        return
+
+    def mark_visited(self, url : str) -> None:
+        '''
+        Marks url visited without popping it (e.g. page crawled out of order
+        by recrawl). Waiting entry of url is skipped by pop.
+        '''
+        self._pending.discard(url)
+        self._scores.pop(url, None)
+        self.visited.add(url)
+        return
+
+    def pop(self) -> str:
+        '''
+        Removes next url to be crawled from frontier and marks it visited.
+
+        Returns
+        -------
+        str
+            url to be crawled. Raises IndexError if frontier is empty.
+
+        '''
+        if self.order == 'priority':
+            while True:
+                negative_score, _, url = heapq.heappop(self._heap)
+                if url in self._pending and self._scores[url] == -negative_score:
+                    del self._scores[url]
+                    break
+        else:
+            # entries of urls marked visited are skipped.
+            take = self._queue.pop if self.order == 'dfs' else self._queue.popleft
+            while True:
+                url = take()
+                if url in self._pending:
+                    break
+        self._pending.discard(url)
+        self.visited.add(url)
+        return url
+
+    def pending(self) -> list:
+        ''' Returns urls waiting to be crawled. '''
+        if self.order == 'priority':
+            return [url for negative_score, _, url in sorted(self._heap)
+                    if url in self._pending and self._scores[url] == -negative_score]
+        return [url for url in self._queue if url in self._pending]
+
+    def __contains__(self, url : str) -> bool:
+        return url in self._pending
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+class CrawledView(Sequence):
+    '''
+    Read only ordered view of list of crawled urls.
+    '''
+    def __init__(self, crawled : list) -> None:
+        self._crawled = crawled
+        return
+
+    def __getitem__(self, position):
+        return self._crawled[position]
+
+    def __len__(self) -> int:
+        return len(self._crawled)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (list, tuple, Sequence)):
+            return NotImplemented
+        return list(self._crawled) == list(other)
+
+    def __repr__(self) -> str:
+        return repr(self._crawled)
@@ -0,0 +1,626 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://lucene.apache.org/core/9_0_0/core/org/apache/lucene/codecs/lucene90/package-summary.html
+
+
+My Notes:
+    MySeachEngine used to crawl web and compute page ranks on every start. Index
+    segment is a single binary file holding index, ranks and link graph, which
+    is written once and memory mapped by every query process, so start up only
+    reads header and processes share pages of file through page cache.
+
+    Segment layout (little endian, every section aligned to 8 bytes):
+        header          : magic, version, counts and offset of every section
+        url offsets     : uint64[n_urls + 1] into url data
+        url data        : utf-8 urls. Url id i < n_docs is document id i,
+                          urls only seen as out links come after documents.
+                          Removed documents (InvertedIndex.remove_document)
+                          are left out and document ids renumbered in order.
+        ranks           : float32[n_docs] page rank of every document
+        doc lengths     : uint32[n_docs] number of words of every document
+        graph indptr    : uint64[n_docs + 1], out links of document i are
+        graph indices   : uint32[n_links] url ids graph_indices[indptr[i]:indptr[i+1]]
+        term offsets    : uint64[n_terms + 1] into term data
+        term data       : utf-8 terms sorted by their bytes (binary search)
+        doc freqs       : uint32[n_terms] number of documents of every term
+        postings offsets: uint64[n_terms + 1] into postings data
+        postings data   : for every term blocks of postings encoded by postings
+                          codec (postings_codec.py, codec id in header flags).
+        skip offsets    : uint64[n_terms + 1], skip blocks of term t are
+                          skip_offsets[t]:skip_offsets[t + 1]
+        skip doc ids    : uint32[n_blocks] first doc id of every block
+        skip postings   : uint64[n_blocks] byte offset of block into postings data
+        skip positions  : uint64[n_blocks] index of first position of block
+        positions offsets: uint64[n_terms + 1] into positions
+        positions       : uint32 word positions of every posting in postings
+                          order (positional index only, see flags).
+
+    Postings of every term are cut into blocks of SKIP_INTERVAL postings.
+    filter_doc_ids()/positions() binary search candidate documents in skip
+    doc ids and decode only blocks holding them, so AND query with 'the'
+    does not decode full postings of 'the'.
+
+    Every block is encoded on its own by postings codec chosen when segment
+    is written: 'raw' (uint32), 'vbyte' (varints, default) or 'for' (bit
+    packed frame of reference). Encoding and decoding are vectorised with numpy.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from inverted_index import ContentIndexView, range_indices
+from postings_codec import get_codec
+
+MAGIC   = b'VRKSEG01'
+VERSION = 4
+# header flags, codec id of postings is kept in bits 8 to 15.
+POSITIONAL  = 1
+# terms are normalized (vocabulary.normalize_words), queries are normalized too.
+NORMALIZED  = 2
+CODEC_SHIFT = 8
+# number of postings in skip block.
+SKIP_INTERVAL = 128
+
+_SECTIONS = ('url_offsets', 'url_data', 'ranks', 'doc_lengths', 'graph_indptr', 'graph_indices',
+             'term_offsets', 'term_data', 'doc_freqs', 'postings_offsets', 'postings_data',
+             'skip_offsets', 'skip_doc_ids', 'skip_postings', 'skip_positions',
+             'positions_offsets', 'positions')
+# magic, version, flags, n_docs, n_urls, n_terms, n_links, (offset, size) of every section
+_HEADER = struct.Struct('<8sIIIIIQ' + 'QQ' * len(_SECTIONS))
+
+
+def _strings_section(strings : list) -> tuple:
+    ''' Returns (uint64 offsets, utf-8 data) of strings. '''
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(data) for data in encoded], dtype=np.uint64)
+    return offsets.tobytes(), b''.join(encoded)
+
+
+def write_segment(path : str, inverted_index, ranks : dict, graph : dict = None,
+                  codec = 'vbyte') -> None:
+    '''
+    Writes index, ranks and link graph to segment file.
+
+    Parameters
+    ----------
+    path : str
+        segment file path.
+    inverted_index : InvertedIndex
+        content index, document ids are kept when no document was removed,
+        otherwise live documents are renumbered in crawl order.
+    ranks : dict
+        page rank of each url.
+    graph : dict
+        link graph {url: [out links]} of crawled pages, may be None.
+    codec : str or PostingsCodec
+        postings codec, 'raw', 'vbyte' or 'for'.
+
+    Returns
+    -------
+    None.
+
+    '''
+    codec = get_codec(codec)
+    graph = graph or {}
+    urls = list(inverted_index.urls)
+    doc_lengths = np.array(inverted_index.doc_lengths, dtype=np.uint32)
+    # removed documents have no postings, only their urls and lengths are dropped.
+    live = np.frombuffer(getattr(inverted_index, 'live_docs', b''), dtype=np.uint8).astype(bool)
+    new_doc_ids = None
+    if not live.all():
+        new_doc_ids = np.cumsum(live, dtype=np.int64) - 1
+        urls = [url for url, is_live in zip(urls, live.tolist()) if is_live]
+        doc_lengths = doc_lengths[live]
+    n_docs = len(urls)
+    url_ids = {url: url_id for url_id, url in enumerate(urls)}
+    if any(page not in url_ids for page in graph):
+        raise ValueError('every page of graph must be a document of index')
+    for out_links in graph.values():
+        for url in out_links:
+            if url not in url_ids:
+                url_ids[url] = len(urls)
+                urls.append(url)
+
+    doc_ranks = np.array([ranks.get(url, 0.0) for url in urls[:n_docs]], dtype=np.float32)
+
+    graph_indptr = np.zeros(n_docs + 1, dtype=np.uint64)
+    graph_indices = []
+    for doc_id in range(n_docs):
+        graph_indices.extend(url_ids[url] for url in graph.get(urls[doc_id], ()))
+        graph_indptr[doc_id + 1] = len(graph_indices)
+
+    terms = sorted((term.encode('utf-8'), term) for term in inverted_index.terms())
+    # postings of all terms are delta coded and encoded by codec in one vectorised pass.
+    postings = [inverted_index.postings(term) for _, term in terms]
+    doc_freqs = np.array([len(pairs) // 2 for pairs in postings], dtype=np.uint32)
+    pairs = np.frombuffer(b''.join(postings), dtype=np.uint32).astype(np.uint64)
+    doc_ids = pairs[0::2]
+    if new_doc_ids is not None:
+        doc_ids = new_doc_ids[doc_ids.astype(np.int64)].astype(np.uint64)
+    freqs = pairs[1::2]
+    firsts = np.cumsum(doc_freqs, dtype=np.int64) - doc_freqs
+
+    # skip blocks: every SKIP_INTERVAL-th posting of a term starts a block.
+    n_blocks = (doc_freqs.astype(np.int64) + SKIP_INTERVAL - 1) // SKIP_INTERVAL
+    skip_offsets = np.zeros(len(terms) + 1, dtype=np.uint64)
+    skip_offsets[1:] = np.cumsum(n_blocks)
+    block_terms = np.repeat(np.arange(len(terms)), n_blocks)
+    block_firsts = firsts[block_terms] + SKIP_INTERVAL * (
+        np.arange(len(block_terms)) - skip_offsets[:-1].astype(np.int64)[block_terms])
+    block_sizes = np.diff(np.append(block_firsts, len(doc_ids)))
+    # first doc id of every block is kept in skip table, its gap is written as 0.
+    gaps = np.diff(doc_ids, prepend=np.uint64(0))
+    gaps[block_firsts] = 0
+    postings_data, block_bytes = codec.encode_blocks(gaps, freqs, block_sizes)
+    block_offsets = np.cumsum(block_bytes, dtype=np.uint64) - block_bytes.astype(np.uint64)
+    postings_offsets = np.zeros(len(terms) + 1, dtype=np.uint64)
+    postings_offsets[:-1] = block_offsets[skip_offsets[:-1].astype(np.int64)]
+    postings_offsets[-1] = block_bytes.sum()
+    position_offsets = np.cumsum(freqs, dtype=np.uint64) - freqs
+
+    positional = getattr(inverted_index, 'positional', False)
+    if positional:
+        term_positions = b''.join(inverted_index.term_positions(term) for _, term in terms)
+    else:
+        term_positions = b''
+    positions_offsets = np.zeros(len(terms) + 1, dtype=np.uint64)
+    if positional and len(terms):
+        positions_offsets[:-1] = position_offsets[firsts]
+        positions_offsets[-1] = freqs.sum()
+
+    url_offsets, url_data = _strings_section(urls)
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.uint64)
+    term_offsets[1:] = np.cumsum([len(data) for data, _ in terms], dtype=np.uint64)
+    sections = {
+        'url_offsets'      : url_offsets,
+        'url_data'         : url_data,
+        'ranks'            : doc_ranks.tobytes(),
+        'doc_lengths'      : doc_lengths.tobytes(),
+        'graph_indptr'     : graph_indptr.tobytes(),
+        'graph_indices'    : np.asarray(graph_indices, dtype=np.uint32).tobytes(),
+        'term_offsets'     : term_offsets.tobytes(),
+        'term_data'        : b''.join(data for data, _ in terms),
+        'doc_freqs'        : doc_freqs.tobytes(),
+        'postings_offsets' : postings_offsets.tobytes(),
+        'postings_data'    : postings_data,
+        'skip_offsets'     : skip_offsets.tobytes(),
+        'skip_doc_ids'     : doc_ids[block_firsts].astype(np.uint32).tobytes(),
+        'skip_postings'    : block_offsets.tobytes(),
+        'skip_positions'   : position_offsets[block_firsts].tobytes(),
+        'positions_offsets': positions_offsets.tobytes(),
+        'positions'        : term_positions,
+    }
+
+    layout = []
+    offset = _HEADER.size
+    for name in _SECTIONS:
+        offset += -offset % 8
+        layout.extend((offset, len(sections[name])))
+        offset += len(sections[name])
+    flags = (POSITIONAL if positional else 0) | codec.codec_id << CODEC_SHIFT
+    if getattr(inverted_index, 'normalize', False):
+        flags |= NORMALIZED
+    header = _HEADER.pack(MAGIC, VERSION, flags, n_docs, len(urls),
+                          len(terms), len(graph_indices), *layout)
+    with open(path, 'wb') as segment_file:
+        segment_file.write(header)
+        for index, name in enumerate(_SECTIONS):
+            segment_file.write(b'\0' * (layout[2 * index] - segment_file.tell()))
+            segment_file.write(sections[name])
+    return
+
+
+class _StringTable(Sequence):
+    ''' Read only sequence of utf-8 strings stored in memory mapped segment. '''
+
+    def __init__(self, data : mmap.mmap, offsets : np.ndarray, base : int, count : int) -> None:
+        self._data    = data
+        self._offsets = offsets
+        self._base    = base
+        self._count   = count
+        return
+
+    def raw(self, position : int) -> bytes:
+        start = self._base + int(self._offsets[position])
+        end   = self._base + int(self._offsets[position + 1])
+        return self._data[start:end]
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._count))]
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError(position)
+        return self.raw(position).decode('utf-8')
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class _RankView(Mapping):
+    ''' Read only {url: rank} view of ranks stored in segment. '''
+
+    def __init__(self, segment : 'IndexSegment') -> None:
+        self._segment = segment
+        return
+
+    def __getitem__(self, url : str) -> float:
+        doc_id = self._segment.doc_id(url)
+        if doc_id is None:
+            raise KeyError(url)
+        return float(self._segment.doc_ranks[doc_id])
+
+    def __iter__(self):
+        return iter(self._segment.urls)
+
+    def __len__(self) -> int:
+        return len(self._segment.urls)
+
+
+class IndexSegment:
+    '''
+    Class IndexSegment memory maps segment file written by write_segment and
+    gives read only access with same interface as InvertedIndex.
+    '''
+    def __init__(self, path : str) -> None:
+        '''
+        Constructor for index segment class. Only header is read, sections
+        are numpy views on memory mapped file.
+
+            Parameters
+            ----------
+            path : str
+                segment file path.
+
+            Returns
+            -------
+            None
+        '''
+        self.path = path
+        with open(path, 'rb') as segment_file:
+            self._data = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = struct.unpack_from('<8sI', self._data, 0)
+        if magic != MAGIC:
+            raise ValueError('%s is not an index segment' % path)
+        if version != VERSION:
+            raise ValueError('%s has segment version %d, version %d is supported'
+                             % (path, version, VERSION))
+        fields = _HEADER.unpack_from(self._data, 0)
+        flags, n_docs, n_urls, n_terms, n_links = fields[2:7]
+        self._sections = {name: (fields[7 + 2 * i], fields[8 + 2 * i])
+                          for i, name in enumerate(_SECTIONS)}
+        self.n_docs = n_docs
+        self.positional = bool(flags & POSITIONAL)
+        self.normalize = bool(flags & NORMALIZED)
+        self.codec = get_codec(flags >> CODEC_SHIFT & 0xff)
+        # segment is read only, query results never become stale.
+        self.generation = 0
+
+        url_offsets = self._view('url_offsets', np.uint64)
+        self._all_urls = _StringTable(self._data, url_offsets,
+                                      self._sections['url_data'][0], n_urls)
+        # urls of documents, document id is position in this table.
+        self.urls = _StringTable(self._data, url_offsets, self._sections['url_data'][0], n_docs)
+        self.doc_ranks = self._view('ranks', np.float32)
+        self.doc_lengths = self._view('doc_lengths', np.uint32)
+        self._graph_indptr = self._view('graph_indptr', np.uint64)
+        self._graph_indices = self._view('graph_indices', np.uint32)
+        self._terms = _StringTable(self._data, self._view('term_offsets', np.uint64),
+                                   self._sections['term_data'][0], n_terms)
+        self._doc_freqs = self._view('doc_freqs', np.uint32)
+        self._postings_offsets = self._view('postings_offsets', np.uint64)
+        self._postings_data = self._view('postings_data', np.uint8)
+        self._skip_offsets = self._view('skip_offsets', np.uint64)
+        self._skip_doc_ids = self._view('skip_doc_ids', np.uint32)
+        self._skip_postings = self._view('skip_postings', np.uint64)
+        self._skip_positions = self._view('skip_positions', np.uint64)
+        self._positions_offsets = self._view('positions_offsets', np.uint64)
+        self._positions = self._view('positions', np.uint32)
+        self._url_ids = None
+        return
+
+    def _view(self, name : str, dtype) -> np.ndarray:
+        '''
+            Private function for internal purpose. Returns zero copy numpy view
+            of section.
+        '''
+        offset, size = self._sections[name]
+        return np.frombuffer(self._data, dtype=dtype, count=size // np.dtype(dtype).itemsize,
+                             offset=offset)
+
+    def _term_id(self, term : str) -> int:
+        '''
+            Private function for internal purpose. Binary search of term in
+            sorted term dictionary, returns None if term is not present.
+        '''
+        key = term.encode('utf-8')
+        terms = self._terms
+        low, high = 0, len(terms)
+        while low < high:
+            mid = (low + high) // 2
+            if terms.raw(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < len(terms) and terms.raw(low) == key:
+            return low
+        return None
+
+    def _decode_pairs(self, term_id : int) -> np.ndarray:
+        '''
+            Private function for internal purpose. Returns uint32 array
+            [doc_id0, freq0, doc_id1, freq1, ...] of term.
+        '''
+        blocks = np.arange(int(self._skip_offsets[term_id]), int(self._skip_offsets[term_id + 1]))
+        doc_ids, freqs, _ = self._decode_blocks(term_id, blocks)
+        pairs = np.empty(2 * len(doc_ids), dtype=np.uint32)
+        pairs[0::2] = doc_ids
+        pairs[1::2] = freqs
+        return pairs
+
+    def _decode_blocks(self, term_id : int, blocks : np.ndarray) -> tuple:
+        '''
+            Private function for internal purpose. Decodes sorted skip blocks
+            of term, returns (doc_ids, freqs, position starts) of their postings.
+        '''
+        first_block = int(self._skip_offsets[term_id])
+        last_block = int(self._skip_offsets[term_id + 1]) - 1
+        sizes = np.minimum(SKIP_INTERVAL, int(self._doc_freqs[term_id])
+                           - (blocks - first_block) * SKIP_INTERVAL)
+        starts = self._skip_postings[blocks].astype(np.int64)
+        ends = np.where(blocks < last_block,
+                        self._skip_postings[np.minimum(blocks + 1, last_block)].astype(np.int64),
+                        int(self._postings_offsets[term_id + 1]))
+        gaps, freqs = self.codec.decode_blocks(self._postings_data, starts, ends, sizes)
+        block_starts = np.cumsum(sizes) - sizes
+        # first gap of block is 0, doc id of first posting comes from skip table.
+        doc_ids = np.cumsum(gaps).astype(np.int64)
+        doc_ids += np.repeat(self._skip_doc_ids[blocks].astype(np.int64) - doc_ids[block_starts], sizes)
+        freqs = freqs.astype(np.int64)
+        position_starts = np.cumsum(freqs) - freqs
+        position_starts += np.repeat(self._skip_positions[blocks].astype(np.int64)
+                                     - position_starts[block_starts], sizes)
+        return doc_ids.astype(np.uint32), freqs.astype(np.uint32), position_starts
+
+    def _find_postings(self, term : str, doc_ids : np.ndarray) -> tuple:
+        '''
+            Private function for internal purpose. Decodes only skip blocks of
+            term which may hold doc_ids, returns (doc_ids, freqs, position
+            starts) of decoded postings, None if term is not indexed.
+        '''
+        term_id = self._term_id(term)
+        if term_id is None:
+            return None
+        first_block = int(self._skip_offsets[term_id])
+        skip_doc_ids = self._skip_doc_ids[first_block:int(self._skip_offsets[term_id + 1])]
+        blocks = np.searchsorted(skip_doc_ids, doc_ids, side='right') - 1
+        blocks = np.unique(blocks[blocks >= 0]) + first_block
+        return self._decode_blocks(term_id, blocks)
+
+    def filter_doc_ids(self, term : str, doc_ids : np.ndarray) -> np.ndarray:
+        '''
+        Returns those of sorted document ids doc_ids which contain term. Only
+        skip blocks which may hold candidates are decoded.
+        '''
+        doc_ids = np.asarray(doc_ids, dtype=np.uint32)
+        found = self._find_postings(term, doc_ids) if len(doc_ids) else None
+        if found is None or len(found[0]) == 0:
+            return doc_ids[:0]
+        term_doc_ids = found[0]
+        positions = np.searchsorted(term_doc_ids, doc_ids)
+        positions[positions == len(term_doc_ids)] = 0
+        return doc_ids[term_doc_ids[positions] == doc_ids]
+
+    def term_frequencies(self, term : str, doc_ids : np.ndarray) -> np.ndarray:
+        '''
+        Returns frequency of term in each of sorted document ids doc_ids, 0 for
+        documents without term. Only skip blocks of candidates are decoded.
+        '''
+        doc_ids = np.asarray(doc_ids, dtype=np.uint32)
+        result = np.zeros(len(doc_ids), dtype=np.uint32)
+        found = self._find_postings(term, doc_ids) if len(doc_ids) else None
+        if found is None or len(found[0]) == 0:
+            return result
+        term_doc_ids, freqs, _ = found
+        positions = np.searchsorted(term_doc_ids, doc_ids)
+        positions[positions == len(term_doc_ids)] = 0
+        present = term_doc_ids[positions] == doc_ids
+        result[present] = freqs[positions[present]]
+        return result
+
+    def positions(self, term : str, doc_ids : np.ndarray) -> tuple:
+        '''
+        Returns (counts, positions) of term in documents doc_ids which all
+        contain term, same as InvertedIndex.positions.
+        '''
+        if not self.positional:
+            raise ValueError('index has no word positions')
+        term_doc_ids, freqs, position_starts = self._find_postings(term, doc_ids)
+        found = np.searchsorted(term_doc_ids, doc_ids)
+        counts = freqs[found]
+        return counts, self._positions[range_indices(position_starts[found], counts)]
+
+    def term_positions(self, term : str) -> array:
+        '''
+        Returns positions of term grouped by document in postings order,
+        None if index is not positional or term is not indexed.
+        '''
+        term_id = self._term_id(term)
+        if term_id is None or not self.positional:
+            return None
+        start = int(self._positions_offsets[term_id])
+        end = int(self._positions_offsets[term_id + 1])
+        return array('I', self._positions[start:end].tobytes())
+
+    def postings(self, term : str) -> array:
+        '''
+        Returns postings of term, array('I') of [doc_id0, freq0, doc_id1, freq1, ...],
+        None if term is not indexed.
+        '''
+        term_id = self._term_id(term)
+        if term_id is None:
+            return None
+        return array('I', self._decode_pairs(term_id).tobytes())
+
+    def doc_ids(self, term : str) -> np.ndarray:
+        ''' Returns sorted document ids containing term, None if term is not indexed. '''
+        term_id = self._term_id(term)
+        if term_id is None:
+            return None
+        return self._decode_pairs(term_id)[0::2]
+
+    def freqs(self, term : str) -> np.ndarray:
+        ''' Returns term frequencies aligned with doc_ids(term), None if term is not indexed. '''
+        term_id = self._term_id(term)
+        if term_id is None:
+            return None
+        return self._decode_pairs(term_id)[1::2]
+
+    def document_frequency(self, term : str) -> int:
+        ''' Returns number of documents containing term. '''
+        term_id = self._term_id(term)
+        return 0 if term_id is None else int(self._doc_freqs[term_id])
+
+    def document_frequencies(self) -> dict:
+        ''' Returns {term: number of documents containing term} of all terms. '''
+        return dict(zip(self._terms, self._doc_freqs.tolist()))
+
+    def lookup_urls(self, term : str) -> list:
+        '''
+        Returns urls of documents containing term in crawl order, None if
+        term is not indexed.
+        '''
+        doc_ids = self.doc_ids(term)
+        if doc_ids is None:
+            return None
+        urls = self.urls
+        return [urls[doc_id] for doc_id in doc_ids.tolist()]
+
+    def url(self, doc_id : int) -> str:
+        ''' Returns url of document id. '''
+        return self.urls[doc_id]
+
+    def live_doc_ids(self) -> np.ndarray:
+        ''' Returns sorted uint32 document ids, removed documents are not written to segment. '''
+        return np.arange(self.n_docs, dtype=np.uint32)
+
+    def doc_id(self, url : str) -> int:
+        '''
+        Returns document id of url, None if url is not a document. Url table
+        is hashed on first call.
+        '''
+        if self._url_ids is None:
+            self._url_ids = {url: doc_id for doc_id, url in enumerate(self.urls)}
+        return self._url_ids.get(url)
+
+    def terms(self):
+        ''' Returns iterator over indexed terms in sorted order. '''
+        return iter(self._terms)
+
+    def content_view(self) -> ContentIndexView:
+        ''' Returns read only {keyword: [url, ...]} view of index. '''
+        return ContentIndexView(self)
+
+    def rank_view(self) -> _RankView:
+        ''' Returns read only {url: rank} view of ranks. '''
+        return _RankView(self)
+
+    def graph(self) -> dict:
+        ''' Returns link graph {url: [out links]} of crawled pages. '''
+        graph = {}
+        indptr = self._graph_indptr.tolist()
+        indices = self._graph_indices.tolist()
+        all_urls = self._all_urls
+        for doc_id in range(self.n_docs):
+            graph[self.urls[doc_id]] = [all_urls[url_id]
+                                        for url_id in indices[indptr[doc_id]:indptr[doc_id + 1]]]
+        return graph
+
+    def close(self) -> None:
+        '''
+        Unmaps segment file. Raises BufferError while numpy views of segment
+        (e.g. doc_ranks) are still referenced elsewhere.
+        '''
+        self.doc_ranks = self.doc_lengths = self._graph_indptr = self._graph_indices = None
+        self._doc_freqs = self._postings_offsets = self._postings_data = None
+        self._skip_offsets = self._skip_doc_ids = self._skip_postings = None
+        self._skip_positions = self._positions_offsets = self._positions = None
+        self.urls = self._all_urls = self._terms = None
+        self._data.close()
+        return
+
+    def __contains__(self, term : str) -> bool:
+        return self._term_id(term) is not None
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+
+if __name__ == '__main__':
+    # segment written with every codec must give back postings, positions,
+    # lengths, ranks and graph of live documents of index it was written from.
+    from inverted_index import InvertedIndex
+
+    rng = np.random.default_rng(14)
+    vocabulary = ['w%d' % rank for rank in range(300)]
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    weights /= weights.sum()
+    index = InvertedIndex(positional=True, updatable=True)
+    for doc_id in range(1000):
+        index.add_document('http://example.com/%d.html' % doc_id,
+                           rng.choice(vocabulary, size=int(rng.integers(1, 100)), p=weights).tolist())
+    removed = set(rng.choice(len(index.urls), size=50, replace=False).tolist())
+    for doc_id in removed:
+        index.remove_document(index.urls[doc_id])
+    live_urls = [url for doc_id, url in enumerate(index.urls) if doc_id not in removed]
+    ranks = {url: float(rank) for url, rank in zip(live_urls, rng.random(len(live_urls)))}
+    # out links point to live pages, removed pages and pages never crawled.
+    link_urls = index.urls + ['http://example.org/%d.html' % page for page in range(20)]
+    graph = {url: [link_urls[link] for link in rng.choice(len(link_urls), size=int(rng.integers(0, 5)))]
+             for url in live_urls}
+
+    def snapshot(index):
+        ''' {term: {url: (frequency, positions)}} and {url: length} of documents. '''
+        postings = {}
+        for term in index.terms():
+            doc_ids = np.asarray(index.doc_ids(term))
+            counts, positions = index.positions(term, doc_ids)
+            ends = np.cumsum(counts).tolist()
+            postings[term] = {index.url(doc_id): (count, positions[end - count:end].tolist())
+                              for doc_id, count, end in zip(doc_ids.tolist(), counts.tolist(), ends)}
+        lengths = {index.url(doc_id): int(index.doc_lengths[doc_id])
+                   for doc_id in index.live_doc_ids().tolist()}
+        return postings, lengths
+
+    expected = snapshot(index)
+    with tempfile.TemporaryDirectory() as directory:
+        for codec in ['raw', 'vbyte', 'for']:
+            path = os.path.join(directory, codec + '.seg')
+            write_segment(path, index, ranks, graph, codec)
+            segment = IndexSegment(path)
+            assert segment.codec.name == codec and segment.positional
+            assert list(segment.urls) == live_urls
+            assert snapshot(segment) == expected, codec
+            assert segment.graph() == graph, codec
+            assert segment.doc_ranks.tolist() == np.float32([ranks[url] for url in live_urls]).tolist()
+            assert segment.document_frequencies() == index.document_frequencies()
+            # candidates decode only their skip blocks.
+            candidates = np.sort(rng.choice(segment.n_docs, size=200, replace=False)).astype(np.uint32)
+            for term in ['w0', 'w1', 'w50', 'w299']:
+                urls = expected[0].get(term, {})
+                found = segment.filter_doc_ids(term, candidates)
+                assert [segment.url(doc_id) for doc_id in found.tolist()] == \
+                    [segment.url(doc_id) for doc_id in candidates.tolist() if segment.url(doc_id) in urls]
+                assert segment.term_frequencies(term, candidates).tolist() == \
+                    [urls.get(segment.url(doc_id), (0,))[0] for doc_id in candidates.tolist()]
+            print('%-5s segment round trip ok, %d bytes' % (codec, os.path.getsize(path)))
+            del segment
@@ -0,0 +1,530 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://nlp.stanford.edu/IR-book/html/htmledition/a-first-take-at-building-an-inverted-index-1.html
+
+
+My Notes:
+    Index used to be a dictionary {keyword: [url, url, ...]} where url was appended
+    once per occurrence of keyword, i.e., list grows with every repeated word.
+
+    Inverted index keeps for every keyword (term) a postings list, a compact
+    array('I') of (document id, term frequency) pairs sorted by document id
+        [doc_id0, freq0, doc_id1, freq1, ...]
+    One buffer per term (instead of separate arrays for document ids and
+    frequencies) keeps per term overhead below a python list for rare terms.
+    URLs are interned to integer document ids in the order pages are indexed,
+    so postings are sorted and kept in crawl order by just appending.
+    doc_ids()/freqs() return zero copy strided numpy views of postings.
+
+    Length (number of words) of every document is kept in doc_lengths for
+    BM25 scoring (bm25.py).
+
+    Positional index (positional=True) also keeps for every term an array('I')
+    of word positions of term in every document, grouped by document in same
+    order as postings, i.e., positions of i-th posting are next freq_i entries.
+    Positions are needed for phrase queries (boolean_query.py).
+
+    Updatable index (updatable=True) also keeps terms of every document
+    (forward index, tuples of interned term strings shared with postings
+    keys), so remove_document() touches only postings of terms of removed
+    page. Document id and url of removed page are kept, page indexed again
+    (e.g. changed page on recrawl) gets its old document id. live_docs
+    marks documents which are not removed, NOT queries (boolean_query.py)
+    and index segments (index_segment.py) only use live documents.
+
+    filter_doc_ids()/positions() only touch postings of given candidate
+    documents (binary search into zero copy view), so query with a common
+    keyword like 'the' does not cost its full postings length.
+
+    Normalized index (normalize=True) indexes lowercased words without html
+    tags and surrounding punctuation (vocabulary.normalize_words), queries
+    over it are normalized by MySeachEngine.
+
+    ContentIndexView gives old {keyword: [url, ...]} read only view (without
+    duplicates) for code which still uses dictionary interface.
+"""
+
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+
+import numpy as np
+
+from vocabulary import normalize_words
+
+
+def range_indices(starts : np.ndarray, counts : np.ndarray) -> np.ndarray:
+    '''
+    Returns concatenation of ranges [start, start + count) for every start
+    and count without python loop, used to gather postings and positions of
+    selected documents.
+    '''
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(np.asarray(starts, dtype=np.int64) - offsets, counts) + np.arange(total)
+
+
+class InvertedIndex:
+    '''
+    Class InvertedIndex maintains postings lists of integer document ids with
+    term frequencies for each keyword.
+    '''
+    def __init__(self, positional : bool = False, updatable : bool = False,
+                 normalize : bool = False) -> None:
+        '''
+        Constructor for inverted index class
+
+            Parameters
+            ----------
+            positional : bool
+                keep word positions of every term for phrase queries.
+            updatable : bool
+                keep terms of every document so documents can be removed.
+            normalize : bool
+                add_document indexes normalized words (vocabulary.normalize_words).
+
+            Returns
+            -------
+            None
+        '''
+        # document id -> url and url -> document id.
+        self.urls     = []
+        self.url_ids  = {}
+        # number of words of every document indexed by document id.
+        self.doc_lengths = array('I')
+        # 1 for every document id which is not removed (remove_document), else 0.
+        self.live_docs = array('B')
+        # term -> array('I') of [doc_id0, freq0, doc_id1, freq1, ...]
+        self.postings_lists = {}
+        # positional index: term -> array('I') of positions grouped by document.
+        self.positional = positional
+        self.positions_lists = {}
+        # term -> start of positions of every posting, dropped when index changes.
+        self._position_offsets = {}
+        # updatable index: terms of every document indexed by document id.
+        self.updatable = updatable
+        self.doc_terms = []
+        # words of documents are normalized before indexing.
+        self.normalize = normalize
+        # incremented on every change, results cached for older generation are stale.
+        self.generation = 0
+        return
+
+    def intern(self, url : str) -> int:
+        '''
+        Returns document id of url. New id is assigned if url is not known.
+
+        Parameters
+        ----------
+        url : str
+            url of web page.
+
+        Returns
+        -------
+        int
+            document id of url.
+
+        '''
+        doc_id = self.url_ids.get(url)
+        if doc_id is None:
+            doc_id = len(self.urls)
+            self.url_ids[url] = doc_id
+            self.urls.append(url)
+            self.doc_lengths.append(0)
+            self.live_docs.append(1)
+            if self.updatable:
+                self.doc_terms.append(())
+        return doc_id
+
+    def add_posting(self, term : str, doc_id : int, count : int = 1,
+                    positions = None) -> None:
+        '''
+        Adds count occurrences of term in document doc_id. Postings stay sorted
+        by document id, appending is O(1) when documents are added in order.
+
+        Parameters
+        ----------
+        term : str
+            keyword.
+        doc_id : int
+            document id containing keyword.
+        count : int
+            number of occurrences of keyword in document.
+        positions : list of int
+            sorted word positions of occurrences, required by positional
+            index (count is then number of positions).
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.generation += 1
+        self.live_docs[doc_id] = 1
+        if self.updatable:
+            term = sys.intern(term)
+            if term not in self.doc_terms[doc_id]:
+                self.doc_terms[doc_id] += (term,)
+        if self.positional:
+            if positions is None:
+                raise ValueError('positional index needs positions of term')
+            self._add_positional_posting(term, doc_id, positions)
+            self.doc_lengths[doc_id] += len(positions)
+            return
+        self.doc_lengths[doc_id] += count
+        postings = self.postings_lists.get(term)
+        if postings is None:
+            self.postings_lists[term] = array('I', (doc_id, count))
+            return
+        if postings[-2] < doc_id:
+            postings.extend((doc_id, count))
+            return
+        # document added out of order, binary search over document ids (even positions).
+        low, high = 0, len(postings) // 2
+        while low < high:
+            mid = (low + high) // 2
+            if postings[2 * mid] < doc_id:
+                low = mid + 1
+            else:
+                high = mid
+        pos = 2 * low
+        if postings[pos] == doc_id:
+            postings[pos + 1] += count
+        else:
+            postings[pos:pos] = array('I', (doc_id, count))
+        return
+
+    def _add_positional_posting(self, term : str, doc_id : int, positions) -> None:
+        '''
+            Private function for internal purpose. add_posting of positional
+            index, positions of term are kept grouped in postings order.
+        '''
+        if self._position_offsets:
+            self._position_offsets.clear()
+        postings = self.postings_lists.get(term)
+        if postings is None:
+            self.postings_lists[term] = array('I', (doc_id, len(positions)))
+            self.positions_lists[term] = array('I', positions)
+            return
+        term_positions = self.positions_lists[term]
+        if postings[-2] < doc_id:
+            postings.extend((doc_id, len(positions)))
+            term_positions.extend(positions)
+            return
+        low, high = 0, len(postings) // 2
+        while low < high:
+            mid = (low + high) // 2
+            if postings[2 * mid] < doc_id:
+                low = mid + 1
+            else:
+                high = mid
+        pos = 2 * low
+        start = int(np.frombuffer(postings, dtype=np.uint32)[1:pos:2].sum(dtype=np.int64))
+        if postings[pos] == doc_id:
+            end = start + postings[pos + 1]
+            postings[pos + 1] += len(positions)
+            term_positions[start:end] = array('I', sorted(term_positions[start:end].tolist()
+                                                         + list(positions)))
+        else:
+            postings[pos:pos] = array('I', (doc_id, len(positions)))
+            term_positions[start:start] = array('I', positions)
+        return
+
+    def add_document(self, url : str, words) -> int:
+        '''
+        Indexes all words of web page url.
+
+        Parameters
+        ----------
+        url : str
+            url of web page.
+        words : iterable of str
+            words of content of web page, normalized first by normalized index.
+
+        Returns
+        -------
+        int
+            document id of url.
+
+        '''
+        if self.normalize:
+            words = normalize_words(words)
+        doc_id = self.intern(url)
+        self.generation += 1
+        self.live_docs[doc_id] = 1
+        postings_lists = self.postings_lists
+        if self.positional:
+            term_positions = {}
+            position = -1
+            for position, word in enumerate(words):
+                word_positions = term_positions.get(word)
+                if word_positions is None:
+                    term_positions[word] = [position]
+                else:
+                    word_positions.append(position)
+            if self.updatable:
+                term_positions = self._record_terms(doc_id, term_positions)
+            for term, positions in term_positions.items():
+                self._add_positional_posting(term, doc_id, positions)
+            self.doc_lengths[doc_id] += position + 1
+            return doc_id
+        term_counts = Counter(words)
+        if self.updatable:
+            term_counts = self._record_terms(doc_id, term_counts)
+        # words of appended postings, add_posting counts its own words.
+        length = 0
+        for term, count in term_counts.items():
+            postings = postings_lists.get(term)
+            if postings is not None and postings[-2] < doc_id:
+                postings.extend((doc_id, count))
+                length += count
+            else:
+                self.add_posting(term, doc_id, count)
+        self.doc_lengths[doc_id] += length
+        return doc_id
+
+    def _record_terms(self, doc_id : int, term_values : dict) -> dict:
+        '''
+            Private function for internal purpose. Adds terms of document to
+            forward index, returns term_values keyed by interned terms.
+        '''
+        term_values = {sys.intern(term): value for term, value in term_values.items()}
+        old_terms = self.doc_terms[doc_id]
+        if old_terms:
+            self.doc_terms[doc_id] = tuple(dict.fromkeys(old_terms + tuple(term_values)))
+        else:
+            self.doc_terms[doc_id] = tuple(term_values)
+        return term_values
+
+    def remove_document(self, url : str) -> bool:
+        '''
+        Removes all postings (and positions) of web page url from updatable
+        index. Only postings lists of terms of the page are changed.
+
+        Parameters
+        ----------
+        url : str
+            url of web page.
+
+        Returns
+        -------
+        bool
+            True if page was indexed.
+
+        '''
+        if not self.updatable:
+            raise ValueError('documents can only be removed from updatable index')
+        doc_id = self.url_ids.get(url)
+        if doc_id is None or not self.live_docs[doc_id]:
+            return False
+        self.generation += 1
+        self.live_docs[doc_id] = 0
+        if self._position_offsets:
+            self._position_offsets.clear()
+        for term in self.doc_terms[doc_id]:
+            self._remove_posting(term, doc_id)
+        self.doc_terms[doc_id] = ()
+        self.doc_lengths[doc_id] = 0
+        return True
+
+    def _remove_posting(self, term : str, doc_id : int) -> None:
+        '''
+            Private function for internal purpose. Removes posting of doc_id
+            (and its positions) from postings of term.
+        '''
+        postings = self.postings_lists[term]
+        pairs = np.frombuffer(postings, dtype=np.uint32)
+        pos = 2 * int(np.searchsorted(pairs[0::2], doc_id))
+        start = int(pairs[1:pos:2].sum(dtype=np.int64))
+        count = int(pairs[pos + 1])
+        # numpy view must be released before array('I') is resized.
+        del pairs
+        del postings[pos:pos + 2]
+        if self.positional:
+            del self.positions_lists[term][start:start + count]
+        if not postings:
+            del self.postings_lists[term]
+            self.positions_lists.pop(term, None)
+        return
+
+    def postings(self, term : str) -> array:
+        '''
+        Returns postings of term, array('I') of [doc_id0, freq0, doc_id1, freq1, ...],
+        None if term is not indexed.
+        '''
+        return self.postings_lists.get(term)
+
+    def doc_ids(self, term : str) -> np.ndarray:
+        '''
+        Returns sorted document ids containing term as zero copy numpy view,
+        None if term is not indexed. View should not be kept while documents
+        are added, array('I') can not grow while its buffer is exported.
+        '''
+        postings = self.postings_lists.get(term)
+        if postings is None:
+            return None
+        return np.frombuffer(postings, dtype=np.uint32)[0::2]
+
+    def freqs(self, term : str) -> np.ndarray:
+        '''
+        Returns term frequencies aligned with doc_ids(term) as zero copy numpy
+        view, None if term is not indexed.
+        '''
+        postings = self.postings_lists.get(term)
+        if postings is None:
+            return None
+        return np.frombuffer(postings, dtype=np.uint32)[1::2]
+
+    def filter_doc_ids(self, term : str, doc_ids : np.ndarray) -> np.ndarray:
+        '''
+        Returns those of sorted document ids doc_ids which contain term. Cost
+        is O(len(doc_ids) * log(document frequency of term)), i.e., long
+        postings of common terms are only binary searched.
+
+        Parameters
+        ----------
+        term : str
+            keyword.
+        doc_ids : np.ndarray
+            sorted candidate document ids.
+
+        Returns
+        -------
+        np.ndarray
+            sorted uint32 document ids containing term.
+
+        '''
+        doc_ids = np.asarray(doc_ids, dtype=np.uint32)
+        postings = self.postings_lists.get(term)
+        if postings is None or len(doc_ids) == 0:
+            return doc_ids[:0]
+        term_doc_ids = np.frombuffer(postings, dtype=np.uint32)[0::2]
+        found = np.searchsorted(term_doc_ids, doc_ids)
+        found[found == len(term_doc_ids)] = 0
+        return doc_ids[term_doc_ids[found] == doc_ids]
+
+    def term_frequencies(self, term : str, doc_ids : np.ndarray) -> np.ndarray:
+        '''
+        Returns frequency of term in each of sorted document ids doc_ids, 0 for
+        documents without term. Postings are only binary searched.
+        '''
+        doc_ids = np.asarray(doc_ids, dtype=np.uint32)
+        result = np.zeros(len(doc_ids), dtype=np.uint32)
+        postings = self.postings_lists.get(term)
+        if postings is None or len(doc_ids) == 0:
+            return result
+        pairs = np.frombuffer(postings, dtype=np.uint32)
+        found = np.searchsorted(pairs[0::2], doc_ids)
+        found[found == len(pairs) // 2] = 0
+        present = pairs[0::2][found] == doc_ids
+        result[present] = pairs[1::2][found[present]]
+        return result
+
+    def positions(self, term : str, doc_ids : np.ndarray) -> tuple:
+        '''
+        Returns word positions of term in documents doc_ids of positional index.
+
+        Parameters
+        ----------
+        term : str
+            keyword.
+        doc_ids : np.ndarray
+            sorted document ids, every document must contain term
+            (e.g. result of filter_doc_ids).
+
+        Returns
+        -------
+        tuple (np.ndarray, np.ndarray)
+            (counts, positions), positions of i-th document are next counts[i]
+            entries of positions.
+
+        '''
+        if not self.positional:
+            raise ValueError('index has no word positions')
+        pairs = np.frombuffer(self.postings_lists[term], dtype=np.uint32)
+        found = np.searchsorted(pairs[0::2], doc_ids)
+        counts = pairs[1::2][found]
+        offsets = self._position_offsets.get(term)
+        if offsets is None:
+            offsets = self._position_offsets[term] = np.cumsum(pairs[1::2], dtype=np.int64) - pairs[1::2]
+        positions = np.frombuffer(self.positions_lists[term], dtype=np.uint32)
+        return counts, positions[range_indices(offsets[found], counts)]
+
+    def term_positions(self, term : str) -> array:
+        '''
+        Returns positions of term grouped by document in postings order,
+        None if index is not positional or term is not indexed.
+        '''
+        return self.positions_lists.get(term)
+
+    def document_frequency(self, term : str) -> int:
+        ''' Returns number of documents containing term. '''
+        postings = self.postings_lists.get(term)
+        return len(postings) // 2 if postings else 0
+
+    def document_frequencies(self) -> dict:
+        ''' Returns {term: number of documents containing term} of all terms. '''
+        return {term: len(postings) // 2 for term, postings in self.postings_lists.items()}
+
+    def lookup_urls(self, term : str) -> list:
+        '''
+        Returns urls of documents containing term in crawl order, None if
+        term is not indexed.
+        '''
+        postings = self.postings_lists.get(term)
+        if postings is None:
+            return None
+        urls = self.urls
+        return [urls[doc_id] for doc_id in postings[0::2]]
+
+    def url(self, doc_id : int) -> str:
+        ''' Returns url of document id. '''
+        return self.urls[doc_id]
+
+    def live_doc_ids(self) -> np.ndarray:
+        ''' Returns sorted uint32 document ids of documents which are not removed. '''
+        return np.flatnonzero(np.frombuffer(self.live_docs, dtype=np.uint8)).astype(np.uint32)
+
+    def terms(self):
+        ''' Returns iterator over indexed terms. '''
+        return iter(self.postings_lists)
+
+    def content_view(self) -> 'ContentIndexView':
+        ''' Returns read only {keyword: [url, ...]} view of index. '''
+        return ContentIndexView(self)
+
+    def __contains__(self, term : str) -> bool:
+        return term in self.postings_lists
+
+    def __len__(self) -> int:
+        return len(self.postings_lists)
+
+
+class ContentIndexView(Mapping):
+    '''
+    Read only dictionary view {keyword: [url, ...]} of InvertedIndex for
+    backward compatibility. Url lists are created on access.
+    '''
+    def __init__(self, inverted_index : InvertedIndex) -> None:
+        self.inverted_index = inverted_index
+        return
+
+    def __getitem__(self, term : str) -> list:
+        urls = self.inverted_index.lookup_urls(term)
+        if urls is None:
+            raise KeyError(term)
+        return urls
+
+    def __contains__(self, term) -> bool:
+        return term in self.inverted_index
+
+    def __iter__(self):
+        return self.inverted_index.terms()
+
+    def __len__(self) -> int:
+        return len(self.inverted_index)
@@ -0,0 +1,161 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://docs.python.org/3/library/re.html#writing-a-tokenizer
+
+
+My Notes:
+    Crawler used to find links with page.find('<a href=') and re-slice the rest
+    of page after every link, i.e., remaining page was copied for every link and
+    link extraction was O(n^2). Words were found by another pass (page.split()).
+
+    Page is walked once, from link to link, with a compiled regular expression
+    (search runs in C). Text between two links is split into words by str.split,
+    so python code runs once per link and not once per character or word. The
+    page is never re-sliced, every character is copied at most once.
+        1. Words are maximal runs of non whitespace characters, same words as
+           page.split(). A word touching a link (e.g. '<li><a' before link)
+           is joined across the segment boundary.
+        2. Links are <a ... href=...> values in double quotes, single quotes or
+           without quotes, with optional whitespace around '='.
+        3. Relative links are resolved against base_url (url of page).
+    Page can be str or bytes like object (bytes, bytearray, memoryview of bytes).
+    Bytes pages are decoded one segment at a time with given encoding, slicing
+    a memoryview does not copy.
+"""
+
+import re
+from urllib.parse import urljoin
+
+WORD = 0
+LINK = 1
+
+# tag and attribute names are matched case insensitively with character classes,
+# re.IGNORECASE makes searching whole page noticeably slower.
+_LINK_PATTERN = r'''<[aA]\s(?:[^>]*?\s)?[hH][rR][eE][fF]\s*=\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\s"'>]+))'''
+_LINK_RE       = re.compile(_LINK_PATTERN)
+_BYTES_LINK_RE = re.compile(_LINK_PATTERN.encode('ascii'))
+
+
+def _match_url(match, base_url : str, decode) -> str:
+    '''
+        Private function for internal purpose. Returns url of link match
+        resolved against base_url, None for empty or same page (#section) link.
+    '''
+    url = match.group('dq')
+    if url is None:
+        url = match.group('sq')
+    if url is None:
+        url = match.group('bare')
+    if decode:
+        url = decode(url)
+    url = url.strip()
+    # empty link and link to part of same page (#section) are not new pages.
+    if not url or url.startswith('#'):
+        return None
+    if base_url:
+        url = urljoin(base_url, url)
+    return url
+
+
+def _scan_segments(page, base_url : str, encoding : str):
+    '''
+        Private function for internal purpose. Yields (words, link) for every
+        link of page, words are words between previous link and this link.
+        Last item is (words, None) for words after last link.
+    '''
+    if isinstance(page, str):
+        link_re, decode = _LINK_RE, None
+    else:
+        link_re, decode = _BYTES_LINK_RE, lambda value: str(value, encoding, 'replace')
+
+    # partial word at end of previous segment, joined with first word of next one.
+    partial = ''
+    position = 0
+    for match in link_re.finditer(page):
+        end = match.end()
+        segment = page[position:end]
+        if decode:
+            segment = decode(segment)
+        words = segment.split()
+        if partial:
+            if segment[:1].isspace() or not words:
+                words.insert(0, partial)
+            else:
+                words[0] = partial + words[0]
+        # link ends with quote or url character, last word may continue after link.
+        partial = words.pop() if words else ''
+        position = end
+
+        yield words, _match_url(match, base_url, decode)
+
+    segment = page[position:]
+    if decode:
+        segment = decode(segment)
+    words = segment.split()
+    if partial:
+        if segment[:1].isspace() or not words:
+            words.insert(0, partial)
+        else:
+            words[0] = partial + words[0]
+    yield words, None
+    return
+
+
+def scan_page(page, base_url : str = None, encoding : str = 'utf-8'):
+    '''
+    Scans page once and yields its index words and links in page order.
+
+    Parameters
+    ----------
+    page : str or bytes like object
+        html content of page.
+    base_url : str
+        url of page, relative links are resolved against it. If None links
+        are returned as they are written in page.
+    encoding : str
+        encoding of page if page is bytes like object.
+
+    Yields
+    ------
+    tuple (int, str)
+        (WORD, word) for every whitespace separated word of page and
+        (LINK, url) for every hyper link of page.
+
+    '''
+    for words, url in _scan_segments(page, base_url, encoding):
+        for word in words:
+            yield (WORD, word)
+        if url:
+            yield (LINK, url)
+    return
+
+
+def extract_words_and_links(page, base_url : str = None, encoding : str = 'utf-8') -> tuple:
+    '''
+    Returns (words, links) of page from single scan, see scan_page.
+    '''
+    words, links = [], []
+    for segment_words, url in _scan_segments(page, base_url, encoding):
+        words += segment_words
+        if url:
+            links.append(url)
+    return words, links
+
+
+def extract_links(page, base_url : str = None, encoding : str = 'utf-8') -> list:
+    '''
+    Returns links of page (same links as extract_words_and_links) without
+    splitting page into words, used when words are indexed elsewhere
+    (sharded_indexer.py).
+    '''
+    if isinstance(page, str):
+        link_re, decode = _LINK_RE, None
+    else:
+        link_re, decode = _BYTES_LINK_RE, lambda value: str(value, encoding, 'replace')
+    links = []
+    for match in link_re.finditer(page):
+        url = _match_url(match, base_url, decode)
+        if url:
+            links.append(url)
+    return links
@@ -0,0 +1,180 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: http://www.cs.virginia.edu/~evans/cs101/
+           https://en.wikipedia.org/wiki/PageRank#Power_method
+
+
+My Notes:
+    Page rank computed by WebCrawler used to rescan out links of every node for
+    every page on every iteration, i.e., O(iterations * N^2 * outdegree).
+
+    Step1: Compile graph. Link graph ({url: [out links]}) is converted once into
+           integer indexed CSR (compressed sparse row) arrays.
+                indptr  : out links of node i are indices[indptr[i]:indptr[i+1]]
+                indices : destination node of each edge
+           Duplicate out links and out links to pages which are not in graph are
+           not edges, but they still count in out degree of source page (same as
+           original udacity algorithm).
+
+    Step2: Power iteration. One iteration is a single vectorised pass over edges
+                newrank = (1 - d) / N + sum(d * (rank[src] / outdegree[src])) over in links
+           which numpy evaluates with np.bincount. Teleport term is accumulated first
+           and in links in order of source node, i.e., same order of additions as
+           original algorithm, so ranks are bit for bit same as original.
+
+    Dangling pages (pages without out links) leak rank in the original algorithm.
+    When redistribute_dangling is enabled their rank is shared equally by all
+    pages, as a random surfer on a dead end types a new address. In this mode
+    out degree is number of distinct out links inside graph, so a page whose
+    links all leave crawled graph is dangling too and ranks always sum to 1.
+"""
+
+import numpy as np
+
+
+class PageRankEngine:
+    '''
+    Class PageRankEngine compiles link graph created by web crawler into CSR
+    adjacency arrays once and computes page ranks by vectorised power iteration.
+    '''
+    def __init__(self, graph : dict, damping_factor : float = 0.8,
+                 max_iterations : int = 10, tolerance : float = None,
+                 redistribute_dangling : bool = False) -> None:
+        '''
+        Constructor for page rank engine class
+
+            Parameters
+            ----------
+            graph : dict
+                link graph in format {url: [out link1, out link2, ...]}
+            damping_factor : float
+                probability that random surfer follows a link instead of typing
+                address in browser.
+            max_iterations : int
+                maximum number of power iterations.
+            tolerance : float
+                iteration stops once L1 change of rank vector between two
+                iterations is below tolerance. None runs max_iterations always.
+            redistribute_dangling : bool
+                share rank of pages without out links equally among all pages.
+
+            Returns
+            -------
+            None
+        '''
+        self.damping_factor        = damping_factor
+        self.max_iterations        = max_iterations
+        self.tolerance             = tolerance
+        self.redistribute_dangling = redistribute_dangling
+        # number of iterations performed by last call to compute.
+        self.iterations            = 0
+
+        self.pages   = list(graph)
+        self.node_id = {page: node for node, page in enumerate(self.pages)}
+        self._compile(graph)
+        return
+
+    def _compile(self, graph : dict):
+        '''
+            Private function for internal purpose. Converts link graph to CSR
+            arrays (indptr, indices) indexed by node id.
+
+        Parameters
+        ----------
+            graph : dict
+                link graph in format {url: [out link1, out link2, ...]}
+
+        Returns
+        -------
+            None.
+
+        '''
+        npages     = len(self.pages)
+        indptr     = np.zeros(npages + 1, dtype=np.int64)
+        out_degree = np.zeros(npages, dtype=np.float64)
+        indices    = []
+        for node, page in enumerate(self.pages):
+            out_links = graph[page]
+            out_degree[node] = len(out_links)
+            targets = {self.node_id[link] for link in out_links if link in self.node_id}
+            indices.extend(sorted(targets))
+            indptr[node + 1] = len(indices)
+
+        self.indptr     = indptr
+        self.indices    = np.asarray(indices, dtype=np.int64)
+        self.out_degree = out_degree
+        # source node of every edge, used to gather rank of source while iterating.
+        self.sources    = np.repeat(np.arange(npages, dtype=np.int64), np.diff(indptr))
+        # out degree and dangling pages when rank of dead ends is redistributed.
+        self.link_degree = np.diff(indptr).astype(np.float64)
+        self.dangling    = self.link_degree == 0
+        # bincount adds weights in order of bins given, teleport term for every node
+        # comes first followed by in links.
+        self.scatter    = np.concatenate([np.arange(npages, dtype=np.int64), self.indices])
+        return
+
+    def compute(self, initial_ranks : np.ndarray = None) -> np.ndarray:
+        '''
+        Runs power iteration on compiled graph.
+
+        Parameters
+        ----------
+        initial_ranks : np.ndarray
+            rank vector indexed by node id to start iteration from. If None
+            every page starts with rank 1/N.
+
+        Returns
+        -------
+        np.ndarray
+            rank of each page indexed by node id.
+
+        '''
+        npages = len(self.pages)
+        if npages == 0:
+            self.iterations = 0
+            return np.zeros(0, dtype=np.float64)
+
+        if initial_ranks is None:
+            ranks = np.full(npages, 1.0 / npages)
+        else:
+            ranks = np.array(initial_ranks, dtype=np.float64)
+
+        degree   = self.link_degree if self.redistribute_dangling else self.out_degree
+        teleport = np.full(npages, (1 - self.damping_factor) / npages)
+        self.iterations = 0
+        for _ in range(self.max_iterations):
+            flow = self.damping_factor * (ranks[self.sources] / degree[self.sources])
+            newranks = np.bincount(self.scatter, weights=np.concatenate([teleport, flow]),
+                                   minlength=npages)
+            if self.redistribute_dangling:
+                newranks += self.damping_factor * ranks[self.dangling].sum() / npages
+            delta = np.abs(newranks - ranks).sum()
+            ranks = newranks
+            self.iterations += 1
+            if self.tolerance is not None and delta < self.tolerance:
+                break
+        return ranks
+
+    def compute_ranks(self, initial_ranks : dict = None) -> dict:
+        '''
+        Same as compute, but takes and returns ranks as dictionary keyed by url.
+
+        Parameters
+        ----------
+        initial_ranks : dict
+            {url: rank} to start iteration from. Pages missing in dictionary
+            start with rank 1/N.
+
+        Returns
+        -------
+        dict
+            page rank for each webpage present in graph.
+
+        '''
+        start = None
+        if initial_ranks:
+            npages = len(self.pages)
+            start = np.array([initial_ranks.get(page, 1.0 / npages) for page in self.pages])
+        ranks = self.compute(start)
+        return dict(zip(self.pages, ranks.tolist()))
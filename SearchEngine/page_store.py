@@ -0,0 +1,344 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://developer.mozilla.org/en-US/docs/Web/HTTP/Conditional_requests
+           Manku, Jain and Das Sarma, Detecting near-duplicates for web crawling (SimHash)
+
+
+My Notes:
+    dummy_web_cache.get_page downloads every url again on every crawl and
+    recrawl, and mirror pages (same page on another host) are indexed again.
+
+    PageStore is on disk page store (sqlite3 table) keyed by url. For every
+    page it keeps content, ETag and Last-Modified headers, sha1 hash of
+    content and SimHash of its words:
+        1. Page already in store is fetched with conditional GET
+           (If-None-Match, If-Modified-Since). Server answers 304 Not Modified
+           without body and stored content is used.
+        2. Page whose content hash did not change is UNCHANGED, crawler skips
+           indexing it again on recrawl.
+        3. New or changed page is DUPLICATE if its SimHash differs in at most
+           max_distance (<= 3) of 64 bits from SimHash of another stored page,
+           exact copies have distance 0. Crawler drops duplicate pages before
+           they reach index.
+    SimHash: every distinct word of page votes +1 or -1 for each of 64 bits
+    of its hash, sign of sum is bit of SimHash. Similar pages share most words,
+    so their SimHashes differ in few bits. Words are not weighted by count,
+    otherwise common words ('the', 'a') decide most bits of every page.
+    Near duplicates are found without comparing with every page: SimHash is
+    split into 4 bands of 16 bits, pages differing in at most 3 bits have at
+    least one equal band (pigeonhole), so only pages with an equal band
+    (indexed columns) are compared.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+
+import numpy as np
+
+from link_extractor import extract_words_and_links
+
+NEW          = 'new'
+CHANGED      = 'changed'
+UNCHANGED    = 'unchanged'
+DUPLICATE    = 'duplicate'
+MISSING      = 'missing'
+
+SIMHASH_BITS = 64
+BANDS        = 4
+BAND_BITS    = SIMHASH_BITS // BANDS
+
+# status of fetch, content of page ('' if missing) and url of page it duplicates.
+FetchResult = namedtuple('FetchResult', ['url', 'status', 'content', 'duplicate_of'])
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS pages (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    content_hash  TEXT NOT NULL,
+    simhash       INTEGER NOT NULL,
+    band0         INTEGER,
+    band1         INTEGER,
+    band2         INTEGER,
+    band3         INTEGER,
+    duplicate_of  TEXT,
+    content       TEXT NOT NULL,
+    fetched       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_band0 ON pages (band0);
+CREATE INDEX IF NOT EXISTS pages_band1 ON pages (band1);
+CREATE INDEX IF NOT EXISTS pages_band2 ON pages (band2);
+CREATE INDEX IF NOT EXISTS pages_band3 ON pages (band3);
+'''
+
+
+def simhash(words) -> int:
+    '''
+    Returns 64 bit SimHash of words.
+
+    Parameters
+    ----------
+    words : iterable of str
+        words of page.
+
+    Returns
+    -------
+    int
+        SimHash, 0 for page without words.
+
+    '''
+    features = dict.fromkeys(words)
+    if not features:
+        return 0
+    hashes = np.frombuffer(b''.join(hashlib.blake2b(word.encode('utf-8', 'replace'),
+                                                    digest_size=8).digest()
+                                    for word in features), dtype='>u8')
+    # bits of every word hash, most significant bit first.
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1)
+    votes = (2 * bits.astype(np.int64) - 1).sum(axis=0)
+    return int.from_bytes(np.packbits(votes > 0).tobytes(), 'big')
+
+
+def hamming_distance(simhash1 : int, simhash2 : int) -> int:
+    ''' Returns number of bits in which two SimHashes differ. '''
+    return (simhash1 ^ simhash2).bit_count()
+
+
+def _bands(value : int) -> list:
+    ''' Private function for internal purpose. 16 bit bands of SimHash. '''
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (BAND_BITS * band)) & mask for band in range(BANDS)]
+
+
+def _to_signed(value : int) -> int:
+    ''' Private function for internal purpose. sqlite INTEGER is signed 64 bit. '''
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+
+class PageStore:
+    '''
+    Class PageStore fetches pages with conditional GET, keeps them in sqlite
+    database and detects unchanged and near duplicate pages.
+    '''
+    def __init__(self, path : str = ':memory:', opener = None, max_distance : int = 3,
+                 timeout : float = 30.0) -> None:
+        '''
+        Constructor for page store class
+
+            Parameters
+            ----------
+            path : str
+                sqlite database file, ':memory:' keeps pages only in memory.
+            opener : urllib.request.OpenerDirector
+                opener used to fetch pages, e.g. CacheHTTPServer.opener.
+                Default opener fetches from web.
+            max_distance : int
+                pages whose SimHashes differ in at most max_distance bits
+                (0 to 3) are duplicates, None disables duplicate detection.
+            timeout : float
+                seconds to wait for server.
+
+            Returns
+            -------
+            None
+        '''
+        if max_distance is not None and not 0 <= max_distance < BANDS:
+            raise ValueError('max_distance must be between 0 and %d' % (BANDS - 1))
+        self.path         = path
+        self.opener       = urllib.request.build_opener() if opener is None else opener
+        self.max_distance = max_distance
+        self.timeout      = timeout
+        # fetches by status, e.g. {'unchanged': 10, 'duplicate': 2}
+        self.counts       = {}
+        # fetches answered with 304 Not Modified.
+        self.not_modified = 0
+        # crawler may fetch from several threads (AsyncCrawler).
+        self._lock        = threading.Lock()
+        self._db          = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        return
+
+    def get(self, url : str) -> dict:
+        '''
+        Returns stored record of url as dictionary of pages columns, None if
+        url is not stored.
+        '''
+        with self._lock:
+            cursor = self._db.execute('SELECT * FROM pages WHERE url = ?', (url,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in cursor.description], row))
+
+    def is_duplicate(self, url : str) -> bool:
+        ''' Returns True if stored page url is near duplicate of another page. '''
+        with self._lock:
+            row = self._db.execute('SELECT duplicate_of FROM pages WHERE url = ?',
+                                   (url,)).fetchone()
+        return row is not None and row[0] is not None
+
+    def fetch(self, url : str) -> FetchResult:
+        '''
+        Fetches url with conditional GET if it is stored and updates store.
+
+        Parameters
+        ----------
+        url : str
+            url of page.
+
+        Returns
+        -------
+        FetchResult
+            (url, status, content, duplicate_of). status is NEW, CHANGED,
+            UNCHANGED, DUPLICATE (duplicate_of is url of original page) or
+            MISSING (content is '').
+
+        '''
+        record = self.get(url)
+        request = urllib.request.Request(url)
+        if record is not None:
+            if record['etag']:
+                request.add_header('If-None-Match', record['etag'])
+            if record['last_modified']:
+                request.add_header('If-Modified-Since', record['last_modified'])
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                content = response.read().decode()
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+        except urllib.error.HTTPError as error:
+            if error.code == 304 and record is not None:
+                with self._lock:
+                    self.not_modified += 1
+                    self._db.execute('UPDATE pages SET fetched = ? WHERE url = ?',
+                                     (time.time(), url))
+                    self._db.commit()
+                return self._result(url, UNCHANGED, record['content'], record['duplicate_of'])
+            if error.code in (404, 410):
+                self.remove(url)
+            return self._result(url, MISSING, '', None)
+        except Exception:
+            return self._result(url, MISSING, '', None)
+        return self.store(url, content, etag, last_modified)
+
+    def get_page(self, url : str) -> str:
+        '''
+        Fetches url through store, same contract as dummy_web_cache.get_page.
+        Returns html of page or empty string.
+        '''
+        return self.fetch(url).content
+
+    def store(self, url : str, content : str, etag : str = None,
+              last_modified : str = None) -> FetchResult:
+        '''
+        Stores content of url (fetched by fetch or elsewhere) unless its
+        content hash is unchanged, and checks whether it is near duplicate of
+        another stored page.
+
+        Parameters
+        ----------
+        url : str
+            url of page.
+        content : str
+            html of page.
+        etag : str
+            ETag header of response, used for next conditional GET.
+        last_modified : str
+            Last-Modified header of response, used for next conditional GET.
+
+        Returns
+        -------
+        FetchResult
+            (url, status, content, duplicate_of), status is NEW, CHANGED,
+            UNCHANGED or DUPLICATE.
+
+        '''
+        content_hash = hashlib.sha1(content.encode('utf-8', 'replace')).hexdigest()
+        record = self.get(url)
+        if record is not None and record['content_hash'] == content_hash:
+            with self._lock:
+                self._db.execute('UPDATE pages SET etag = ?, last_modified = ?, fetched = ? '
+                                 'WHERE url = ?', (etag, last_modified, time.time(), url))
+                self._db.commit()
+            return self._result(url, UNCHANGED, record['content'], record['duplicate_of'])
+        value = simhash(extract_words_and_links(content)[0])
+        duplicate_of = None
+        if self.max_distance is not None:
+            duplicate_of = self.find_duplicate(url, value)
+        # duplicates are not candidates for later pages, their originals are.
+        bands = _bands(value) if duplicate_of is None else [None] * BANDS
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                             (url, etag, last_modified, content_hash, _to_signed(value), *bands,
+                              duplicate_of, content, time.time()))
+            self._db.commit()
+        if duplicate_of is not None:
+            status = DUPLICATE
+        else:
+            status = NEW if record is None else CHANGED
+        return self._result(url, status, content, duplicate_of)
+
+    def find_duplicate(self, url : str, value : int) -> str:
+        '''
+        Returns url of stored page (other than url) whose SimHash differs from
+        value in at most max_distance bits, closest page first. None if there
+        is no such page.
+        '''
+        mask = (1 << SIMHASH_BITS) - 1
+        with self._lock:
+            rows = self._db.execute('SELECT url, simhash FROM pages WHERE '
+                                    '(band0 = ? OR band1 = ? OR band2 = ? OR band3 = ?) '
+                                    'AND url != ?', (*_bands(value), url)).fetchall()
+        best, best_distance = None, self.max_distance + 1
+        for other, other_value in rows:
+            distance = hamming_distance(value, other_value & mask)
+            if distance < best_distance:
+                best, best_distance = other, distance
+        return best
+
+    def remove(self, url : str) -> bool:
+        '''
+        Removes page url from store. Its duplicates are kept: first one
+        becomes original of the others.
+        '''
+        with self._lock:
+            removed = self._db.execute('DELETE FROM pages WHERE url = ?', (url,)).rowcount > 0
+            rows = self._db.execute('SELECT url, simhash FROM pages WHERE duplicate_of = ? '
+                                    'ORDER BY url', (url,)).fetchall()
+            if rows:
+                original, value = rows[0]
+                self._db.execute('UPDATE pages SET duplicate_of = NULL, band0 = ?, band1 = ?, '
+                                 'band2 = ?, band3 = ? WHERE url = ?',
+                                 (*_bands(value & ((1 << SIMHASH_BITS) - 1)), original))
+                self._db.execute('UPDATE pages SET duplicate_of = ? WHERE duplicate_of = ?',
+                                 (original, url))
+            self._db.commit()
+        return removed
+
+    def _result(self, url : str, status : str, content : str, duplicate_of : str) -> FetchResult:
+        ''' Private function for internal purpose. Counts fetch status. '''
+        with self._lock:
+            self.counts[status] = self.counts.get(status, 0) + 1
+        return FetchResult(url, status, content, duplicate_of)
+
+    def close(self) -> None:
+        ''' Closes database. '''
+        self._db.close()
+        return
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    def __enter__(self) -> 'PageStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+        return
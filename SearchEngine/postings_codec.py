@@ -0,0 +1,346 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://nlp.stanford.edu/IR-book/html/htmledition/postings-file-compression-1.html
+           Lemire and Boytsov, Decoding billions of integers per second through vectorization
+
+
+My Notes:
+    Memory of a large index is mostly postings. Index segment (index_segment.py)
+    stores postings of every term in blocks of SKIP_INTERVAL postings, every
+    block is encoded on its own by a pluggable postings codec, so query decodes
+    only blocks which may hold its candidate documents.
+
+    Block holds doc id gaps (difference from previous doc id) of its postings
+    followed by their term frequencies. First gap of a block is written as 0,
+    doc id of first posting is kept in skip table of segment.
+        raw   : uint32 gaps and frequencies, no compression, fastest decoding.
+        vbyte : varints, 7 bits in every byte, high bit says more bytes follow.
+                Small gaps of long postings need one byte instead of four.
+        for   : bit packed frame of reference. Gaps and frequencies of a block
+                are two frames, frame stores bit width w (uint8) and reference
+                (uint32, smallest value of frame) followed by value - reference
+                of every posting packed into w bits. Common term has small
+                gaps, e.g. 2 bits per gap instead of 8 bits of varint.
+    Encoding and decoding of many blocks are vectorised with numpy, bit
+    unpacking reads two uint64 words per value and shifts.
+"""
+
+import numpy as np
+
+from inverted_index import range_indices
+
+
+def varint_sizes(values : np.ndarray) -> np.ndarray:
+    ''' Returns number of bytes of varint of every value. '''
+    values = np.asarray(values, dtype=np.uint64)
+    nbytes = np.ones(len(values), dtype=np.int64)
+    for shift in (7, 14, 21, 28):
+        nbytes += values >= (1 << shift)
+    return nbytes
+
+
+def encode_varints(values : np.ndarray) -> bytes:
+    '''
+    Encodes unsigned integers as varints (7 bits per byte, high bit set on
+    every byte except last byte of a value).
+
+    Parameters
+    ----------
+    values : np.ndarray
+        unsigned integers less than 2**35.
+
+    Returns
+    -------
+    bytes
+        encoded values.
+
+    '''
+    values = np.asarray(values, dtype=np.uint64)
+    nbytes = varint_sizes(values)
+    ends = np.cumsum(nbytes)
+    starts = ends - nbytes
+    out = np.zeros(int(ends[-1]) if len(values) else 0, dtype=np.uint8)
+    for k in range(int(nbytes.max()) if len(values) else 0):
+        mask = nbytes > k
+        byte = (values[mask] >> np.uint64(7 * k)) & np.uint64(0x7f)
+        more = (nbytes[mask] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[mask] + k] = byte | more
+    return out.tobytes()
+
+
+def decode_varints(data : np.ndarray) -> np.ndarray:
+    '''
+    Decodes varints written by encode_varints.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        uint8 array of encoded values.
+
+    Returns
+    -------
+    np.ndarray
+        uint64 array of decoded values.
+
+    '''
+    if len(data) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    ends = np.flatnonzero((data & 0x80) == 0)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    # position of every byte inside its value.
+    position = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    parts = (data & 0x7f).astype(np.uint64) << (np.uint64(7) * position.astype(np.uint64))
+    return np.add.reduceat(parts, starts)
+
+
+def _frame_layout(sizes : np.ndarray) -> tuple:
+    '''
+        Private function for internal purpose. Returns (indices of gaps,
+        indices of frequencies) of blocks of sizes postings in block order
+        values [gaps of block 0, freqs of block 0, gaps of block 1, ...].
+    '''
+    sizes = np.asarray(sizes, dtype=np.int64)
+    block_starts = 2 * (np.cumsum(sizes) - sizes)
+    return range_indices(block_starts, sizes), range_indices(block_starts + sizes, sizes)
+
+
+class PostingsCodec:
+    '''
+    Class PostingsCodec is base class of postings codecs. Codec encodes and
+    decodes blocks of postings (doc id gaps and term frequencies).
+    '''
+    name     = None
+    # stored in segment header.
+    codec_id = None
+
+    def encode_blocks(self, gaps : np.ndarray, freqs : np.ndarray, sizes : np.ndarray) -> tuple:
+        '''
+        Encodes blocks of postings.
+
+        Parameters
+        ----------
+        gaps : np.ndarray
+            doc id gaps of all blocks one after other, first gap of every
+            block should be 0.
+        freqs : np.ndarray
+            term frequencies aligned with gaps.
+        sizes : np.ndarray
+            number of postings of every block.
+
+        Returns
+        -------
+        tuple (bytes, np.ndarray)
+            (encoded blocks, int64 number of bytes of every block). Encoded
+            data may end with padding which belongs to no block.
+
+        '''
+        sizes = np.asarray(sizes, dtype=np.int64)
+        gap_indices, freq_indices = _frame_layout(sizes)
+        values = np.empty(2 * len(gaps), dtype=np.uint64)
+        values[gap_indices] = gaps
+        values[freq_indices] = freqs
+        return self._encode(values, np.repeat(sizes, 2))
+
+    def decode_blocks(self, data : np.ndarray, starts : np.ndarray, ends : np.ndarray,
+                      sizes : np.ndarray) -> tuple:
+        '''
+        Decodes blocks of postings.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            uint8 encoded blocks (whole postings data of segment).
+        starts : np.ndarray
+            byte offset of every block to decode into data.
+        ends : np.ndarray
+            byte offset of end of every block.
+        sizes : np.ndarray
+            number of postings of every block.
+
+        Returns
+        -------
+        tuple (np.ndarray, np.ndarray)
+            (gaps, freqs) uint64 of all decoded blocks one after other.
+
+        '''
+        sizes = np.asarray(sizes, dtype=np.int64)
+        values = self._decode(data, np.asarray(starts, dtype=np.int64),
+                              np.asarray(ends, dtype=np.int64), sizes)
+        gap_indices, freq_indices = _frame_layout(sizes)
+        return values[gap_indices], values[freq_indices]
+
+    def _encode(self, values : np.ndarray, frame_sizes : np.ndarray) -> tuple:
+        ''' Private function for internal purpose. Implemented by codec. '''
+        raise NotImplementedError
+
+    def _decode(self, data : np.ndarray, starts : np.ndarray, ends : np.ndarray,
+                sizes : np.ndarray) -> np.ndarray:
+        ''' Private function for internal purpose. Implemented by codec. '''
+        raise NotImplementedError
+
+
+class RawCodec(PostingsCodec):
+    '''
+    Class RawCodec stores gaps and frequencies as uint32, no compression.
+    '''
+    name     = 'raw'
+    codec_id = 0
+
+    def _encode(self, values : np.ndarray, frame_sizes : np.ndarray) -> tuple:
+        ''' Private function for internal purpose. 4 bytes per value. '''
+        return values.astype('<u4').tobytes(), 8 * frame_sizes[0::2]
+
+    def _decode(self, data : np.ndarray, starts : np.ndarray, ends : np.ndarray,
+                sizes : np.ndarray) -> np.ndarray:
+        ''' Private function for internal purpose. Gathers uint32 values of blocks. '''
+        words = data[:len(data) - len(data) % 4].view('<u4')
+        return words[range_indices(starts // 4, 2 * sizes)].astype(np.uint64)
+
+
+class VByteCodec(PostingsCodec):
+    '''
+    Class VByteCodec stores gaps and frequencies as varints.
+    '''
+    name     = 'vbyte'
+    codec_id = 1
+
+    def _encode(self, values : np.ndarray, frame_sizes : np.ndarray) -> tuple:
+        ''' Private function for internal purpose. Varints of values. '''
+        if len(values) == 0:
+            return b'', np.zeros(0, dtype=np.int64)
+        block_starts = np.cumsum(frame_sizes[0::2] * 2) - frame_sizes[0::2] * 2
+        return encode_varints(values), np.add.reduceat(varint_sizes(values), block_starts)
+
+    def _decode(self, data : np.ndarray, starts : np.ndarray, ends : np.ndarray,
+                sizes : np.ndarray) -> np.ndarray:
+        ''' Private function for internal purpose. Decodes varints of blocks. '''
+        return decode_varints(data[range_indices(starts, ends - starts)])
+
+
+class BitPackedCodec(PostingsCodec):
+    '''
+    Class BitPackedCodec stores every frame (gaps or frequencies of a block)
+    as frame of reference bit packed into smallest bit width.
+    '''
+    name     = 'for'
+    codec_id = 2
+    # uint8 bit width and uint32 reference before packed values of frame.
+    HEADER_BYTES = 5
+
+    def _encode(self, values : np.ndarray, frame_sizes : np.ndarray) -> tuple:
+        ''' Private function for internal purpose. Bit packs every frame. '''
+        if len(values) == 0:
+            return b'', np.zeros(0, dtype=np.int64)
+        frame_starts = np.cumsum(frame_sizes) - frame_sizes
+        references = np.minimum.reduceat(values, frame_starts)
+        values = values - np.repeat(references, frame_sizes)
+        maxima = np.maximum.reduceat(values, frame_starts)
+        widths = np.zeros(len(frame_sizes), dtype=np.int64)
+        for shift in range(33):
+            widths += (maxima >> np.uint64(shift)) > 0
+        frame_bytes = self.HEADER_BYTES + (frame_sizes * widths + 7) // 8
+        frame_offsets = np.cumsum(frame_bytes) - frame_bytes
+        total = int(frame_bytes.sum())
+
+        # values are added into little endian uint64 words at their bit
+        # positions, value crossing a word boundary is split into two words.
+        # two spare words: decoder always reads word after value.
+        words = np.zeros((total + 7) // 8 + 2, dtype=np.uint64)
+        value_widths = np.repeat(widths, frame_sizes)
+        bits = (8 * np.repeat(frame_offsets + self.HEADER_BYTES, frame_sizes)
+                + (np.arange(len(values)) - np.repeat(frame_starts, frame_sizes)) * value_widths)
+        packed = value_widths > 0
+        bits, values, value_widths = bits[packed], values[packed], value_widths[packed]
+        word = bits >> 6
+        shift = (bits & 63).astype(np.uint64)
+        np.add.at(words, word, values << shift)
+        crossing = shift + value_widths.astype(np.uint64) > 64
+        np.add.at(words, word[crossing] + 1, values[crossing] >> (np.uint64(64) - shift[crossing]))
+
+        out = words.view(np.uint8)
+        out[frame_offsets] = widths
+        out[frame_offsets[:, None] + np.arange(1, 5)] = references.astype('<u4').view(np.uint8).reshape(-1, 4)
+        return out.tobytes(), frame_bytes.reshape(-1, 2).sum(axis=1)
+
+    def _decode(self, data : np.ndarray, starts : np.ndarray, ends : np.ndarray,
+                sizes : np.ndarray) -> np.ndarray:
+        ''' Private function for internal purpose. Unpacks frames of blocks. '''
+        # gaps frame starts at block start, frequencies frame right after it.
+        gap_widths = data[starts].astype(np.int64)
+        freq_starts = starts + self.HEADER_BYTES + (sizes * gap_widths + 7) // 8
+        frame_offsets = np.empty(2 * len(starts), dtype=np.int64)
+        frame_offsets[0::2] = starts
+        frame_offsets[1::2] = freq_starts
+        frame_sizes = np.repeat(sizes, 2)
+        widths = data[frame_offsets].astype(np.int64)
+        references = np.zeros(len(frame_offsets), dtype=np.uint64)
+        for byte in range(4):
+            references |= data[frame_offsets + 1 + byte].astype(np.uint64) << np.uint64(8 * byte)
+
+        # bit position of every value: frame start after header plus width
+        # times position of value inside frame.
+        value_widths = np.repeat(widths, frame_sizes)
+        frame_starts = np.cumsum(frame_sizes) - frame_sizes
+        bits = (np.repeat(8 * (frame_offsets + self.HEADER_BYTES) - frame_starts * widths, frame_sizes)
+                + np.arange(len(value_widths)) * value_widths)
+        words = data[:len(data) - len(data) % 8].view('<u8')
+        word = bits >> 6
+        shift = (bits & 63).astype(np.uint64)
+        # numpy shift by 64 gives 0, so value inside one word gets no high part.
+        values = (words[word] >> shift) | (words[word + 1] << (np.uint64(64) - shift))
+        masks = (np.uint64(1) << widths.astype(np.uint64)) - np.uint64(1)
+        values &= np.repeat(masks, frame_sizes)
+        values += np.repeat(references, frame_sizes)
+        return values
+
+
+CODECS = {codec.name: codec for codec in (RawCodec(), VByteCodec(), BitPackedCodec())}
+_CODECS_BY_ID = {codec.codec_id: codec for codec in CODECS.values()}
+
+
+def get_codec(codec) -> PostingsCodec:
+    '''
+    Returns postings codec by name ('raw', 'vbyte', 'for'), codec id or codec
+    itself. Raises ValueError for unknown codec.
+    '''
+    if isinstance(codec, PostingsCodec):
+        return codec
+    found = _CODECS_BY_ID.get(codec) if isinstance(codec, int) else CODECS.get(codec)
+    if found is None:
+        raise ValueError('unknown postings codec %r, known codecs %s' % (codec, sorted(CODECS)))
+    return found
+
+
+if __name__ == '__main__':
+    # every codec must decode what it encoded, for any block and any subset of blocks.
+    rng = np.random.default_rng(14)
+    values = np.concatenate([rng.integers(0, 1 << bits, size=200, dtype=np.uint64)
+                             for bits in (1, 7, 8, 14, 21, 28, 32, 35)])
+    assert np.array_equal(decode_varints(np.frombuffer(encode_varints(values), dtype=np.uint8)), values)
+    sizes = np.concatenate([[1, 1, 2], rng.integers(1, 129, size=300)])
+    total = int(sizes.sum())
+    block_firsts = np.cumsum(sizes) - sizes
+    # small gaps of common terms, large gaps of rare terms and 32 bit extremes.
+    gaps = np.where(rng.random(total) < 0.8, rng.integers(1, 4, size=total),
+                    rng.integers(1, 1 << 32, size=total)).astype(np.uint64)
+    gaps[block_firsts] = 0
+    freqs = rng.integers(1, 1 << int(rng.integers(1, 17)), size=total).astype(np.uint64)
+    freqs[-1] = (1 << 32) - 1
+    for name, codec in CODECS.items():
+        assert get_codec(name) is codec and get_codec(codec.codec_id) is codec
+        data, block_bytes = codec.encode_blocks(gaps, freqs, sizes)
+        data = np.frombuffer(data, dtype=np.uint8)
+        ends = np.cumsum(block_bytes)
+        starts = ends - block_bytes
+        decoded_gaps, decoded_freqs = codec.decode_blocks(data, starts, ends, sizes)
+        assert np.array_equal(decoded_gaps, gaps) and np.array_equal(decoded_freqs, freqs), name
+        blocks = np.sort(rng.choice(len(sizes), size=50, replace=False))
+        postings = range_indices(block_firsts[blocks], sizes[blocks])
+        decoded_gaps, decoded_freqs = codec.decode_blocks(data, starts[blocks], ends[blocks],
+                                                          sizes[blocks])
+        assert np.array_equal(decoded_gaps, gaps[postings]), name
+        assert np.array_equal(decoded_freqs, freqs[postings]), name
+        print('%-5s codec round trip ok, %d postings in %d bytes' % (name, total, ends[-1]))
@@ -0,0 +1,144 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://docs.python.org/3/library/collections.html#ordereddict-examples-and-recipes
+
+
+My Notes:
+    Query traffic is skewed, few hundred keywords are most of requests, so
+    results of recent queries are kept and returned without searching again.
+
+    QueryCache is an LRU cache over OrderedDict bounded by approximate size
+    of keys and results in bytes (sys.getsizeof of result and its urls):
+        1. Hit moves entry to end, new entry is added at end and entries are
+           evicted from front (least recently used) until size fits.
+        2. Every lookup passes generation of index and ranks. When generation
+           changes (index or ranks rebuilt) all entries are dropped at once.
+        3. hits, misses, evictions and invalidations are counted (stats()) to
+           size cache in production.
+    Results are stored as tuples, so callers can not change cached results.
+"""
+
+import sys
+from collections import OrderedDict
+
+
+def result_size(key, value) -> int:
+    ''' Returns approximate bytes of cache entry, key and result with its strings. '''
+    size = sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key)
+    size += sys.getsizeof(value)
+    if isinstance(value, tuple):
+        size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+class QueryCache:
+    '''
+    Class QueryCache keeps results of recent queries, evicting least recently
+    used results beyond max_bytes.
+    '''
+    def __init__(self, max_bytes : int = 16 * 2**20) -> None:
+        '''
+        Constructor for query cache class
+
+            Parameters
+            ----------
+            max_bytes : int
+                limit of approximate size of cached keys and results.
+
+            Returns
+            -------
+            None
+        '''
+        self.max_bytes     = max_bytes
+        self.generation    = None
+        self.bytes         = 0
+        self.hits          = 0
+        self.misses        = 0
+        self.evictions     = 0
+        self.invalidations = 0
+        # key -> (result, size), least recently used first.
+        self._entries      = OrderedDict()
+        return
+
+    def _check_generation(self, generation) -> None:
+        '''
+            Private function for internal purpose. Drops all entries when
+            index or ranks changed since they were cached.
+        '''
+        if generation != self.generation:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+                self.bytes = 0
+            self.generation = generation
+        return
+
+    def get(self, key : tuple, generation, default = None):
+        '''
+        Returns cached result of key, default if key is not cached.
+
+        Parameters
+        ----------
+        key : tuple
+            normalized query key.
+        generation : hashable
+            current generation of index and ranks.
+        default : object
+            returned on miss.
+
+        Returns
+        -------
+        object
+            cached result or default.
+
+        '''
+        self._check_generation(generation)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key : tuple, generation, value) -> None:
+        '''
+        Caches result of key computed for generation. Result larger than
+        max_bytes is not cached.
+        '''
+        self._check_generation(generation)
+        size = result_size(key, value)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+        return
+
+    def clear(self) -> None:
+        ''' Drops all entries, counters are kept. '''
+        self._entries.clear()
+        self.bytes = 0
+        return
+
+    def stats(self) -> dict:
+        ''' Returns counters and size of cache. '''
+        lookups = self.hits + self.misses
+        return {'entries'       : len(self._entries),
+                'bytes'         : self.bytes,
+                'max_bytes'     : self.max_bytes,
+                'hits'          : self.hits,
+                'misses'        : self.misses,
+                'hit_ratio'     : self.hits / lookups if lookups else 0.0,
+                'evictions'     : self.evictions,
+                'invalidations' : self.invalidations}
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,219 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://docs.python.org/3/library/http.client.html
+
+
+My Notes:
+    Load generator for query server (query_server.py). Queries per second and
+    latency percentiles are measured from client side:
+        1. Query mix is built from terms of index segment, keywords are
+           picked with Zipfian skew over terms sorted by document frequency
+           (few popular keywords are most of traffic, like real query logs).
+        2. concurrency client threads send requests over keep alive
+           connections (http.client) until requests are sent or duration
+           seconds passed, every request latency is kept.
+        3. Report has qps and p50/p90/p99 of every endpoint.
+    Run it in another process than server, otherwise client threads take GIL
+    from server.
+
+    usage: python query_load_generator.py http://127.0.0.1:8000 --index index.seg
+               --concurrency 16 --duration 10
+"""
+
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+from index_segment import IndexSegment
+
+# share of every endpoint in query mix.
+QUERY_MIX = {'lookup': 0.3, 'lucky': 0.2, 'ordered': 0.2, 'search': 0.2, 'autocomplete': 0.1}
+
+
+def make_queries(terms : list, nqueries : int = 10000, mix : dict = None, k : int = 10,
+                 seed : int = 5) -> list:
+    '''
+    Creates query mix over terms.
+
+    Parameters
+    ----------
+    terms : list
+        keywords, most popular first (e.g. sorted by document frequency).
+    nqueries : int
+        number of queries.
+    mix : dict
+        {endpoint: share}, QUERY_MIX if None.
+    k : int
+        number of results asked by ordered, search and autocomplete.
+    seed : int
+        random seed.
+
+    Returns
+    -------
+    list
+        request paths, e.g. '/search?q=hummus+recipe&k=10'.
+
+    '''
+    mix = QUERY_MIX if mix is None else mix
+    rng = random.Random(seed)
+    weights = 1.0 / np.arange(1, len(terms) + 1)
+    picks = iter(rng.choices(terms, cum_weights=np.cumsum(weights).tolist(), k=3 * nqueries))
+    endpoints = rng.choices(list(mix), weights=list(mix.values()), k=nqueries)
+    paths = []
+    for endpoint in endpoints:
+        keyword = next(picks)
+        if endpoint in ('lookup', 'search') and rng.random() < 0.5:
+            operator = ' AND ' if endpoint == 'lookup' else ' '
+            query = keyword + operator + next(picks)
+        elif endpoint == 'autocomplete':
+            query = keyword[:rng.randint(1, max(1, min(4, len(keyword))))]
+        else:
+            query = keyword
+        path = '/%s?q=%s' % (endpoint, quote(query))
+        if endpoint in ('ordered', 'search', 'autocomplete'):
+            path += '&k=%d' % k
+        paths.append(path)
+    return paths
+
+
+def index_terms(index_path : str, nterms : int = 2000) -> list:
+    ''' Returns nterms most frequent terms of index segment, most frequent first. '''
+    segment = IndexSegment(index_path)
+    frequencies = segment.document_frequencies()
+    segment.close()
+    return sorted(frequencies, key=frequencies.get, reverse=True)[:nterms]
+
+
+def run_load(address : str, paths : list, concurrency : int = 16, requests : int = None,
+             duration : float = None, timeout : float = 30.0) -> dict:
+    '''
+    Sends requests to query server from concurrency threads.
+
+    Parameters
+    ----------
+    address : str
+        server address, e.g. 'http://127.0.0.1:8000'.
+    paths : list
+        request paths (make_queries), used round robin.
+    concurrency : int
+        number of client threads, each with its own keep alive connection.
+    requests : int
+        number of requests to send, len(paths) if both requests and
+        duration are None.
+    duration : float
+        seconds to send requests for.
+    timeout : float
+        seconds to wait for a response.
+
+    Returns
+    -------
+    dict
+        {'requests', 'errors', 'seconds', 'qps', 'endpoints': {endpoint:
+        {'count', 'mean_ms', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms'}}}.
+
+    '''
+    if requests is None and duration is None:
+        requests = len(paths)
+    url = urlsplit(address)
+    lock = threading.Lock()
+    counter = iter(range(requests)) if requests is not None else iter(int, 1)
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    start = time.perf_counter()
+    deadline = None if duration is None else start + duration
+
+    def client(number : int) -> None:
+        connection = http.client.HTTPConnection(url.hostname, url.port, timeout=timeout)
+        position = number
+        while deadline is None or time.perf_counter() < deadline:
+            with lock:
+                if next(counter, None) is None:
+                    break
+            path = paths[position % len(paths)]
+            position += concurrency
+            sent = time.perf_counter()
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors[number] += 1
+            except (OSError, http.client.HTTPException):
+                errors[number] += 1
+                connection.close()
+                connection = http.client.HTTPConnection(url.hostname, url.port, timeout=timeout)
+                continue
+            latencies[number].append((path, time.perf_counter() - sent))
+        connection.close()
+        return
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    by_endpoint = {}
+    for client_latencies in latencies:
+        for path, latency in client_latencies:
+            by_endpoint.setdefault(path[1:path.index('?')], []).append(latency)
+    endpoints = {}
+    for endpoint, values in sorted(by_endpoint.items()):
+        values = np.array(values) * 1e3
+        endpoints[endpoint] = {'count'  : len(values),
+                               'mean_ms': round(float(values.mean()), 4),
+                               'p50_ms' : round(float(np.percentile(values, 50)), 4),
+                               'p90_ms' : round(float(np.percentile(values, 90)), 4),
+                               'p99_ms' : round(float(np.percentile(values, 99)), 4),
+                               'max_ms' : round(float(values.max()), 4)}
+    answered = sum(len(client_latencies) for client_latencies in latencies)
+    all_latencies = np.array([latency for client_latencies in latencies
+                              for _, latency in client_latencies]) * 1e3
+    return {'requests' : answered,
+            'errors'   : sum(errors),
+            'seconds'  : round(seconds, 3),
+            'qps'      : round(answered / seconds, 1) if seconds > 0 else 0.0,
+            'p99_ms'   : round(float(np.percentile(all_latencies, 99)), 4) if answered else None,
+            'endpoints': endpoints}
+
+
+def print_report(report : dict) -> None:
+    ''' Prints report of run_load. '''
+    print('%d requests (%d errors) in %.2fs: %.1f queries/sec, p99 %s ms'
+          % (report['requests'], report['errors'], report['seconds'], report['qps'],
+             report['p99_ms']))
+    for endpoint, stats in report['endpoints'].items():
+        print('  %-12s %6d requests  mean %8.3f ms  p50 %8.3f ms  p90 %8.3f ms  p99 %8.3f ms'
+              % (endpoint, stats['count'], stats['mean_ms'], stats['p50_ms'],
+                 stats['p90_ms'], stats['p99_ms']))
+    return
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='load generator for query server')
+    parser.add_argument('address', help='query server address, e.g. http://127.0.0.1:8000')
+    parser.add_argument('--index', required=True, help='index segment served, source of keywords')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=None)
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help='seconds to send requests for, ignored if --requests is given')
+    parser.add_argument('--server-stats', action='store_true',
+                        help='also print latency histograms reported by server')
+    args = parser.parse_args()
+    paths = make_queries(index_terms(args.index))
+    print_report(run_load(args.address, paths, args.concurrency, args.requests,
+                          None if args.requests else args.duration))
+    if args.server_stats:
+        url = urlsplit(args.address)
+        connection = http.client.HTTPConnection(url.hostname, url.port)
+        connection.request('GET', '/stats')
+        print(json.dumps(json.loads(connection.getresponse().read()), indent=2))
+        connection.close()
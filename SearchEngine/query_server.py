@@ -0,0 +1,481 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://docs.python.org/3/library/http.server.html
+           https://docs.python.org/3/library/os.html#os.fork
+
+
+My Notes:
+    Search engine could only be queried by running text_search_engine.py as a
+    script. QueryServer loads saved index segment (MySeachEngine.save_index)
+    once and answers queries over HTTP with JSON:
+        GET /lookup?q=Hummus+AND+recipe        urls in crawl order
+        GET /lucky?q=Hummus                    best rank url
+        GET /ordered?q=Hummus&k=10             urls best rank first
+        GET /search?q=hummus+recipe&k=10       urls by BM25 + page rank
+        GET /autocomplete?q=hum&k=10           terms starting with prefix
+        GET /stats                             latency histograms of endpoints
+    Malformed query gets 400 with error message.
+
+    Request threads of ThreadingHTTPServer do not query engine themselves,
+    search engine is not thread safe (query cache, rank sorted postings) and
+    threads would only fight for GIL. Requests are queued to QueryBatcher:
+        1. One batcher thread takes all queued requests (up to max_batch,
+           waiting batch_wait seconds for more) as one batch.
+        2. Same query asked by several clients is executed once per batch and
+           its result is sent to all of them, e.g. burst of a popular query.
+    Pre-forked workers (workers > 0): index is loaded and listening socket is
+    opened in parent, then workers are forked and all accept connections on
+    same socket. Index segment is memory mapped, so workers share its pages
+    through page cache instead of holding copies, and queries run on all cores.
+
+    Latency (request received to response sent) of every endpoint is kept in
+    a histogram with 4 buckets per doubling from 10 us to 10 s, so percentile
+    error is below 19%. Failed requests (400 and 500) are recorded too, so slow
+    failures show in percentiles, and are also counted per status. Histograms
+    are in shared memory, /stats of any worker reports all workers.
+
+    usage: python query_server.py index.seg --port 8000 --workers 4
+           python query_load_generator.py http://127.0.0.1:8000 --index index.seg
+"""
+
+import argparse
+import bisect
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from text_search_engine import MySeachEngine
+
+# endpoint -> (search engine method, takes k).
+ENDPOINTS = {
+    'lookup'      : ('lookup', False),
+    'lucky'       : ('lucky_search', False),
+    'ordered'     : ('ordered_search', True),
+    'search'      : ('search', True),
+    'autocomplete': ('autocomplete', True),
+}
+
+
+class LatencyHistograms:
+    '''
+    Class LatencyHistograms keeps log scale latency histogram of every
+    endpoint in shared memory, so forked workers record into same histograms.
+    '''
+    # upper bounds of buckets in seconds, last bucket is everything slower.
+    BOUNDS = [1e-5 * 2 ** (i / 4) for i in range(81)]
+    # error statuses counted per endpoint.
+    STATUSES = (400, 500)
+
+    def __init__(self, endpoints) -> None:
+        '''
+        Constructor for latency histograms class
+
+            Parameters
+            ----------
+            endpoints : iterable of str
+                names of endpoints.
+
+            Returns
+            -------
+            None
+        '''
+        self.endpoints = list(endpoints)
+        # row of endpoint: count of every bucket, count of every error status,
+        # sum of latencies, max latency.
+        self._width  = len(self.BOUNDS) + len(self.STATUSES) + 3
+        self._shared = multiprocessing.RawArray('d', len(self.endpoints) * self._width)
+        self._values = np.frombuffer(self._shared, dtype=np.float64).reshape(len(self.endpoints), -1)
+        self._rows   = {endpoint: row for row, endpoint in enumerate(self.endpoints)}
+        self._lock   = multiprocessing.Lock()
+        return
+
+    def record(self, endpoint : str, seconds : float, status : int = 200) -> None:
+        ''' Adds latency of one request of endpoint answered with status. '''
+        row = self._values[self._rows[endpoint]]
+        bucket = bisect.bisect_left(self.BOUNDS, seconds)
+        with self._lock:
+            row[bucket] += 1
+            if status in self.STATUSES:
+                row[len(self.BOUNDS) + 1 + self.STATUSES.index(status)] += 1
+            row[-2] += seconds
+            if seconds > row[-1]:
+                row[-1] = seconds
+        return
+
+    def stats(self) -> dict:
+        '''
+        Returns {endpoint: {'count', 'mean_ms', 'p50_ms', 'p90_ms', 'p99_ms',
+        'max_ms', 'errors', 'buckets'}} of endpoints with requests, latencies
+        include failed requests. Percentiles are upper bounds of buckets,
+        errors are {status: count}, buckets are {upper bound in ms: count}.
+        '''
+        with self._lock:
+            values = self._values.copy()
+        stats = {}
+        for endpoint, row in zip(self.endpoints, values):
+            counts = row[:len(self.BOUNDS) + 1]
+            count = int(counts.sum())
+            if count == 0:
+                continue
+            cumulative = np.cumsum(counts)
+            percentiles = {}
+            for percent in (50, 90, 99):
+                bucket = int(np.searchsorted(cumulative, count * percent / 100.0))
+                # slowest bucket has no upper bound, max latency is reported.
+                bound = self.BOUNDS[bucket] if bucket < len(self.BOUNDS) else row[-1]
+                percentiles['p%d_ms' % percent] = round(min(bound, row[-1]) * 1e3, 4)
+            stats[endpoint] = {'count'  : count,
+                               'mean_ms': round(row[-2] / count * 1e3, 4),
+                               **percentiles,
+                               'max_ms' : round(row[-1] * 1e3, 4),
+                               'errors' : {str(status): int(row[len(self.BOUNDS) + 1 + i])
+                                           for i, status in enumerate(self.STATUSES)},
+                               'buckets': {('%.4f' % (self.BOUNDS[i] * 1e3)
+                                            if i < len(self.BOUNDS) else 'inf'): int(counts[i])
+                                           for i in np.flatnonzero(counts).tolist()}}
+        return stats
+
+    def reset(self) -> None:
+        ''' Clears all histograms. '''
+        with self._lock:
+            self._values[:] = 0
+        return
+
+
+class _Pending:
+    ''' Query waiting in QueryBatcher, answered by batcher thread. '''
+    __slots__ = ('key', 'done', 'result', 'error')
+
+    def __init__(self, key : tuple) -> None:
+        self.key    = key
+        self.done   = threading.Event()
+        self.result = None
+        self.error  = None
+        return
+
+
+class QueryBatcher:
+    '''
+    Class QueryBatcher runs queries of many request threads on one thread in
+    batches, executing every distinct query of a batch once.
+    '''
+    def __init__(self, engine : MySeachEngine, max_batch : int = 64,
+                 batch_wait : float = 0.0) -> None:
+        '''
+        Constructor for query batcher class
+
+            Parameters
+            ----------
+            engine : MySeachEngine
+                search engine answering queries.
+            max_batch : int
+                maximum number of requests of one batch.
+            batch_wait : float
+                seconds to wait for more requests after first request of a
+                batch, 0 takes only requests already queued.
+
+            Returns
+            -------
+            None
+        '''
+        if max_batch < 1:
+            raise ValueError('max_batch must be positive')
+        self.engine     = engine
+        self.max_batch  = max_batch
+        self.batch_wait = batch_wait
+        # counters: batches run, requests answered, distinct queries executed.
+        self.batches    = 0
+        self.requests   = 0
+        self.executed   = 0
+        self._queue     = queue.SimpleQueue()
+        self._thread    = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return
+
+    def submit(self, endpoint : str, *args):
+        '''
+        Runs query on batcher thread and returns its result, exception of
+        query (e.g. ValueError of malformed query) is raised here.
+
+        Parameters
+        ----------
+        endpoint : str
+            endpoint name of ENDPOINTS.
+        *args
+            arguments of search engine method, e.g. (query, k).
+
+        Returns
+        -------
+        result of search engine method.
+
+        '''
+        pending = _Pending((endpoint, args))
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _run(self) -> None:
+        ''' Private function for internal purpose. Batcher thread loop. '''
+        while True:
+            pending = self._queue.get()
+            if pending is None:
+                return
+            batch = [pending]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.max_batch:
+                try:
+                    timeout = deadline - time.monotonic()
+                    pending = (self._queue.get(timeout=timeout) if timeout > 0
+                               else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+                if pending is None:
+                    self._queue.put(None)
+                    break
+                batch.append(pending)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch : list) -> None:
+        ''' Private function for internal purpose. Executes distinct queries of batch. '''
+        waiting = {}
+        for pending in batch:
+            waiting.setdefault(pending.key, []).append(pending)
+        for (endpoint, args), waiters in waiting.items():
+            result = error = None
+            try:
+                result = getattr(self.engine, ENDPOINTS[endpoint][0])(*args)
+            except Exception as exception:
+                error = exception
+            for pending in waiters:
+                pending.result, pending.error = result, error
+                pending.done.set()
+        self.batches  += 1
+        self.requests += len(batch)
+        self.executed += len(waiting)
+        return
+
+    def stats(self) -> dict:
+        ''' Returns batches, requests and executed counters of this process. '''
+        return {'batches': self.batches, 'requests': self.requests, 'executed': self.executed}
+
+    def close(self) -> None:
+        ''' Stops batcher thread after queued requests. '''
+        self._queue.put(None)
+        self._thread.join()
+        return
+
+
+class _QueryRequestHandler(BaseHTTPRequestHandler):
+    ''' Answers query endpoints of QueryServer with JSON. '''
+    # keep alive connections, load generator sends many requests on one connection.
+    protocol_version = 'HTTP/1.1'
+    # headers and body are separate writes, Nagle's algorithm would hold body
+    # until client acknowledges headers (delayed ACK, about 40 ms).
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server.query_server
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        endpoint = url.path.strip('/')
+        if endpoint == 'stats':
+            self._send_json(200, server.stats())
+            return
+        if endpoint not in ENDPOINTS:
+            self._send_json(404, {'error': 'unknown endpoint %r, endpoints are %s'
+                                           % (endpoint, sorted(ENDPOINTS) + ['stats'])})
+            return
+        params = parse_qs(url.query)
+        query = params.get('q', [''])[0]
+        args = (query,)
+        status = 200
+        try:
+            if ENDPOINTS[endpoint][1] and 'k' in params:
+                args = (query, int(params['k'][0]))
+            body = {'endpoint': endpoint, 'query': query,
+                    'results': server.batcher.submit(endpoint, *args)}
+        except ValueError as error:
+            status, body = 400, {'error': str(error)}
+        except Exception as error:
+            status, body = 500, {'error': '%s: %s' % (type(error).__name__, error)}
+        try:
+            self._send_json(status, body)
+        finally:
+            # failed and slow requests count in latency of endpoint too.
+            server.histograms.record(endpoint, time.perf_counter() - start, status)
+        return
+
+    def _send_json(self, status : int, value) -> None:
+        ''' Private function for internal purpose. Sends value as JSON response. '''
+        body = json.dumps(value).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return
+
+    def log_message(self, format, *args):
+        # keep benchmark output clean.
+        return
+
+
+class _ThreadingHTTPServer(ThreadingHTTPServer):
+    # default backlog of 5 refuses connections of load generator.
+    request_queue_size = 1024
+
+
+class QueryServer:
+    '''
+    Class QueryServer serves queries over saved index segment with HTTP and
+    JSON, in this process or in pre-forked worker processes.
+    '''
+    def __init__(self, index_path : str, host : str = '127.0.0.1', port : int = 0,
+                 workers : int = 0, max_batch : int = 64, batch_wait : float = 0.0) -> None:
+        '''
+        Constructor for query server class. Index is loaded and socket is
+        opened here, serving starts with start() or serve_forever().
+
+            Parameters
+            ----------
+            index_path : str
+                index segment file written by MySeachEngine.save_index.
+            host : str
+                address to listen on.
+            port : int
+                port to listen on, 0 picks a free port.
+            workers : int
+                0 serves in this process, otherwise number of forked worker
+                processes (needs os.fork, e.g. linux).
+            max_batch : int
+                maximum number of requests executed as one batch.
+            batch_wait : float
+                seconds batcher waits for more requests of a batch.
+
+            Returns
+            -------
+            None
+        '''
+        if workers and not hasattr(os, 'fork'):
+            raise ValueError('pre-forked workers need os.fork, use workers=0')
+        self.index_path = index_path
+        self.workers    = workers
+        self.max_batch  = max_batch
+        self.batch_wait = batch_wait
+        self.engine     = MySeachEngine.from_index(index_path)
+        self.histograms = LatencyHistograms(ENDPOINTS)
+        # batcher is created in serving process, threads do not survive fork.
+        self.batcher    = None
+        self.httpd      = _ThreadingHTTPServer((host, port), _QueryRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.query_server = self
+        self.address    = 'http://%s:%d' % (host, self.httpd.server_address[1])
+        self._pids      = []
+        self._thread    = None
+        return
+
+    def stats(self) -> dict:
+        '''
+        Returns latency histograms of all workers, batch counters of this
+        process and its pid.
+        '''
+        return {'pid'       : os.getpid(),
+                'workers'   : self.workers,
+                'batcher'   : self.batcher.stats() if self.batcher else {},
+                'endpoints' : self.histograms.stats()}
+
+    def start(self) -> 'QueryServer':
+        ''' Starts serving in background thread (workers=0) or forks workers. '''
+        if not self.workers:
+            self.batcher = QueryBatcher(self.engine, self.max_batch, self.batch_wait)
+            self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+            self._thread.start()
+            return self
+        for _ in range(self.workers):
+            pid = os.fork()
+            if pid == 0:
+                self._serve_worker()
+            self._pids.append(pid)
+        return self
+
+    def _serve_worker(self) -> None:
+        ''' Private function for internal purpose. Worker process, never returns. '''
+        status = 0
+        try:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            self.batcher = QueryBatcher(self.engine, self.max_batch, self.batch_wait)
+            self.httpd.serve_forever()
+        except BaseException:
+            status = 1
+        finally:
+            os._exit(status)
+
+    def serve_forever(self) -> None:
+        ''' Serves until interrupted (Ctrl+C), used by command line. '''
+        try:
+            if not self.workers:
+                self.batcher = QueryBatcher(self.engine, self.max_batch, self.batch_wait)
+                self.httpd.serve_forever()
+            else:
+                self.start()
+                for pid in self._pids:
+                    os.waitpid(pid, 0)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+        return
+
+    def stop(self) -> None:
+        ''' Stops serving (and worker processes) and closes listening socket. '''
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        for pid in self._pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self._pids = []
+        if self.batcher is not None:
+            self.batcher.close()
+            self.batcher = None
+        self.httpd.server_close()
+        return
+
+    def __enter__(self) -> 'QueryServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+        return
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='search engine query server')
+    parser.add_argument('index', help='index segment written by MySeachEngine.save_index')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=0,
+                        help='number of pre-forked worker processes, 0 serves in this process')
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--batch-wait', type=float, default=0.0,
+                        help='seconds to wait for more requests of a batch')
+    args = parser.parse_args()
+    query_server = QueryServer(args.index, args.host, args.port, args.workers,
+                               args.max_batch, args.batch_wait)
+    print('serving %s on %s with %d workers' % (args.index, query_server.address, args.workers))
+    query_server.serve_forever()
@@ -0,0 +1,844 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+
+My Notes:
+    Benchmarks for search engine building blocks. Every benchmark works on
+    synthetic data generated here so that it can run without network.
+
+    usage: python search_engine_benchmarks.py <benchmark> [--size N]
+           python search_engine_benchmarks.py pagerank --size 2000
+           python search_engine_benchmarks.py index --size 100000
+           python search_engine_benchmarks.py crawl --size 300
+           python search_engine_benchmarks.py frontier --size 50000
+           python search_engine_benchmarks.py links --size 4
+           python search_engine_benchmarks.py segment --size 100000
+           python search_engine_benchmarks.py ordered --size 100000
+           python search_engine_benchmarks.py query --size 20000
+           python search_engine_benchmarks.py bm25 --size 100000
+           python search_engine_benchmarks.py cache --size 20000
+           python search_engine_benchmarks.py recrawl --size 10000
+           python search_engine_benchmarks.py sharded --size 20000
+           python search_engine_benchmarks.py pagestore --size 2000
+           python search_engine_benchmarks.py codecs --size 50000
+           python search_engine_benchmarks.py autocomplete --size 1000000
+           python search_engine_benchmarks.py server --size 20000
+"""
+
+import argparse
+import itertools
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from bm25 import BM25Scorer
+from boolean_query import evaluate_query, parse_query
+from cache_http_server import CacheHTTPServer
+from dummy_web_cache import cache, get_test_page2, get_test_page_for_index
+from frontier import CrawlFrontier
+from index_segment import IndexSegment, write_segment
+from inverted_index import InvertedIndex
+from link_extractor import extract_words_and_links
+from page_rank import PageRankEngine
+from page_store import PageStore
+from postings_codec import CODECS
+from query_load_generator import index_terms, make_queries, run_load
+from query_server import QueryServer
+from sharded_indexer import build_sharded_index
+from text_search_engine import MySeachEngine, WebCrawler
+from vocabulary import Vocabulary
+
+
+def make_link_graph(npages : int, avg_out_links : int = 8, seed : int = 7) -> dict:
+    '''
+    Creates synthetic link graph {url: [out links]} with npages pages. Few
+    pages have no out links (dangling) like real crawls.
+    '''
+    rng = random.Random(seed)
+    urls = ['http://example%d.com/page%d.html' % (i % 97, i) for i in range(npages)]
+    graph = {}
+    for url in urls:
+        nlinks = rng.randint(0, 2 * avg_out_links)
+        graph[url] = [urls[rng.randrange(npages)] for _ in range(nlinks)]
+    return graph
+
+
+def make_site(npages : int, avg_out_links : int = 8, seed : int = 7) -> dict:
+    '''
+    Creates synthetic web site {url: html} from make_link_graph, every page has
+    some text and anchor tags for its out links.
+    '''
+    pages = {}
+    for url, out_links in make_link_graph(npages, avg_out_links, seed).items():
+        anchors = '\n'.join('<li> <a href="%s">link %d</a>' % (link, i)
+                            for i, link in enumerate(out_links))
+        pages[url] = '<html>\n<body>\n<h1>%s</h1>\n<ul>\n%s\n</ul>\n</body>\n</html>\n' % (url, anchors)
+    return pages
+
+
+def make_corpus(npages : int, words_per_page : int = 250, vocabulary_size : int = 50000,
+                seed : int = 11) -> list:
+    '''
+    Creates synthetic corpus [(url, content), ...]. Words are drawn from a
+    Zipfian distribution so that few words (like 'the') are present in almost
+    every page and appear many times in a page.
+    '''
+    rng = random.Random(seed)
+    vocabulary = ['the', 'a', 'of', 'and', 'to'] + ['w%d' % i for i in range(vocabulary_size - 5)]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(vocabulary_size)))
+    corpus = []
+    for i in range(npages):
+        words = rng.choices(vocabulary, cum_weights=cum_weights, k=words_per_page)
+        corpus.append(('http://example%d.com/page%d.html' % (i % 97, i), ' '.join(words)))
+    return corpus
+
+
+def make_text_site(npages : int, seed : int = 7) -> dict:
+    '''
+    Creates synthetic web site {url: html} with make_corpus text and anchor
+    tags for make_link_graph out links of every page.
+    '''
+    graph = make_link_graph(npages, seed=seed)
+    pages = {}
+    for url, content in make_corpus(npages, seed=seed):
+        anchors = ' '.join('<a href="%s">link</a>' % link for link in graph[url])
+        pages[url] = '<html><body> %s %s </body></html>' % (content, anchors)
+    return pages
+
+
+def make_replicated_cache(npages : int) -> list:
+    '''
+    Creates corpus [(url, content), ...] of npages pages by replicating pages
+    of dummy_web_cache, every copy on its own host (http://copyN.) with its
+    links pointing to same copy.
+    '''
+    urls = list(cache) + ['http://xkcd.com/353', 'http://xkcd.com/554',
+                          'http://www.udacity.com/cs101x/index.html',
+                          'http://www.udacity.com/cs101x/crawling.html',
+                          'http://www.udacity.com/cs101x/walking.html',
+                          'http://www.udacity.com/cs101x/flying.html']
+    templates = [(url, cache.get(url) or get_test_page2(url) or get_test_page_for_index(url))
+                 for url in urls]
+    corpus = []
+    for copy in itertools.count():
+        prefix = 'http://copy%d.' % copy
+        for url, content in templates:
+            if len(corpus) == npages:
+                return corpus
+            corpus.append((url.replace('http://', prefix), content.replace('http://', prefix)))
+    return corpus
+
+
+def _legacy_vrk_rank(graph : dict, damping_factor : float, number_of_iterations : int) -> dict:
+    ''' Original udacity page rank loop, kept as reference for benchmark. '''
+    npages = len(graph)
+    ranks = {page: 1.0 / npages for page in graph}
+    for _ in range(number_of_iterations):
+        newranks = {}
+        for page in graph:
+            newrank = (1 - damping_factor) / npages
+            for node in graph:
+                if page in graph[node]:
+                    newrank = newrank + damping_factor * (ranks[node] / len(graph[node]))
+            newranks[page] = newrank
+        ranks = newranks
+    return ranks
+
+
+def bench_pagerank(size : int = 2000) -> None:
+    ''' Compares original page rank loop with CSR power iteration. '''
+    for npages in sorted({max(size // 4, 1), max(size // 2, 1), size}):
+        graph = make_link_graph(npages)
+
+        start = time.perf_counter()
+        legacy = _legacy_vrk_rank(graph, 0.8, 10)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine = PageRankEngine(graph, 0.8, 10)
+        compile_time = time.perf_counter() - start
+        ranks = engine.compute_ranks()
+        engine_time = time.perf_counter() - start
+
+        print('pages %7d  legacy %9.3fs  csr %8.4fs (compile %.4fs)  speedup %8.1fx  identical %s'
+              % (npages, legacy_time, engine_time, compile_time,
+                 legacy_time / engine_time, ranks == legacy))
+
+    # large graph, convergence by tolerance with dangling redistribution.
+    graph = make_link_graph(100 * size)
+    start = time.perf_counter()
+    engine = PageRankEngine(graph, 0.85, 100, tolerance=1e-8, redistribute_dangling=True)
+    ranks = engine.compute()
+    print('pages %7d  csr tolerance 1e-8: %d iterations %.3fs, rank sum %.6f'
+          % (len(graph), engine.iterations, time.perf_counter() - start, ranks.sum()))
+
+
+def _legacy_lucky_search(index : dict, ranks : dict, keyword : str) -> str:
+    ''' Original lucky search over {keyword: [url, ...]} index, kept as reference. '''
+    result_pages = index.get(keyword)
+    if not result_pages:
+        return None
+    best_page = result_pages[0]
+    for page in result_pages:
+        if ranks[page] > ranks[best_page]:
+            best_page = page
+    return best_page
+
+
+def _timed_build(build, corpus):
+    ''' Returns (result, seconds, bytes allocated) of build(corpus). '''
+    start = time.perf_counter()
+    build(corpus)
+    elapsed = time.perf_counter() - start
+    # second build only to measure memory, tracing slows down allocations.
+    tracemalloc.start()
+    result = build(corpus)
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, allocated
+
+
+def _build_legacy_index(corpus) -> dict:
+    index = {}
+    for url, content in corpus:
+        for word in content.split():
+            if word in index:
+                index[word].append(url)
+            else:
+                index[word] = [url]
+    return index
+
+
+def _build_inverted_index(corpus) -> InvertedIndex:
+    index = InvertedIndex()
+    for url, content in corpus:
+        index.add_document(url, content.split())
+    return index
+
+
+def bench_index(size : int = 100000) -> None:
+    ''' Memory and lucky_search latency of dict of lists index vs inverted index. '''
+    corpus = make_corpus(size)
+    rng = random.Random(3)
+    ranks = {url: rng.random() for url, _ in corpus}
+
+    legacy, legacy_time, legacy_bytes = _timed_build(_build_legacy_index, corpus)
+    inverted, inverted_time, inverted_bytes = _timed_build(_build_inverted_index, corpus)
+    print('pages %d: legacy index %.1f MB built in %.2fs, inverted index %.1f MB built in %.2fs'
+          % (size, legacy_bytes / 2**20, legacy_time, inverted_bytes / 2**20, inverted_time))
+    print('postings for "the": legacy %d entries, inverted %d entries'
+          % (len(legacy['the']), inverted.document_frequency('the')))
+
+    search_engine = MySeachEngine.from_inverted_index(inverted, ranks)
+    for keyword in ['the', 'of', 'w10', 'w1000', 'w40000']:
+        repeat = 20
+        start = time.perf_counter()
+        for _ in range(repeat):
+            expected = _legacy_lucky_search(legacy, ranks, keyword)
+        legacy_latency = (time.perf_counter() - start) / repeat
+        start = time.perf_counter()
+        for _ in range(repeat):
+            best = search_engine.lucky_search(keyword)
+        inverted_latency = (time.perf_counter() - start) / repeat
+        print('lucky_search %-7s legacy %9.3f ms  inverted %8.3f ms  same result %s'
+              % (keyword, legacy_latency * 1e3, inverted_latency * 1e3, best == expected))
+
+
+def bench_crawl(size : int = 300, latency : float = 0.02) -> None:
+    ''' Crawl throughput (pages/sec) against local HTTP server with injected latency. '''
+    pages = make_site(size)
+    seed = next(iter(pages))
+    with CacheHTTPServer(pages, latency=latency) as server:
+        print('pages %d, server latency %.0f ms' % (size, latency * 1e3))
+        for max_concurrency in [None, 1, 4, 16, 64]:
+            start = time.perf_counter()
+            crawler = WebCrawler(seed, crawl_budget=size, fetch=server.get_page,
+                                 max_concurrency=max_concurrency, per_host_limit=4)
+            elapsed = time.perf_counter() - start
+            mode = 'sequential' if max_concurrency is None else 'concurrency %d' % max_concurrency
+            print('%-15s crawled %5d pages in %6.2fs  %8.1f pages/sec'
+                  % (mode, len(crawler.crawled_lst), elapsed, len(crawler.crawled_lst) / elapsed))
+
+
+def _legacy_list_crawl(graph : dict, seed : str) -> list:
+    ''' Original crawl loop with list frontier and list of crawled pages, without fetching. '''
+    to_crawl, crawled = [seed], []
+    while to_crawl:
+        page = to_crawl.pop()
+        if page not in crawled:
+            for link in graph[page]:
+                if link not in to_crawl:
+                    to_crawl.append(link)
+            crawled.append(page)
+    return crawled
+
+
+def _frontier_crawl(graph : dict, seed : str, order : str) -> list:
+    ''' Crawl loop of WebCrawler with CrawlFrontier, without fetching. '''
+    frontier, crawled = CrawlFrontier(order), []
+    frontier.push(seed)
+    while frontier:
+        page = frontier.pop()
+        frontier.extend(graph[page])
+        crawled.append(page)
+    return crawled
+
+
+def bench_frontier(size : int = 50000) -> None:
+    ''' Crawl loop cost of list frontier vs deque/heap + hash set frontier on link graph. '''
+    for npages in sorted({max(size // 10, 1), max(size // 5, 1)}):
+        graph = make_link_graph(npages)
+        seed = next(iter(graph))
+        start = time.perf_counter()
+        legacy = _legacy_list_crawl(graph, seed)
+        legacy_time = time.perf_counter() - start
+        start = time.perf_counter()
+        crawled = _frontier_crawl(graph, seed, 'dfs')
+        frontier_time = time.perf_counter() - start
+        print('pages %6d  list frontier %8.3fs  dfs frontier %7.3fs  speedup %7.1fx  same order %s'
+              % (npages, legacy_time, frontier_time, legacy_time / frontier_time, crawled == legacy))
+
+    graph = make_link_graph(size)
+    seed = next(iter(graph))
+    for order in CrawlFrontier.ORDERS:
+        start = time.perf_counter()
+        crawled = _frontier_crawl(graph, seed, order)
+        elapsed = time.perf_counter() - start
+        print('pages %6d  %-8s frontier crawled %6d pages in %.3fs'
+              % (size, order, len(crawled), elapsed))
+
+
+def _legacy_get_all_links(page : str) -> list:
+    ''' Original link extraction which re-slices page after every link, kept as reference. '''
+    links = []
+    while True:
+        start_link_pos = page.find('<a href=')
+        if start_link_pos == -1:
+            break
+        start_quote_pos = page.find('"', start_link_pos)
+        end_quote_pos = page.find('"', start_quote_pos + 1)
+        url = page[start_quote_pos + 1:end_quote_pos]
+        if not url:
+            break
+        links.append(url)
+        page = page[end_quote_pos:]
+    return links
+
+
+def bench_links(size : int = 4) -> None:
+    ''' Link and word extraction throughput on pages of up to size MB built from xkcd pages. '''
+    xkcd = get_test_page2('http://xkcd.com/353') + get_test_page2('http://xkcd.com/554')
+    for megabytes in [0.25, 0.5, 1, 2, size]:
+        page = xkcd * max(int(megabytes * 2**20 / len(xkcd)), 1)
+        nbytes = len(page)
+        start = time.perf_counter()
+        words, links = extract_words_and_links(page)
+        scan_time = time.perf_counter() - start
+        data = memoryview(page.encode('utf-8'))
+        start = time.perf_counter()
+        extract_words_and_links(data)
+        bytes_time = time.perf_counter() - start
+        line = ('page %5.2f MB %6d links  single scan %7.1f MB/s (str) %7.1f MB/s (memoryview)'
+                % (nbytes / 2**20, len(links), nbytes / 2**20 / scan_time, nbytes / 2**20 / bytes_time))
+        if megabytes <= 2:
+            start = time.perf_counter()
+            legacy = _legacy_get_all_links(page)
+            words_legacy = page.split()
+            legacy_time = time.perf_counter() - start
+            line += '  slicing %7.3f MB/s  speedup %7.1fx  same words %s' % (
+                nbytes / 2**20 / legacy_time, legacy_time / scan_time, words == words_legacy)
+        print(line)
+
+
+def bench_segment(size : int = 100000) -> None:
+    ''' Start up time from saved index segment vs building index and ranks. '''
+    corpus = make_corpus(size)
+    graph = make_link_graph(size)
+
+    start = time.perf_counter()
+    inverted = _build_inverted_index(corpus)
+    ranks = PageRankEngine(graph).compute_ranks()
+    search_engine = MySeachEngine.from_inverted_index(inverted, ranks, graph)
+    build_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'search.idx')
+        start = time.perf_counter()
+        search_engine.save_index(path)
+        save_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded = MySeachEngine.from_index(path)
+        load_time = time.perf_counter() - start
+        print('pages %d: build index and ranks %.2fs, save %.2fs, segment %.1f MB, load %.2f ms'
+              % (size, build_time, save_time, os.path.getsize(path) / 2**20, load_time * 1e3))
+
+        for keyword in ['the', 'w10', 'w1000', 'w40000']:
+            repeat = 20
+            start = time.perf_counter()
+            for _ in range(repeat):
+                best = loaded.lucky_search(keyword)
+            latency = (time.perf_counter() - start) / repeat
+            print('lucky_search %-7s on segment %8.3f ms  same result %s'
+                  % (keyword, latency * 1e3, best == search_engine.lucky_search(keyword)))
+        loaded = None
+
+
+def _legacy_ordered_search(index : dict, ranks : dict, keyword : str) -> list:
+    ''' Sorts all pages of keyword by rank, reference for ordered_search. '''
+    result_pages = index.get(keyword)
+    if not result_pages:
+        return None
+    return sorted(set(result_pages), key=lambda page: -ranks[page])
+
+
+def bench_ordered(size : int = 100000) -> None:
+    ''' ordered_search latency of full sort vs heap top-k vs presorted postings. '''
+    corpus = make_corpus(size)
+    rng = random.Random(3)
+    ranks = {url: rng.random() for url, _ in corpus}
+    legacy = _build_legacy_index(corpus)
+    inverted = _build_inverted_index(corpus)
+
+    # heap: no presorted postings and every query selects top-k with heap.
+    heap_engine = MySeachEngine.from_inverted_index(inverted, ranks)
+    heap_engine.HEAP_FRACTION = 0
+    presorted_engine = MySeachEngine.from_inverted_index(inverted, ranks)
+    start = time.perf_counter()
+    presorted_engine.build_rank_order()
+    print('pages %d: presorting postings of %d terms took %.2fs'
+          % (size, len(presorted_engine.rank_order), time.perf_counter() - start))
+
+    repeat = 10
+    for keyword in ['the', 'w10', 'w1000']:
+        for k in [10, 100]:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                expected = _legacy_ordered_search(legacy, ranks, keyword)[:k]
+            sort_latency = (time.perf_counter() - start) / repeat
+            start = time.perf_counter()
+            for _ in range(repeat):
+                heap_result = heap_engine.ordered_search(keyword, k)
+            heap_latency = (time.perf_counter() - start) / repeat
+            start = time.perf_counter()
+            for _ in range(repeat):
+                presorted_result = presorted_engine.ordered_search(keyword, k)
+            presorted_latency = (time.perf_counter() - start) / repeat
+            print('ordered_search %-6s k=%-4d (%6d pages) full sort %8.3f ms  heap %7.3f ms  '
+                  'presorted %6.3f ms  same result %s'
+                  % (keyword, k, inverted.document_frequency(keyword), sort_latency * 1e3,
+                     heap_latency * 1e3, presorted_latency * 1e3,
+                     heap_result == expected == presorted_result))
+
+
+def _legacy_boolean_lookup(index : dict, query : str) -> set:
+    '''
+    Boolean query with python sets of {keyword: [url, ...]} index, reference
+    for query benchmark. Returns None for phrases, legacy index has no positions.
+    '''
+    node = parse_query(query)
+    def evaluate(node):
+        kind, value = node
+        if kind == 'TERM':
+            return set(index.get(value, ()))
+        if kind == 'AND':
+            positive = [evaluate(child) for child in value if child[0] != 'NOT']
+            result = set.intersection(*positive)
+            for child in value:
+                if child[0] == 'NOT':
+                    result -= evaluate(child[1])
+            return result
+        if kind == 'OR':
+            return set.union(*[evaluate(child) for child in value])
+        raise ValueError(kind)
+    try:
+        return evaluate(node)
+    except ValueError:
+        return None
+
+
+def bench_query(size : int = 20000) -> None:
+    ''' Query latency of boolean and phrase queries, python sets vs skip search on index and segment. '''
+    corpus = make_corpus(size)
+    legacy = _build_legacy_index(corpus)
+    inverted = InvertedIndex(positional=True)
+    start = time.perf_counter()
+    for url, content in corpus:
+        inverted.add_document(url, content.split())
+    print('pages %d: positional index built in %.2fs' % (size, time.perf_counter() - start))
+
+    queries = ['the', 'w1000', 'w1000 AND the', 'w1000 AND w10 AND the', 'w1000 OR w2000',
+               'w1000 NOT the', 'the NOT w10', '(w1000 OR w2000) AND a', '"the a"', '"of the w10"']
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'search.idx')
+        write_segment(path, inverted, {})
+        segment = IndexSegment(path)
+        repeat = 20
+        for query in queries:
+            node = parse_query(query)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                expected = _legacy_boolean_lookup(legacy, query)
+            legacy_latency = (time.perf_counter() - start) / repeat
+            latencies = []
+            for index in (inverted, segment):
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    doc_ids = evaluate_query(node, index)
+                latencies.append((time.perf_counter() - start) / repeat)
+            same = '-' if expected is None else \
+                set(inverted.urls[doc_id] for doc_id in doc_ids.tolist()) == expected
+            legacy_text = '      -   ' if expected is None else '%8.3f ms' % (legacy_latency * 1e3)
+            print('%-26s %6d pages  python sets %s  index %7.3f ms  segment %7.3f ms  same result %s'
+                  % (query, len(doc_ids), legacy_text, latencies[0] * 1e3, latencies[1] * 1e3, same))
+        segment = None
+
+
+def bench_bm25(size : int = 100000, k : int = 10) -> None:
+    ''' Top-k BM25 + page rank latency, scoring every matching page vs MaxScore early termination. '''
+    corpus = make_corpus(size)
+    graph = make_link_graph(size)
+    inverted = _build_inverted_index(corpus)
+    ranks = PageRankEngine(graph).compute_ranks()
+    doc_ranks = np.array([ranks.get(url, 0.0) for url in inverted.urls])
+    start = time.perf_counter()
+    scorer = BM25Scorer(inverted, doc_ranks)
+    print('pages %d: document lengths and idf tables prepared in %.2fs'
+          % (size, time.perf_counter() - start))
+
+    repeat = 10
+    for query in ['w1000 the', 'w1000 w2000 the a', 'w100 w10 of', 'w5000 w20000 w40000',
+                  'the of and']:
+        keywords = query.split()
+        # upper bounds are computed once per keyword, keep them out of timing.
+        scorer.top_k(keywords, k)
+        scorer.scored = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            expected, _ = scorer.top_k_exhaustive(keywords, k)
+        exhaustive_latency = (time.perf_counter() - start) / repeat
+        exhaustive_scored, scorer.scored = scorer.scored // repeat, 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            best, _ = scorer.top_k(keywords, k)
+        max_score_latency = (time.perf_counter() - start) / repeat
+        max_score_scored, scorer.scored = scorer.scored // repeat, 0
+        print('%-22s k=%d  score all %8.3f ms (%6d pages)  MaxScore %7.3f ms (%6d pages)  same result %s'
+              % (query, k, exhaustive_latency * 1e3, exhaustive_scored,
+                 max_score_latency * 1e3, max_score_scored, best.tolist() == expected.tolist()))
+
+
+def bench_cache(size : int = 20000, nqueries : int = 20000) -> None:
+    ''' Skewed query traffic (lucky_search, lookup, search) with and without query result cache. '''
+    corpus = make_corpus(size)
+    rng = random.Random(5)
+    ranks = {url: rng.random() for url, _ in corpus}
+    inverted = _build_inverted_index(corpus)
+    # few hundred keywords are most of traffic: Zipfian draw over 5000 mid frequency
+    # keywords (popular query keywords are not stop words like 'the').
+    keywords = ['w%d' % i for i in range(1000, 6000)]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(keywords))))
+    queries = [(rng.choice(['lucky_search', 'lookup', 'search']), keyword)
+               for keyword in rng.choices(keywords, cum_weights=cum_weights, k=nqueries)]
+
+    for max_bytes in [0, 2**20, 16 * 2**20]:
+        search_engine = MySeachEngine.from_inverted_index(inverted, ranks)
+        search_engine.query_cache.max_bytes = max_bytes
+        start = time.perf_counter()
+        for method, keyword in queries:
+            getattr(search_engine, method)(keyword)
+        elapsed = time.perf_counter() - start
+        stats = search_engine.cache_stats()
+        print('cache %5.1f MB: %6d queries in %.2fs (%7.0f queries/sec)  hit ratio %.2f  '
+              'entries %5d  %.2f MB  evictions %d'
+              % (max_bytes / 2**20, nqueries, elapsed, nqueries / elapsed, stats['hit_ratio'],
+                 stats['entries'], stats['bytes'] / 2**20, stats['evictions']))
+
+
+def bench_recrawl(size : int = 10000, changed_fraction : float = 0.01) -> None:
+    ''' Refresh time after changing 1% of pages: full crawl and rank vs incremental recrawl. '''
+    pages = make_text_site(size)
+    fetch = lambda url: pages.get(url, '')
+    seed = next(iter(pages))
+    start = time.perf_counter()
+    crawler = WebCrawler(seed, crawl_budget=2 * size, fetch=fetch)
+    print('pages %d: full crawl, index and rank %.2fs' % (len(crawler.graph), time.perf_counter() - start))
+
+    # change 1% of pages: half get new content and links, quarter are removed,
+    # quarter are new pages linked from changed pages.
+    rng = random.Random(13)
+    nchanged = max(4, int(size * changed_fraction))
+    urls = list(crawler.graph)
+    changed = rng.sample(urls, nchanged // 2 + nchanged // 4)
+    updated, removed = changed[:nchanged // 2], changed[nchanged // 2:]
+    added = ['http://example-new.com/page%d.html' % i for i in range(nchanged // 4)]
+    new_text = make_corpus(len(updated) + len(added), seed=17)
+    for url, (_, content) in zip(updated + added, new_text):
+        links = rng.sample(urls, 8) + added[:2]
+        pages[url] = '<html><body> %s %s </body></html>' % (
+            content, ' '.join('<a href="%s">link</a>' % link for link in links))
+    for url in removed:
+        del pages[url]
+
+    start = time.perf_counter()
+    counts = crawler.recrawl(updated + removed + added)
+    incremental_time = time.perf_counter() - start
+    start = time.perf_counter()
+    WebCrawler(seed, crawl_budget=2 * size, fetch=fetch)
+    full_time = time.perf_counter() - start
+    print('changed %s: incremental recrawl %.3fs (%d rank iterations)  full rebuild %.2fs  (%.1f%%)'
+          % (counts, incremental_time, crawler.rank_iterations, full_time,
+             100 * incremental_time / full_time))
+
+    # incremental index must equal index built from scratch over same pages.
+    reference = InvertedIndex(positional=True)
+    for url in crawler.graph:
+        reference.add_document(url, extract_words_and_links(pages[url], url)[0])
+    same_index = all(sorted(crawler.index.lookup_urls(term)) == sorted(reference.lookup_urls(term))
+                     for term in reference.terms()) and len(crawler.index) == len(reference)
+    exact = PageRankEngine(crawler.graph, max_iterations=1000, tolerance=1e-12).compute_ranks()
+    error = sum(abs(crawler.page_ranks[url] - rank) for url, rank in exact.items())
+    cold = PageRankEngine(crawler.graph, max_iterations=1000, tolerance=crawler.refresh_tolerance)
+    cold.compute()
+    print('same index as rebuilt from scratch %s, L1 distance of warm started ranks to converged '
+          'ranks %.1e (cold start needs %d iterations)' % (same_index, error, cold.iterations))
+
+
+def _build_serial_index(corpus) -> InvertedIndex:
+    ''' Index of corpus built one page at a time in one process, same work as a worker. '''
+    index = InvertedIndex(positional=True)
+    for url, content in corpus:
+        index.add_document(url, extract_words_and_links(content)[0])
+    return index
+
+
+def bench_sharded(size : int = 20000, shard_size : int = 256) -> None:
+    ''' Indexing throughput (pages/sec) of crawl loop vs sharded indexing with 1 to N worker processes. '''
+    corpus = make_replicated_cache(size)
+    megabytes = sum(len(content) for _, content in corpus) / 2**20
+    cores = os.cpu_count() or 1
+    print('pages %d (%.1f MB) replicated from dummy_web_cache, %d cores' % (size, megabytes, cores))
+    start = time.perf_counter()
+    reference = _build_serial_index(corpus)
+    serial_time = time.perf_counter() - start
+    print('%-12s %6.2fs  %8.0f pages/sec' % ('one process', serial_time, size / serial_time))
+    workers = 1
+    while True:
+        start = time.perf_counter()
+        index = build_sharded_index(corpus, workers, shard_size)
+        elapsed = time.perf_counter() - start
+        same_index = (index.urls == reference.urls and index.postings_lists == reference.postings_lists
+                      and index.positions_lists == reference.positions_lists)
+        print('%-12s %6.2fs  %8.0f pages/sec  speed up %.2fx  same index %s'
+              % ('%d workers' % workers, elapsed, size / elapsed, serial_time / elapsed, same_index))
+        if workers >= cores:
+            break
+        workers = min(2 * workers, cores)
+
+
+def bench_pagestore(size : int = 2000, mirror_fraction : float = 0.05, latency : float = 0.001) -> None:
+    ''' Crawl and unchanged recrawl through local HTTP server without and with page store, mirror pages dropped. '''
+    pages = make_text_site(size)
+    # mirror copies of some pages on another host, linked from their originals.
+    rng = random.Random(5)
+    mirrors = {}
+    for url in rng.sample(list(pages), int(size * mirror_fraction)):
+        mirror = url.replace('http://', 'http://mirror.')
+        pages[url] = pages[url].replace('</body>', '<a href="%s">mirror</a> </body>' % mirror)
+        mirrors[mirror] = url
+    for mirror, url in mirrors.items():
+        pages[mirror] = pages[url].replace('</body>', 'mirrored copy </body>')
+    seed = next(iter(pages))
+    print('pages %d with %d mirror pages, server latency %.0f ms' % (len(pages), len(mirrors), latency * 1e3))
+    with CacheHTTPServer(pages, latency=latency) as server:
+        for name in ['plain fetch', 'page store']:
+            store = PageStore(opener=server.opener) if name == 'page store' else None
+            server.requests = server.not_modified = 0
+            start = time.perf_counter()
+            crawler = WebCrawler(seed, crawl_budget=2 * len(pages), fetch=server.get_page,
+                                 page_store=store)
+            crawl_time = time.perf_counter() - start
+            indexed = len(crawler.crawled_lst)
+            start = time.perf_counter()
+            counts = crawler.recrawl(list(crawler.graph))
+            recrawl_time = time.perf_counter() - start
+            print('%-11s crawl %6.2fs (%d pages indexed, %d duplicates dropped)  unchanged recrawl '
+                  '%6.2fs  %s  %d requests, %d not modified'
+                  % (name, crawl_time, indexed, len(crawler.duplicates), recrawl_time, counts,
+                     server.requests, server.not_modified))
+            if store is not None:
+                # mirror or its original is dropped, whichever was crawled second.
+                dropped = sum(url in mirrors or url in mirrors.values() for url in crawler.duplicates)
+                print('%d of %d dropped pages are mirrors or their originals' % (dropped, len(crawler.duplicates)))
+
+
+def bench_codecs(size : int = 50000, nterms : int = 1000) -> None:
+    ''' Bytes per posting, decode throughput and query latency of every postings codec on Zipfian corpora. '''
+    corpora = [('short pages', size, 250, 50000), ('long pages', size // 4, 1000, 200000)]
+    queries = ['the AND of', 'w1000 AND the', 'w100 AND w10 AND a', 'w50 OR w60 OR w70',
+               'w10 NOT the', 'w20000 AND w5']
+    for name, npages, words_per_page, vocabulary_size in corpora:
+        inverted = _build_inverted_index(make_corpus(npages, words_per_page, vocabulary_size))
+        npostings = sum(inverted.document_frequencies().values())
+        # most frequent terms hold most postings, i.e., most decoding work.
+        frequent = sorted(inverted.terms(), key=inverted.document_frequency, reverse=True)[:nterms]
+        decoded = sum(inverted.document_frequency(term) for term in frequent)
+        print('%s: %d pages, %d words per page, %d terms, %d postings'
+              % (name, npages, words_per_page, len(inverted), npostings))
+        with tempfile.TemporaryDirectory() as directory:
+            for codec in CODECS:
+                path = os.path.join(directory, codec + '.idx')
+                start = time.perf_counter()
+                write_segment(path, inverted, {}, codec=codec)
+                write_time = time.perf_counter() - start
+                segment = IndexSegment(path)
+                postings_bytes = segment._sections['postings_data'][1]
+
+                start = time.perf_counter()
+                for term in frequent:
+                    segment.doc_ids(term)
+                decode_time = time.perf_counter() - start
+
+                repeat = 20
+                same = True
+                start = time.perf_counter()
+                for query in queries:
+                    node = parse_query(query)
+                    for _ in range(repeat):
+                        doc_ids = evaluate_query(node, segment)
+                    same = same and np.array_equal(doc_ids, evaluate_query(node, inverted))
+                latency = (time.perf_counter() - start) / (repeat * len(queries))
+                print('  %-6s %5.2f bytes/posting (%6.1f MB)  written in %5.2fs  decode %6.1f M postings/sec  '
+                      'query %7.3f ms  same results %s'
+                      % (codec, postings_bytes / npostings, postings_bytes / 2**20, write_time,
+                         decoded / decode_time / 1e6, latency * 1e3, same))
+                segment.close()
+
+
+def make_vocabulary(nterms : int, seed : int = 13) -> tuple:
+    '''
+    Creates nterms distinct random lowercase terms (3 to 12 letters, letters
+    and lengths skewed like english) with Zipfian document frequencies.
+    '''
+    rng = np.random.default_rng(seed)
+    letters = np.array(list('etaoinshrdlcumwfgypbvkjxqz'))
+    letter_weights = 1.0 / np.arange(1, 27) ** 0.7
+    terms = set()
+    while len(terms) < nterms:
+        lengths = rng.integers(3, 13, nterms)
+        chars = rng.choice(letters, (nterms, 12), p=letter_weights / letter_weights.sum())
+        terms.update(''.join(row[:length]) for row, length in zip(chars.tolist(), lengths.tolist()))
+    terms = sorted(terms)[:nterms]
+    rng.shuffle(terms)
+    doc_freqs = np.maximum(1, (1e6 / np.arange(1, nterms + 1) ** 1.1).astype(np.int64))
+    return terms, doc_freqs
+
+
+def _scan_autocomplete(terms : list, doc_freqs : dict, prefix : str, k : int) -> list:
+    ''' Scans every term for prefix and sorts matches, reference for Vocabulary.autocomplete. '''
+    matches = [term for term in terms if term.startswith(prefix)]
+    return sorted(matches, key=lambda term: (-doc_freqs[term], term))[:k]
+
+
+def bench_autocomplete(size : int = 1000000, k : int = 10, nqueries : int = 5000) -> None:
+    ''' Autocomplete latency over vocabulary of size terms, full scan vs sorted terms with precomputed tops. '''
+    terms, doc_freqs = make_vocabulary(size)
+    start = time.perf_counter()
+    vocabulary = Vocabulary(terms, doc_freqs)
+    build_time = time.perf_counter() - start
+    print('vocabulary %d terms: built in %.2fs, %d prefixes with precomputed top %d'
+          % (size, build_time, len(vocabulary._tops), vocabulary.TOP_K))
+
+    rng = random.Random(3)
+    prefixes = []
+    for _ in range(nqueries):
+        term = rng.choice(terms)
+        prefixes.append(term[:rng.randint(0, min(5, len(term)))])
+    frequencies = dict(zip(terms, doc_freqs.tolist()))
+    scan_prefixes = prefixes[:5]
+    start = time.perf_counter()
+    expected = [_scan_autocomplete(terms, frequencies, prefix, k) for prefix in scan_prefixes]
+    scan_latency = (time.perf_counter() - start) / len(scan_prefixes)
+    same = expected == [vocabulary.autocomplete(prefix, k) for prefix in scan_prefixes]
+    print('  full scan          %9.3f ms per query' % (scan_latency * 1e3))
+
+    for length in range(6):
+        selected = [prefix for prefix in prefixes if len(prefix) == length]
+        latencies = []
+        for prefix in selected:
+            start = time.perf_counter()
+            vocabulary.autocomplete(prefix, k)
+            latencies.append(time.perf_counter() - start)
+        latencies = np.array(latencies) * 1e3
+        print('  prefix length %d   %9.3f ms mean  %7.3f ms p99  (%d queries)'
+              % (length, latencies.mean(), np.percentile(latencies, 99), len(selected)))
+    start = time.perf_counter()
+    for prefix in prefixes:
+        vocabulary.expand(prefix)
+    print('  wildcard expansion %9.3f ms mean (%d terms)  same results %s'
+          % ((time.perf_counter() - start) / len(prefixes) * 1e3, vocabulary.MAX_EXPANSIONS, same))
+
+
+def bench_server(size : int = 20000, concurrency : int = 16, nrequests : int = 4000) -> None:
+    ''' Query server throughput and p99 latency (client and server side), batching and pre-forked workers. '''
+    inverted = _build_inverted_index(make_corpus(size))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'index.seg')
+        write_segment(path, inverted, {})
+        paths = make_queries(index_terms(path), nrequests)
+        cores = os.cpu_count() or 1
+        print('pages %d, %d requests from %d client threads, %d cores'
+              % (size, nrequests, concurrency, cores))
+        configs = [(1, 1), (1, 64)] + [(workers, 64) for workers in sorted({cores, 2 * cores})
+                                       if workers > 1]
+        for workers, max_batch in configs:
+            with QueryServer(path, workers=workers, max_batch=max_batch) as query_server:
+                # warm up connections and query cache of every worker.
+                run_load(query_server.address, paths[:500], concurrency)
+                query_server.histograms.reset()
+                report = run_load(query_server.address, paths, concurrency)
+                server_stats = query_server.histograms.stats()
+            server_p99 = max(stats['p99_ms'] for stats in server_stats.values())
+            print('workers %2d, max batch %2d: %8.1f queries/sec  client p99 %7.2f ms  '
+                  'server p99 <= %7.2f ms  errors %d'
+                  % (workers, max_batch, report['qps'], report['p99_ms'], server_p99,
+                     report['errors']))
+
+
+BENCHMARKS = {
+    'server'   : bench_server,
+    'autocomplete': bench_autocomplete,
+    'codecs'   : bench_codecs,
+    'pagestore': bench_pagestore,
+    'sharded'  : bench_sharded,
+    'recrawl'  : bench_recrawl,
+    'cache'    : bench_cache,
+    'bm25'     : bench_bm25,
+    'query'    : bench_query,
+    'ordered'  : bench_ordered,
+    'segment'  : bench_segment,
+    'links'    : bench_links,
+    'frontier' : bench_frontier,
+    'crawl'    : bench_crawl,
+    'pagerank' : bench_pagerank,
+    'index'    : bench_index,
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='search engine benchmarks')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS) + ['all'])
+    parser.add_argument('--size', type=int, default=None,
+                        help='problem size, meaning and default depend on benchmark')
+    args = parser.parse_args()
+    names = sorted(BENCHMARKS) if args.benchmark == 'all' else [args.benchmark]
+    for name in names:
+        print('==== %s ====' % name)
+        if args.size:
+            BENCHMARKS[name](args.size)
+        else:
+            BENCHMARKS[name]()
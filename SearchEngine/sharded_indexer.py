@@ -0,0 +1,290 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://nlp.stanford.edu/IR-book/html/htmledition/distributed-indexing-1.html
+           https://docs.python.org/3/library/concurrent.futures.html#processpoolexecutor
+
+
+My Notes:
+    Crawler used to split every page into words and add them to index in crawl
+    loop, i.e., indexing runs on one core behind fetching.
+
+    ShardedIndexer ships fetched pages to a pool of worker processes:
+        1. Pages are grouped into shards of shard_size pages in crawl order, so
+           every shard owns a consecutive range of document ids. Shard is sent
+           to ProcessPoolExecutor as soon as it is full, indexing overlaps crawl.
+        2. Worker (index_shard) splits pages into words, builds a partial
+           InvertedIndex and returns it as flat numpy arrays (terms sorted,
+           postings and positions of every term one after other, global
+           document ids), which are cheap to send back to crawler process.
+        3. merge_shards does k-way merge (heapq.merge) of sorted terms of all
+           shards. Postings of a term from different shards are concatenated in
+           shard order, which keeps them sorted by document id without sorting.
+    Merged index equals index built one page at a time. Crawler itself only
+    extracts links of page (extract_links), words are never split there.
+"""
+
+import heapq
+import itertools
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from inverted_index import InvertedIndex
+from link_extractor import extract_words_and_links
+
+
+def index_shard(pages : list, first_doc_id : int = 0, positional : bool = True,
+                normalize : bool = False) -> dict:
+    '''
+    Builds partial index of pages, runs in worker process.
+
+    Parameters
+    ----------
+    pages : list
+        [(url, content), ...] pages of shard in crawl order, urls must be
+        distinct.
+    first_doc_id : int
+        document id of first page, pages get consecutive document ids.
+    positional : bool
+        keep word positions of every term.
+    normalize : bool
+        index normalized words (vocabulary.normalize_words).
+
+    Returns
+    -------
+    dict
+        shard with 'first_doc_id', 'urls', 'doc_lengths' (uint32 per page),
+        'terms' (sorted), 'document_frequencies' (int64 per term), 'postings'
+        (uint32 [doc_id0, freq0, ...] of all terms in terms order) and
+        'positions' (uint32 positions in postings order, None if not positional).
+
+    '''
+    index = InvertedIndex(positional=positional, normalize=normalize)
+    for url, content in pages:
+        index.add_document(url, extract_words_and_links(content)[0])
+    terms = sorted(index.postings_lists)
+    document_frequencies = np.array([len(index.postings_lists[term]) // 2 for term in terms],
+                                    dtype=np.int64)
+    postings = np.frombuffer(b''.join([index.postings_lists[term] for term in terms]),
+                             dtype=np.uint32).copy()
+    postings[0::2] += np.uint32(first_doc_id)
+    positions = None
+    if positional:
+        positions = np.frombuffer(b''.join([index.positions_lists[term] for term in terms]),
+                                  dtype=np.uint32)
+    return {'first_doc_id'         : first_doc_id,
+            'urls'                 : index.urls,
+            'doc_lengths'          : np.frombuffer(index.doc_lengths, dtype=np.uint32),
+            'terms'                : terms,
+            'document_frequencies' : document_frequencies,
+            'postings'             : postings,
+            'positions'            : positions}
+
+
+def merge_shards(shards : list, positional : bool = True, updatable : bool = False,
+                 normalize : bool = False) -> InvertedIndex:
+    '''
+    Merges partial indexes of index_shard into one InvertedIndex.
+
+    Parameters
+    ----------
+    shards : list
+        shards in document id order, covering consecutive document ids
+        starting from 0.
+    positional : bool
+        shards keep word positions, merged index is positional.
+    updatable : bool
+        merged index keeps terms of every document (InvertedIndex updatable).
+    normalize : bool
+        shards index normalized words, pages added later to merged index
+        are normalized too.
+
+    Returns
+    -------
+    InvertedIndex
+        index of all pages of all shards.
+
+    '''
+    index = InvertedIndex(positional=positional, updatable=updatable, normalize=normalize)
+    # postings and positions of every shard as bytes, with byte offsets where
+    # postings and positions of every term start (and where last one ends).
+    postings_bytes, positions_bytes, postings_bounds, positions_bounds = [], [], [], []
+    for shard in shards:
+        first_doc_id = len(index.urls)
+        if shard['first_doc_id'] != first_doc_id:
+            raise ValueError('shard starts at document id %d, expected %d'
+                             % (shard['first_doc_id'], first_doc_id))
+        index.urls.extend(shard['urls'])
+        index.url_ids.update(zip(shard['urls'], range(first_doc_id, len(index.urls))))
+        index.doc_lengths.frombytes(shard['doc_lengths'].tobytes())
+        index.live_docs.extend(bytes([1]) * len(shard['urls']))
+        ends = np.cumsum(shard['document_frequencies'])
+        postings_bounds.append((8 * np.concatenate([[0], ends])).tolist())
+        postings_bytes.append(memoryview(shard['postings']).cast('B'))
+        if positional:
+            cumulative = np.cumsum(shard['postings'][1::2], dtype=np.int64)
+            positions_bounds.append((4 * np.concatenate([[0], cumulative[ends - 1]])).tolist())
+            positions_bytes.append(memoryview(shard['positions']).cast('B'))
+
+    # k-way merge of sorted terms, equal terms come in shard order.
+    postings_lists, positions_lists = index.postings_lists, index.positions_lists
+    term_keys = [[None] * len(shard['terms']) for shard in shards]
+    streams = [zip(shard['terms'], itertools.repeat(shard_no), itertools.count())
+               for shard_no, shard in enumerate(shards)]
+    key = None
+    for term, shard_no, term_no in heapq.merge(*streams):
+        if term != key:
+            # same string object is key of postings and term of forward index.
+            key = sys.intern(term) if updatable else term
+            postings = postings_lists[key] = array('I')
+            if positional:
+                term_positions = positions_lists[key] = array('I')
+        term_keys[shard_no][term_no] = key
+        bounds = postings_bounds[shard_no]
+        postings.frombytes(postings_bytes[shard_no][bounds[term_no]:bounds[term_no + 1]])
+        if positional:
+            bounds = positions_bounds[shard_no]
+            term_positions.frombytes(positions_bytes[shard_no][bounds[term_no]:bounds[term_no + 1]])
+
+    if updatable:
+        for shard, keys in zip(shards, term_keys):
+            _add_doc_terms(index, shard, keys)
+    index.generation += 1
+    return index
+
+
+def _add_doc_terms(index : InvertedIndex, shard : dict, keys : list) -> None:
+    '''
+        Private function for internal purpose. Adds terms of every document of
+        shard to forward index of updatable index, keys are dictionary keys of
+        terms of shard.
+    '''
+    frequencies = shard['document_frequencies']
+    doc_ids = shard['postings'][0::2]
+    term_nos = np.repeat(np.arange(len(frequencies)), frequencies)
+    # group terms by document, stable sort keeps terms of a document sorted.
+    order = np.argsort(doc_ids, kind='stable')
+    grouped = term_nos[order].tolist()
+    counts = np.bincount(doc_ids - shard['first_doc_id'], minlength=len(shard['urls']))
+    start = 0
+    for count in counts.tolist():
+        index.doc_terms.append(tuple(map(keys.__getitem__, grouped[start:start + count])))
+        start += count
+    return
+
+
+class ShardedIndexer:
+    '''
+    Class ShardedIndexer indexes pages in pool of worker processes while
+    pages are crawled and merges partial indexes into one InvertedIndex.
+    '''
+    def __init__(self, workers : int = None, shard_size : int = 256,
+                 positional : bool = True, normalize : bool = False) -> None:
+        '''
+        Constructor for sharded indexer class
+
+            Parameters
+            ----------
+            workers : int
+                number of worker processes, None uses number of cores.
+            shard_size : int
+                number of pages sent to a worker at once.
+            positional : bool
+                keep word positions of every term.
+            normalize : bool
+                index normalized words (vocabulary.normalize_words).
+
+            Returns
+            -------
+            None
+        '''
+        if shard_size < 1:
+            raise ValueError('shard_size must be positive')
+        self.workers    = workers
+        self.shard_size = shard_size
+        self.positional = positional
+        self.normalize  = normalize
+        self.pages      = 0
+        self._shard     = []
+        self._futures   = []
+        # pool is started with first full shard.
+        self._executor  = None
+        return
+
+    def add(self, url : str, content : str) -> int:
+        '''
+        Queues page for indexing, full shard is sent to a worker.
+
+        Parameters
+        ----------
+        url : str
+            url of web page, pages must be added once in crawl order.
+        content : str
+            content of web page.
+
+        Returns
+        -------
+        int
+            document id of url.
+
+        '''
+        self._shard.append((url, content))
+        self.pages += 1
+        if len(self._shard) >= self.shard_size:
+            self._submit()
+        return self.pages - 1
+
+    def _submit(self) -> None:
+        ''' Private function for internal purpose. Sends queued pages to a worker. '''
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers)
+        first_doc_id = self.pages - len(self._shard)
+        self._futures.append(self._executor.submit(index_shard, self._shard, first_doc_id,
+                                                   self.positional, self.normalize))
+        self._shard = []
+        return
+
+    def finish(self, updatable : bool = False) -> InvertedIndex:
+        '''
+        Waits for all shards and returns merged index of all added pages.
+        Worker processes are stopped, indexer can not be used afterwards.
+        '''
+        try:
+            shards = [future.result() for future in self._futures]
+            # last partial shard is indexed here, no need to wait for a worker.
+            if self._shard:
+                shards.append(index_shard(self._shard, self.pages - len(self._shard),
+                                          self.positional, self.normalize))
+        finally:
+            self.close()
+        return merge_shards(shards, self.positional, updatable, self.normalize)
+
+    def close(self) -> None:
+        ''' Stops worker processes without merging. '''
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        self._shard, self._futures = [], []
+        return
+
+    def __enter__(self) -> 'ShardedIndexer':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+        return
+
+
+def build_sharded_index(pages, workers : int = None, shard_size : int = 256,
+                        positional : bool = True, updatable : bool = False,
+                        normalize : bool = False) -> InvertedIndex:
+    '''
+    Returns InvertedIndex of pages [(url, content), ...] built by ShardedIndexer.
+    '''
+    with ShardedIndexer(workers, shard_size, positional, normalize) as indexer:
+        for url, content in pages:
+            indexer.add(url, content)
+        return indexer.finish(updatable)
@@ -21,12 +21,35 @@ My Notes:
     Step2: Create a index for fast searching. This is done using dictionary (hash function).
            Index is maintained as hash table, which can respond to a query in a time
            that does not increase even if the size of index increases.
+           Hash table maps keyword to postings list of integer document ids with
+           term frequencies (InvertedIndex), each page is present once per keyword.
+           Word positions are kept too, so search supports AND, OR, NOT and
+           "phrase" queries (boolean_query.py).
+           Optionally words are normalized (lowercased, html tags and
+           punctuation removed) and sorted vocabulary gives autocomplete and
+           trailing wildcard queries (vocabulary.py).
     
     
 
 """
 
-from dummy_web_cache import cache
+import os
+import tempfile
+
+from async_crawler import AsyncCrawler
+from bm25 import BM25Scorer
+from boolean_query import (TERM, evaluate_query, expand_query, is_free_text, parse_query,
+                           query_keywords)
+from dummy_web_cache import cache, get_page
+from frontier import CrawledView, CrawlFrontier
+from index_segment import IndexSegment, write_segment
+from inverted_index import InvertedIndex
+from link_extractor import LINK, WORD, extract_links, extract_words_and_links, scan_page
+from page_rank import PageRankEngine
+from page_store import UNCHANGED
+from query_cache import QueryCache
+from sharded_indexer import ShardedIndexer
+from vocabulary import Vocabulary, normalize_term
 
 def get_test_page1(url):
     if url in cache:
@@ -34,7 +57,17 @@ def get_test_page1(url):
     return ""
 
 
-from typing import Tuple
+import heapq
+
+import numpy as np
+
+# marks query which is not in query cache, None is a valid result.
+_MISSING = object()
+
+
+def normalize_query(query : str) -> str:
+    ''' Returns query with single spaces between words, key of query cache. '''
+    return ' '.join(query.split())
 
 
 class WebCrawler:  
@@ -42,7 +75,12 @@ class WebCrawler:
     Class WebCrawler provides functionality in creating data for search
     engine by crawling pages from seed page provided.
     '''
-    def __init__(self, seed_page : str) -> None:
+    def __init__(self, seed_page : str, crawl_budget : int = 100, fetch = get_page,
+                 max_concurrency : int = None, per_host_limit : int = 2,
+                 per_host_delay : float = 0.0, crawl_order : str = 'dfs',
+                 crawl_priority = None, index_workers : int = None,
+                 index_shard_size : int = 256, page_store = None,
+                 normalize : bool = False) -> None:
         ''' 
         Constructor for webcrawler class
         
@@ -50,6 +88,39 @@ class WebCrawler:
             ----------
             seed_page : str
                 starting page from where we parse links and create data for search engine.
+            crawl_budget : int
+                maximum number of pages to crawl.
+            fetch : callable
+                fetch(url) -> html string used to read pages, default
+                dummy_web_cache.get_page reads pages from web (same default as
+                AsyncCrawler), get_test_page1 reads udacity test pages of
+                dummy_web_cache.cache.
+            max_concurrency : int
+                None crawls one page at a time. Otherwise pages are crawled by
+                AsyncCrawler with up to max_concurrency fetches in flight.
+            per_host_limit : int
+                concurrent crawl only, maximum fetches in flight to one host.
+            per_host_delay : float
+                concurrent crawl only, minimum seconds between fetches to one host.
+            crawl_order : str
+                order in which discovered links are crawled, 'dfs' (last
+                discovered link first, original order), 'bfs' or 'priority'.
+            crawl_priority : dict or callable
+                priority order only, {url: rank} or rank(url) used to crawl high
+                rank pages first, e.g. page ranks of earlier crawl. By default
+                pages with most in links discovered so far are crawled first.
+            index_workers : int
+                None indexes pages in crawl loop. Otherwise pages are indexed
+                by ShardedIndexer in index_workers processes and merged after crawl.
+            index_shard_size : int
+                sharded indexing only, number of pages sent to a worker at once.
+            page_store : PageStore
+                if given pages are fetched through page store (conditional GET,
+                fetch is not used), near duplicate pages are not indexed and
+                recrawl skips pages whose content did not change.
+            normalize : bool
+                index lowercased words without html tags and surrounding
+                punctuation (vocabulary.py) instead of raw words of page.
 
             Returns
             -------
@@ -60,92 +131,100 @@ class WebCrawler:
         #  of following hyper linkss. 80% of time surfer clicks links and 20% time types link on broswer.
         self.damping_factor = 0.8
         self.number_of_iterations = 10
+        # page rank iteration stops early once L1 change of ranks is below tolerance.
+        # None keeps running number_of_iterations like original udacity algorithm.
+        self.tolerance = None
+        # share rank of pages without out links with all pages (not done by original algorithm).
+        self.redistribute_dangling = False
+        # recrawl: ranks are warm started from previous ranks and iterate until L1
+        # change is below refresh_tolerance (at most refresh_max_iterations).
+        self.refresh_tolerance      = 1e-6
+        self.refresh_max_iterations = 100
+        # number of page rank iterations of last rank computation.
+        self.rank_iterations = 0
+        self.crawl_budget    = crawl_budget
+        self.fetch           = fetch
+        self.max_concurrency = max_concurrency
+        self.per_host_limit  = per_host_limit
+        self.per_host_delay  = per_host_delay
+        self.page_store      = page_store
+        if page_store is not None:
+            self.fetch       = page_store.get_page
         
         # member variables.
         self.seed_page    = seed_page
-        self.crawled_lst  = []
-        self.to_crawl_lst = [seed_page]
+        # urls waiting to be crawled and visited urls, O(1) membership checks.
+        self.frontier     = CrawlFrontier(crawl_order, crawl_priority)
+        self.frontier.push(seed_page)
+        self._crawled     = []
         # index is maintained as hash table, which can respond to a query in a time
-        # that does not increase even if the index increases.
-        self.index        = {}
+        # that does not increase even if the index increases. Word positions are
+        # kept for phrase queries and terms of every page for recrawl.
+        self.index        = InvertedIndex(positional=True, updatable=True, normalize=normalize)
+        # pages are indexed by worker processes while crawling, if index_workers is given.
+        self._indexer     = None
+        if index_workers is not None:
+            self._indexer = ShardedIndexer(index_workers, index_shard_size, positional=True,
+                                           normalize=normalize)
         # graph is to maintain out links for each url.
         self.graph        = {}
         # rank dictionary
         self.page_ranks   = {}
+        # crawled pages dropped as near duplicates of other pages (page_store).
+        self.duplicates   = []
         
         # create content index, graph and rank dictionary
-        self._crawl_web()
+        if self.max_concurrency is None:
+            self._crawl_web()
+        else:
+            self._crawl_web_concurrently()
+        if self._indexer is not None:
+            self.index = self._indexer.finish(updatable=True)
+            self._indexer = None
         self._compute_vrk_rank()
         return
+    
+    @property
+    def crawled_lst(self) -> CrawledView:
+        ''' Read only view of crawled urls in crawl order. '''
+        return CrawledView(self._crawled)
+    
+    @property
+    def to_crawl_lst(self) -> list:
+        ''' Urls discovered but not crawled yet (snapshot of frontier). '''
+        return self.frontier.pending()
      
-    def _get_next_target(self, page : str) -> Tuple[str, int]:
-        '''
-            Private function for internal purpose. This function returns the
-            first observed target link from page provided in argument. Function
-            is used during web crawling while parsing html web page for links.
-        Parameters
-        ----------
-            page : str
-                content page to search for first target link (i.e., hyper link)
-
-        Returns
-        -------
-            tuple (str, int)
-                tuple of url of first target link if found else None and
-                position of link in page provided if found else -1..
-
-        '''
-         
-        start_link_pos = page.find('<a href=')
-        if start_link_pos == -1:
-            return (None, 0)
-         
-        start_quote_pos = page.find('"', start_link_pos)
-        end_quote_pos = page.find('"', start_quote_pos+1)
-        url =  page[start_quote_pos+1:end_quote_pos]
-        return (url, end_quote_pos)
-     
-    def _get_all_links(self, page : str) ->list:
+    def _get_all_links(self, page : str, base_url : str = None) ->list:
         '''
             Private function for internal purpose. This function gets all hyper 
-            links from provided htmlpage and add links to to_crawl list if link is
-            not crawled.            
+            links from provided htmlpage in single scan of page (scan_page).
 
         Parameters
         ----------
             page : str
-                content page to search for first target link (i.e., hyper link).
+                content page to search for hyper links.
+            base_url : str
+                url of page, relative links are resolved against it.
 
         Returns
         -------
             list of hyper links contained in page.
 
         '''
-        content_page_from_end_pos = page
-        
-        links = []
-        while True:
-            url, end_pos = self._get_next_target(content_page_from_end_pos)
-            if url:
-                links.append(url)
-                content_page_from_end_pos = content_page_from_end_pos[end_pos:]
-            else:
-                break
-        
-        return links
+        return [url for kind, url in scan_page(page, base_url) if kind == LINK]
     
     
      
     def _update_to_crawl_lst(self, links : list):
         '''
             Private function for internal purpose. This function updates to_crawl
-            list from provided links list.
+            list (frontier) from provided links list.
             
         Parameters
         ----------
             links : list
-                scan links list if links to be scanned, if not scanned link is 
-                added to self.to_crawl list.
+                scan links list if links to be scanned, if link is neither
+                waiting in frontier nor crawled it is added to frontier.
 
         Returns
         -------
@@ -153,15 +232,16 @@ class WebCrawler:
 
         '''
         if links :
-            for item in links:
-                if item not in self.to_crawl_lst:
-                    self.to_crawl_lst.append(item)
+            self.frontier.extend(links)
         return
     
-    def _add_to_index(self, keyword : str, url : str):
+    def _add_to_index(self, keyword : str, url : str, position : int = 0):
         '''
             This is a private function used as helper for creating index of search engine.
-            Index is maintained as hash table using dictionary.
+            Index is maintained as hash table of postings lists (InvertedIndex).
+            url is interned to integer document id and each url is present once
+            in postings of keyword along with number of occurrences of keyword.
+            Content view of index looks like
                 { key1: <list of urls>, key2: <list of urls>, ...}
             example: {'<html>': ['http://www.udacity.com/cs101x/index.html',
                                  'http://www.udacity.com/cs101x/flying.html',
@@ -175,29 +255,30 @@ class WebCrawler:
         Parameters
         ----------
             keyword : str
-                keyword. If keyword already exists in index table, url is added to list
-                         corresponding to that keyword. 
+                keyword. If keyword already exists in index table, url is added to postings
+                         corresponding to that keyword (or its term frequency is
+                         incremented if url is already present).
                          else if keyword does not exits new entry for keyword is created 
-                         in index table and url is added to list for this new entry.
+                         in index table and url is added to postings for this new entry.
             url : str
                 url link for corresponding keyword to be added to index.
+            position : int
+                word position of keyword in page, used by phrase queries.
 
         Returns
         -------
             None.
 
         '''
-        if keyword in self.index:
-            self.index[keyword].append(url)
-        else:
-            self.index[keyword] = [url]
+        self.index.add_posting(keyword, self.index.intern(url), positions=(position,))
         return
         
     def _add_page_to_index(self, url : str, content : str):
         '''
             This is a private function used as helper for creating index of search engine.
-            This function reads the contents of the page and creates index using helper
-            function _add_to_index. 
+            This function reads the contents of the page and adds all words of page
+            (scan_page) with their term frequencies and word positions (for phrase
+            queries) to index in one step.
             The order in which the pages appear in the list of URL’s for corresponding keyword
             is the order the pages were crawled
         Parameters
@@ -212,15 +293,13 @@ class WebCrawler:
             None.
 
         '''
-        words = content.split()
-        for word in words:
-            self._add_to_index(word, url)
+        self.index.add_document(url, [word for kind, word in scan_page(content) if kind == WORD])
         return
      
     def _crawl_web(self)->list:
         '''
         Function crawls or spidering a web from seed provided in constructor.
-        Seed link is added to self.to_crawl_list in constructor.
+        Seed link is added to self.frontier in constructor.
         Performs following actionss:
                 1. Creates hash table with keyword as index and item as list of url's 
                    present for that keyword.
@@ -234,30 +313,75 @@ class WebCrawler:
 
         '''
         
-        while self.to_crawl_lst:
-            page = self.to_crawl_lst.pop()
-            
-            if page not in self.crawled_lst:
-                # IMPORTANT: change her to use right get function for url page.
-                content = get_test_page1(page)       
-                self._add_page_to_index(page, content)
-                out_links = self._get_all_links(content)
-                self._update_to_crawl_lst(out_links)
-                # create graph. Used for calculating rank while displaying result.
-                self.graph[page] = out_links
-                self.crawled_lst.append(page)
-                if(len(self.crawled_lst) > 100):
-                    break
+        while self.frontier and len(self._crawled) < self.crawl_budget:
+            # frontier never returns visited page.
+            page = self.frontier.pop()
+            content = self.fetch(page)
+            out_links = self._process_page(page, content)
+            self._update_to_crawl_lst(out_links)
              
         return self.crawled_lst
     
-    def _compute_vrk_rank(self) -> dict:
+    def _crawl_web_concurrently(self)->list:
+        '''
+        Same as _crawl_web, but up to max_concurrency pages are fetched at the
+        same time by AsyncCrawler. Pages are indexed in the order fetches complete.
+
+        Returns
+        -------
+        list of crawled url's'
+
+        '''
+        crawler = AsyncCrawler(self.fetch, self.max_concurrency,
+                               self.per_host_limit, self.per_host_delay)
+        crawler.crawl([], self.crawl_budget, self._process_page, self.frontier)
+        return self.crawled_lst
+    
+    def _process_page(self, page : str, content : str) -> list:
+        '''
+            Private function for internal purpose. Adds fetched page to index
+            and graph. Words and links are found by single scan of page. With
+            sharded indexing only links are extracted here and page is queued
+            for worker processes. Near duplicate page (page_store) is dropped
+            before it reaches index, its links are not followed.
+
+        Parameters
+        ----------
+            page : str
+                url of crawled page.
+            content : str
+                content of crawled page.
+
+        Returns
+        -------
+            list of hyper links contained in page.
+
+        '''
+        if self.page_store is not None and self.page_store.is_duplicate(page):
+            self.duplicates.append(page)
+            return []
+        if self._indexer is not None:
+            out_links = extract_links(content, page)
+            self._indexer.add(page, content)
+        else:
+            words, out_links = extract_words_and_links(content, page)
+            self.index.add_document(page, words)
+        # create graph. Used for calculating rank while displaying result.
+        self.graph[page] = out_links
+        self._crawled.append(page)
+        return out_links
+    
+    def _compute_vrk_rank(self, initial_ranks : dict = None) -> dict:
         '''
         The problem of deciding how to rank the pages leads to the question
         of how to decide popularity
         
         Compute page ranks for pages present in graph (self.graph) created
-        while web crawling.
+        while web crawling. Graph is compiled once into CSR adjacency arrays
+        and ranks are computed by vectorised power iteration (PageRankEngine).
+        With initial_ranks (ranks before recrawl) iteration is warm started and
+        stops once ranks converge (refresh_tolerance), which takes few
+        iterations when few pages changed.
         
         Reference: youtube channel link:
                 https://www.youtube.com/watch?v=9nkR2LLPiYo&list=PLAwxTw4SYaPmjFQ2w9j05WDX8Jtg5RXWW
@@ -276,34 +400,81 @@ class WebCrawler:
         }
 
         '''
-        npages = len(self.graph)
-        # base case. Initialize page rank for each webpage i.e., probability of 
-        # reaching that page by random surfer.
-        for page in self.graph:
-            self.page_ranks[page] = 1.0 / npages
-        
-        # recursive case
-        for i in range(0, self.number_of_iterations):
-            # ranks at time stamp t. ranks dictionary contains rank at time stamp (t-1)
-            newranks = {} 
-            # graph structure looks like below
-            # {
-            #   'url1': ['outgoing link 1, outgoing link 2, ...],
-            #   'url2': ['outgoing link 1, outgoing link 2, ...],
-            #   ...
-            # }
-            for page in self.graph:
-                newrank = (1 - self.damping_factor) / npages
-                # compue reachable probability through clicking.
-                for node in self.graph:
-                    # check if page is pointed by node, i.e., inlinks
-                    if page in self.graph[node]:
-                        newrank = newrank + self.damping_factor * (self.page_ranks[node]/(len(self.graph[node])))
-                # assign new rank for current page for time t
-                newranks[page] = newrank
-            self.page_ranks = newranks
+        if initial_ranks is None:
+            rank_engine = PageRankEngine(self.graph, self.damping_factor,
+                                         self.number_of_iterations, self.tolerance,
+                                         self.redistribute_dangling)
+        else:
+            rank_engine = PageRankEngine(self.graph, self.damping_factor,
+                                         self.refresh_max_iterations, self.refresh_tolerance,
+                                         self.redistribute_dangling)
+        self.page_ranks = rank_engine.compute_ranks(initial_ranks)
+        self.rank_iterations = rank_engine.iterations
         return self.page_ranks
     
+    def recrawl(self, urls) -> dict:
+        '''
+        Incrementally refreshes index, graph and ranks for changed, added or
+        removed pages instead of crawling everything again:
+            1. Every url is fetched again. Postings of its old content are
+               removed from index (only postings lists of its terms change)
+               and new content is indexed under same document id.
+            2. Out links of page replace its old edges in graph, new links
+               are added to frontier for later crawls.
+            3. Page which can not be fetched any more (empty content) is
+               removed from index, graph and crawled list.
+            4. Page ranks are warm started from previous ranks.
+        With page_store pages are fetched with conditional GET, page whose
+        content did not change is not indexed again and page which became
+        near duplicate of another page is removed.
+
+        Parameters
+        ----------
+        urls : iterable of str
+            changed, added or removed urls.
+
+        Returns
+        -------
+        dict
+            number of 'added', 'updated', 'removed' and 'unchanged' pages.
+
+        '''
+        counts = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        removed = set()
+        for url in dict.fromkeys(urls):
+            known = url in self.graph
+            if self.page_store is not None:
+                result = self.page_store.fetch(url)
+                if result.status == UNCHANGED and known:
+                    counts['unchanged'] += 1
+                    continue
+                # near duplicate of another page is dropped like removed page.
+                content = result.content if result.duplicate_of is None else ''
+            else:
+                content = self.fetch(url)
+            if known:
+                self.index.remove_document(url)
+            if not content:
+                if known:
+                    del self.graph[url]
+                    removed.add(url)
+                    counts['removed'] += 1
+                continue
+            words, out_links = extract_words_and_links(content, url)
+            self.index.add_document(url, words)
+            self.graph[url] = out_links
+            if known:
+                counts['updated'] += 1
+            else:
+                self.frontier.mark_visited(url)
+                self._crawled.append(url)
+                counts['added'] += 1
+            self._update_to_crawl_lst(out_links)
+        if removed:
+            self._crawled[:] = [url for url in self._crawled if url not in removed]
+        self._compute_vrk_rank(self.page_ranks)
+        return counts
+    
    # Following are PUBLIC functions.
     
     def get_created_search_index(self) ->list:
@@ -320,7 +491,7 @@ class WebCrawler:
                 url link for corresponding keyword to be added to index.
 
         '''
-        return self.index
+        return self.index.content_view()
     
     def get_url_ranks(self)->dict:
         '''
@@ -341,7 +512,19 @@ class WebCrawler:
         Returns
         -------
         dict
-            returns content index of cralwer.
+            returns read only {keyword: [url, ...]} view of content index of cralwer.
+
+        '''
+        return self.index.content_view()
+    
+    def get_inverted_index(self)->InvertedIndex:
+        '''
+        Used by search engine to get postings lists of content index.
+
+        Returns
+        -------
+        InvertedIndex
+            returns inverted index of cralwer.
 
         '''
         return self.index
@@ -349,13 +532,202 @@ class WebCrawler:
     
 class MySeachEngine:
     
-    def __init__(self, seed:str):
-        # prepare index and ranking for searching
-        webcrawler = WebCrawler(seed)
-        self.index = webcrawler.get_content_index()
-        self.ranks = webcrawler.get_url_ranks()
+    # ordered_search uses heap selection when k is less than 1/HEAP_FRACTION of results.
+    HEAP_FRACTION = 8
+    # BM25 parameters of search and weight of page rank (scaled to [0, 1]) added to BM25 score.
+    BM25_K1     = 1.2
+    BM25_B      = 0.75
+    RANK_WEIGHT = 1.0
+    # size limit of query result cache in bytes.
+    QUERY_CACHE_BYTES = 16 * 2**20
+    
+    def __init__(self, seed:str, normalize : bool = False):
+        # prepare index and ranking for searching, normalize indexes lowercased
+        # words without html tags and punctuation (queries are normalized too).
+        # seed is a udacity test page, pages are read from dummy_web_cache.cache.
+        self.webcrawler = WebCrawler(seed, fetch=get_test_page1, normalize=normalize)
+        self._attach(self.webcrawler.get_inverted_index(), self.webcrawler.get_url_ranks(),
+                     self.webcrawler.graph)
+        # index is built here, so rank sorted postings are prepared up front.
+        self.build_rank_order()
         return
     
+    @classmethod
+    def from_inverted_index(cls, inverted_index : InvertedIndex, ranks : dict,
+                            graph : dict = None) -> 'MySeachEngine':
+        '''
+        Creates search engine over already built index and ranks without crawling.
+
+        Parameters
+        ----------
+        inverted_index : InvertedIndex
+            content index.
+        ranks : dict
+            page rank of each url.
+        graph : dict
+            link graph {url: [out links]}, only needed to save index.
+
+        Returns
+        -------
+        MySeachEngine
+            search engine for given index.
+
+        '''
+        search_engine = cls.__new__(cls)
+        search_engine._attach(inverted_index, ranks, graph)
+        return search_engine
+    
+    @classmethod
+    def from_index(cls, path : str) -> 'MySeachEngine':
+        '''
+        Creates search engine from index segment file written by save_index.
+        File is memory mapped, so start up does not depend on index size and
+        processes serving same file share its pages.
+
+        Parameters
+        ----------
+        path : str
+            index segment file path.
+
+        Returns
+        -------
+        MySeachEngine
+            search engine for saved index.
+
+        '''
+        segment = IndexSegment(path)
+        search_engine = cls.__new__(cls)
+        search_engine._attach(segment, segment.rank_view(), None, segment.doc_ranks)
+        return search_engine
+    
+    def recrawl(self, urls) -> dict:
+        '''
+        Refreshes index and ranks for changed, added or removed urls
+        (WebCrawler.recrawl). Cached query results become stale and rank
+        sorted postings are sorted again on first query of each keyword.
+
+        Parameters
+        ----------
+        urls : iterable of str
+            changed, added or removed urls.
+
+        Returns
+        -------
+        dict
+            number of 'added', 'updated', 'removed' and 'unchanged' pages.
+
+        '''
+        webcrawler = getattr(self, 'webcrawler', None)
+        if webcrawler is None:
+            raise ValueError('search engine was not created by crawling, nothing to recrawl')
+        counts = webcrawler.recrawl(urls)
+        self._attach(webcrawler.get_inverted_index(), webcrawler.get_url_ranks(),
+                     webcrawler.graph)
+        return counts
+    
+    def save_index(self, path : str, codec : str = 'vbyte') -> None:
+        '''
+        Saves index, ranks and link graph to binary index segment file, which
+        can be loaded with MySeachEngine.from_index.
+
+        Parameters
+        ----------
+        path : str
+            index segment file path.
+        codec : str
+            postings codec of segment, 'raw', 'vbyte' or 'for' (postings_codec.py).
+
+        Returns
+        -------
+        None.
+
+        '''
+        graph = self.graph
+        if graph is None and isinstance(self.inverted_index, IndexSegment):
+            graph = self.inverted_index.graph()
+        write_segment(path, self.inverted_index, self.ranks, graph, codec)
+        return
+    
+    def _attach(self, inverted_index : InvertedIndex, ranks : dict, graph : dict = None,
+                doc_ranks : np.ndarray = None):
+        '''
+            Private function for internal purpose. Sets index and ranks used
+            for searching.
+        '''
+        self.inverted_index = inverted_index
+        self.index = inverted_index.content_view()
+        self.ranks = ranks
+        self.graph = graph
+        # rank of each document indexed by document id of inverted index.
+        if doc_ranks is None:
+            doc_ranks = np.array([ranks.get(url, 0.0) for url in inverted_index.urls],
+                                 dtype=np.float64)
+        self.doc_ranks = doc_ranks
+        # term -> document ids of postings sorted by rank (best first), see build_rank_order.
+        self.rank_order = {}
+        # BM25 scorer of search, created on first search.
+        self.scorer = None
+        # sorted terms for autocomplete and wildcards, created on first use.
+        self.vocabulary = None
+        # index and ranks are (re)built, cached query results become stale.
+        self.generation = getattr(self, 'generation', -1) + 1
+        if getattr(self, 'query_cache', None) is None:
+            self.query_cache = QueryCache(self.QUERY_CACHE_BYTES)
+        return
+    
+    def _rank_sorted(self, doc_ids : np.ndarray) -> np.ndarray:
+        '''
+            Private function for internal purpose. Returns document ids sorted by
+            rank, best first. Pages with same rank stay in crawl order.
+        '''
+        order = np.argsort(-self.doc_ranks[doc_ids], kind='stable')
+        return np.ascontiguousarray(doc_ids[order], dtype=np.uint32)
+    
+    def build_rank_order(self) -> None:
+        '''
+        Precomputes postings of every term sorted by rank, after which
+        ordered_search and lucky_search only read first k entries, i.e., O(k).
+        Terms not prepared here are sorted on their first ordered_search.
+
+        Returns
+        -------
+        None.
+
+        '''
+        for term in self.inverted_index.terms():
+            self.rank_order[term] = self._rank_sorted(self.inverted_index.doc_ids(term))
+        return
+    
+    def _top_doc_ids(self, keyword : str, k : int = None) -> np.ndarray:
+        '''
+            Private function for internal purpose. Returns document ids of best
+            k pages for keyword sorted by rank (all pages if k is None), None
+            if keyword is not indexed.
+                1. rank sorted postings already known: first k entries.
+                2. k small compared to number of pages: heap selection, O(n log k).
+                3. otherwise postings are sorted and kept for next queries.
+        '''
+        order = self.rank_order.get(keyword)
+        if order is not None:
+            return order if k is None else order[:k]
+        doc_ids = self.inverted_index.doc_ids(keyword)
+        if doc_ids is None:
+            return None
+        if k is not None and k * self.HEAP_FRACTION < len(doc_ids):
+            return self._heap_top(doc_ids, k)
+        order = self.rank_order[keyword] = self._rank_sorted(doc_ids)
+        return order if k is None else order[:k]
+    
+    def _heap_top(self, doc_ids : np.ndarray, k : int) -> np.ndarray:
+        '''
+            Private function for internal purpose. Returns best k of doc_ids
+            sorted by rank using heap selection, O(n log k).
+        '''
+        ranks = self.doc_ranks[doc_ids].tolist()
+        # nlargest is stable, pages with same rank stay in crawl order.
+        best = heapq.nlargest(k, range(len(ranks)), key=ranks.__getitem__)
+        return doc_ids[best]
+    
     def lucky_search(self, keyword : str) ->str:
         '''
         Lucky search returns website with best rank value for given keyword
@@ -371,42 +743,223 @@ class MySeachEngine:
             best rank website for given keyword.
 
         '''
-        result_pages  = self.lookup(keyword)
-        if not result_pages:
+        return self._cached(('lucky', keyword), self._lucky_search, keyword)
+    
+    def _lucky_search(self, keyword : str) -> str:
+        ''' Private function for internal purpose. lucky_search without query cache. '''
+        if self.inverted_index.normalize:
+            keyword = normalize_term(keyword)
+        order = self.rank_order.get(keyword)
+        if order is not None:
+            return self.inverted_index.url(int(order[0]))
+        doc_ids = self.inverted_index.doc_ids(keyword)
+        if doc_ids is None:
             return None
-        best_page = result_pages[0]
-        for page in result_pages:
-            if self.ranks[page] > self.ranks[best_page]:
-                best_page = page
-        return best_page
+        # first page with best rank, document ids are used without creating url list.
+        best_doc_id = doc_ids[np.argmax(self.doc_ranks[doc_ids])]
+        return self.inverted_index.url(int(best_doc_id))
         
-    def ordered_search(self, keyword:str)->list:
-        # TODO: return multiple url's in the order of rank
-        return
+    def ordered_search(self, query : str, k : int = None) -> list:
+        '''
+        Returns websites for keyword or query in the order of rank, best rank first.
+
+        Parameters
+        ----------
+        query : str
+            keyword or query with AND, OR, NOT and "phrase" (see boolean_query.py).
+        k : int
+            number of websites to return, all websites if None, empty list if 0.
+
+        Returns
+        -------
+        list
+            websites sorted by rank, None if no website matches.
+
+        '''
+        if k is not None:
+            k = self._check_k(k)
+            if k < 0:
+                raise ValueError('k must not be negative, got %r' % (k,))
+            if k == 0:
+                return []
+        return self._cached(('ordered', normalize_query(query), k),
+                            self._ordered_search, query, k)
     
+    def _ordered_search(self, query : str, k : int) -> list:
+        ''' Private function for internal purpose. ordered_search without query cache. '''
+        node = self._parse(query)
+        if node is None:
+            return None
+        if node[0] == TERM:
+            doc_ids = self._top_doc_ids(node[1], k)
+        else:
+            doc_ids = evaluate_query(node, self.inverted_index)
+            if k is not None and k * self.HEAP_FRACTION < len(doc_ids):
+                doc_ids = self._heap_top(doc_ids, k)
+            else:
+                doc_ids = self._rank_sorted(doc_ids)[:k]
+        if doc_ids is None or len(doc_ids) == 0:
+            return None
+        url = self.inverted_index.url
+        return [url(doc_id) for doc_id in doc_ids.tolist()]
     
-    def lookup(self, keyword : str) -> list:
+    def search(self, query : str, k : int = 10) -> list:
         '''
-        Returns the links for keyword   
+        Returns best k websites for query by relevance: BM25 score of query
+        keywords blended with page rank (RANK_WEIGHT). Free text query matches
+        websites containing any keyword. Query with AND, OR, NOT or "phrase"
+        matches same websites as lookup, which are then ordered by score.
 
         Parameters
         ----------
-        keyword : str
-            keyword to search for.
+        query : str
+            keywords or boolean query.
+        k : int
+            number of websites to return, empty list if k is 0 or negative.
 
         Returns
         -------
-        list of websites of keyword.
+        list
+            websites best score first, None if no website matches.
 
         '''
-        if keyword in self.index:
-            return self.index[keyword]
+        k = self._check_k(k)
+        if k <= 0:
+            return []
+        return self._cached(('search', normalize_query(query), k), self._search, query, k)
+    
+    def _check_k(self, k) -> int:
+        '''
+            Private function for internal purpose. Returns k as int, raises
+            ValueError (400 of query server) if k is not an int.
+        '''
+        if isinstance(k, bool) or not isinstance(k, (int, np.integer)):
+            raise ValueError('k must be an int, got %r' % (k,))
+        return int(k)
+    
+    def _search(self, query : str, k : int) -> list:
+        ''' Private function for internal purpose. search without query cache. '''
+        if self.scorer is None:
+            self.scorer = BM25Scorer(self.inverted_index, self.doc_ranks, self.BM25_K1,
+                                     self.BM25_B, self.RANK_WEIGHT)
+        node = self._parse(query)
+        if is_free_text(query):
+            doc_ids, _ = self.scorer.top_k(query_keywords(node), k)
         else:
+            doc_ids, _ = self.scorer.top_k(query_keywords(node), k,
+                                           evaluate_query(node, self.inverted_index))
+        if len(doc_ids) == 0:
             return None
-        
-        
-     
-            
+        url = self.inverted_index.url
+        return [url(doc_id) for doc_id in doc_ids.tolist()]
+    
+    def lookup(self, query : str) -> list:
+        '''
+        Returns the links for keyword or query in crawl order. Query can combine
+        keywords with AND, OR, NOT, parenthesis and "quoted phrases", e.g.
+            'Hummus AND "recipe for" NOT garlic'
+        Keywords of query are intersected starting from rarest keyword, so
+        common keywords do not cost their full postings length.
+
+        Parameters
+        ----------
+        query : str
+            keyword or query to search for.
+
+        Returns
+        -------
+        list of websites of keyword, None if no website matches.
+
+        '''
+        return self._cached(('lookup', normalize_query(query)), self._lookup, query)
+    
+    def _lookup(self, query : str) -> list:
+        ''' Private function for internal purpose. lookup without query cache. '''
+        node = self._parse(query)
+        if node is None:
+            return None
+        if node[0] == TERM:
+            return self.inverted_index.lookup_urls(node[1])
+        doc_ids = evaluate_query(node, self.inverted_index)
+        if len(doc_ids) == 0:
+            return None
+        url = self.inverted_index.url
+        return [url(doc_id) for doc_id in doc_ids.tolist()]
+    
+    def _parse(self, query : str) -> tuple:
+        '''
+            Private function for internal purpose. Parses query, normalizes its
+            keywords (normalized index) and expands trailing wildcards.
+        '''
+        node = parse_query(query)
+        normalize = normalize_term if self.inverted_index.normalize else None
+        if node is None or (node[0] == TERM and normalize is None):
+            return node
+        return expand_query(node, lambda prefix: self.get_vocabulary().expand(prefix), normalize)
+    
+    def get_vocabulary(self) -> Vocabulary:
+        '''
+        Returns sorted vocabulary of index with document frequencies, built on
+        first call after index changes.
+        '''
+        generation = self.cache_generation()
+        if self.vocabulary is None or self._vocabulary_generation != generation:
+            self.vocabulary = Vocabulary.from_index(self.inverted_index)
+            self._vocabulary_generation = generation
+        return self.vocabulary
+    
+    def autocomplete(self, prefix : str, k : int = 10) -> list:
+        '''
+        Returns indexed terms starting with prefix, most frequent (highest
+        document frequency) first.
+
+        Parameters
+        ----------
+        prefix : str
+            beginning of keyword, normalized like keywords for normalized index.
+        k : int
+            number of terms to return.
+
+        Returns
+        -------
+        list
+            at most k terms.
+
+        '''
+        if self.inverted_index.normalize and prefix:
+            prefix = normalize_term(prefix)
+        return self.get_vocabulary().autocomplete(prefix, k)
+    
+    def _cached(self, key : tuple, search, *args):
+        '''
+            Private function for internal purpose. Returns result of key from
+            query cache, or result of search(*args) which is then cached.
+            Lists are cached as tuples and copied on hit, so callers can not
+            change cached results.
+        '''
+        generation = self.cache_generation()
+        result = self.query_cache.get(key, generation, _MISSING)
+        if result is _MISSING:
+            result = search(*args)
+            self.query_cache.put(key, generation,
+                                 tuple(result) if isinstance(result, list) else result)
+            return result
+        return list(result) if isinstance(result, tuple) else result
+    
+    def cache_generation(self) -> tuple:
+        '''
+        Returns generation of index and ranks used by query cache, changes
+        whenever index or ranks are rebuilt or documents are added to index.
+        '''
+        return (self.generation, self.inverted_index.generation)
+    
+    def cache_stats(self) -> dict:
+        '''
+        Returns query cache counters: entries, bytes, max_bytes, hits, misses,
+        hit_ratio, evictions and invalidations.
+        '''
+        return self.query_cache.stats()
+
 
 if __name__ == '__main__':
     search_engine = MySeachEngine("http://udacity.com/cs101x/urank/index.html")
@@ -419,4 +972,57 @@ if __name__ == '__main__':
     
     print(search_engine.ordered_search('Hummus'))
     
-     
+    # [TEST CASE2] recrawl of changed, removed and added pages gives same index,
+    # ranks and query results as crawling the changed web again.
+    def index_snapshot(index):
+        ''' {term: {url: positions}} and {url: length} of live documents. '''
+        postings = {}
+        for term in index.terms():
+            doc_ids = index.doc_ids(term)
+            counts, positions = index.positions(term, doc_ids)
+            bounds = np.cumsum(counts).tolist()
+            postings[term] = {index.url(doc_id): positions[end - count:end].tolist()
+                              for doc_id, count, end in zip(doc_ids.tolist(), counts.tolist(), bounds)}
+        lengths = {index.url(doc_id): index.doc_lengths[doc_id]
+                   for doc_id in index.live_doc_ids().tolist()}
+        return postings, lengths
+    
+    urank = 'http://udacity.com/cs101x/urank/'
+    changed = {urank + 'index.html': cache[urank + 'index.html'].replace(
+                   'and <a href="%szinc.html">Zinc Chef</a>.' % urank, ''),
+               urank + 'zinc.html': None,
+               urank + 'kathleen.html': cache[urank + 'kathleen.html'].replace(
+                   'tahini sauce', '<a href="%stahini.html">tahini</a> sauce' % urank),
+               urank + 'tahini.html': '<html><body>Tahini is sesame paste, the base of hummus.</body></html>'}
+    saved = {url: cache.get(url) for url in changed}
+    try:
+        for url, content in changed.items():
+            if content is None:
+                del cache[url]
+            else:
+                cache[url] = content
+        counts = search_engine.recrawl(changed)
+        assert counts == {'added': 1, 'updated': 2, 'removed': 1, 'unchanged': 0}, counts
+        rebuilt = MySeachEngine(urank + 'index.html')
+        assert index_snapshot(search_engine.inverted_index) == index_snapshot(rebuilt.inverted_index)
+        assert search_engine.ranks.keys() == rebuilt.ranks.keys()
+        for url, rank in rebuilt.ranks.items():
+            assert abs(search_engine.ranks[url] - rank) < 1e-6, url
+        for query in ['NOT the', 'hummus AND NOT tahini', 'hummus OR zinc', '"tahini sauce"']:
+            assert search_engine.lookup(query) == rebuilt.lookup(query), query
+            assert search_engine.ordered_search(query) == rebuilt.ordered_search(query), query
+            assert search_engine.search(query) == rebuilt.search(query), query
+        # removed page must not come back from saved index segment either.
+        with tempfile.TemporaryDirectory() as directory:
+            search_engine.save_index(os.path.join(directory, 'recrawled.seg'))
+            loaded = MySeachEngine.from_index(os.path.join(directory, 'recrawled.seg'))
+            assert index_snapshot(loaded.inverted_index) == index_snapshot(rebuilt.inverted_index)
+            assert loaded.lookup('NOT the') == rebuilt.lookup('NOT the')
+            del loaded
+        print('[TEST CASE2] recrawl gives same index as full crawl', counts)
+    finally:
+        for url, content in saved.items():
+            if content is None:
+                cache.pop(url, None)
+            else:
+                cache[url] = content
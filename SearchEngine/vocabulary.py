@@ -0,0 +1,211 @@
+"""
+File Created: 18th October 2026
+Author: Venkata Ravi K A
+Reference: https://nlp.stanford.edu/IR-book/html/htmledition/normalization-equivalence-classing-of-terms-1.html
+           https://nlp.stanford.edu/IR-book/html/htmledition/wildcard-queries-1.html
+
+
+My Notes:
+    Index terms used to be raw whitespace separated words of page, so lookup
+    needed exact case sensitive tokens and vocabulary was full of html noise
+    like '<html>', '<li>' or 'hummus.</p>'.
+
+    Normalized vocabulary (InvertedIndex(normalize=True)):
+        1. html tags and comments are removed (tag spanning several words,
+           e.g. <a href="...">, is removed as a whole),
+        2. words are lowercased,
+        3. punctuation is trimmed from both ends of every word ("don't" and
+           "u.s" keep inner punctuation), words left empty are dropped.
+    Positions are counted after normalization, so phrase queries still match
+    neighbouring words. Queries are normalized the same way (normalize_term).
+
+    Vocabulary is sorted array of terms with document frequency of every term:
+        1. Terms starting with prefix are a contiguous range of sorted terms,
+           found with two binary searches (bisect).
+        2. autocomplete(prefix, k) returns k terms of range with highest
+           document frequency. Small range is selected with numpy partition.
+           Short prefixes ('', 't', 'th') have huge ranges, so best TOP_K terms
+           of every prefix whose range has more than SCAN_LIMIT terms are
+           precomputed when vocabulary is built. Number of such prefixes is
+           small (at most n / SCAN_LIMIT per prefix length), so every query
+           touches at most SCAN_LIMIT document frequencies.
+        3. Trailing wildcard 'hum*' is expanded into most frequent
+           MAX_EXPANSIONS terms starting with 'hum' (boolean_query.py).
+"""
+
+import bisect
+import re
+import string
+
+import numpy as np
+
+# html comments and tags (tag may be unterminated at end of text).
+_TAG_RE = re.compile(r'<!--.*?-->|<[/!?]?[A-Za-z][^<>]*>?', re.DOTALL)
+_PUNCTUATION = string.punctuation + '‘’“”«»…–—'
+
+
+def normalize_words(words) -> list:
+    '''
+    Returns normalized index terms of words of page.
+
+    Parameters
+    ----------
+    words : iterable of str
+        whitespace separated words of page (scan_page), may contain html.
+
+    Returns
+    -------
+    list
+        lowercased words without html tags and surrounding punctuation, in
+        page order.
+
+    '''
+    text = _TAG_RE.sub(' ', ' '.join(words)).lower()
+    return [word for word in [word.strip(_PUNCTUATION) for word in text.split()] if word]
+
+
+def normalize_term(term : str) -> str:
+    '''
+    Returns query keyword normalized like index terms, '' if nothing is left
+    (e.g. '<li>').
+    '''
+    return ' '.join(normalize_words((term,)))
+
+
+class Vocabulary:
+    '''
+    Class Vocabulary keeps sorted terms of index with their document
+    frequencies for prefix autocomplete and wildcard expansion.
+    '''
+    # best terms are precomputed for prefixes with more terms than SCAN_LIMIT.
+    SCAN_LIMIT = 2048
+    TOP_K      = 64
+    # most frequent terms a trailing wildcard expands to, at most TOP_K.
+    MAX_EXPANSIONS = 64
+
+    def __init__(self, terms, doc_freqs) -> None:
+        '''
+        Constructor for vocabulary class
+
+            Parameters
+            ----------
+            terms : iterable of str
+                distinct terms.
+            doc_freqs : iterable of int
+                number of documents of every term.
+
+            Returns
+            -------
+            None
+        '''
+        terms = list(terms)
+        doc_freqs = np.asarray(doc_freqs, dtype=np.int64)
+        order = sorted(range(len(terms)), key=terms.__getitem__)
+        self.terms     = [terms[i] for i in order]
+        self.doc_freqs = doc_freqs[np.array(order, dtype=np.int64)]
+        # prefix -> term numbers of best TOP_K terms of prefix, best first.
+        self._tops = {}
+        self._precompute('', 0, len(self.terms))
+        return
+
+    @classmethod
+    def from_index(cls, index) -> 'Vocabulary':
+        ''' Returns vocabulary of InvertedIndex or IndexSegment. '''
+        doc_freqs = {term: df for term, df in index.document_frequencies().items() if df > 0}
+        return cls(doc_freqs.keys(), list(doc_freqs.values()))
+
+    def _precompute(self, prefix : str, low : int, high : int) -> None:
+        '''
+            Private function for internal purpose. Keeps best terms of prefix
+            (range low:high) and of its longer prefixes with large ranges.
+        '''
+        if high - low <= self.SCAN_LIMIT:
+            return
+        self._tops[prefix] = self._best(low, high, self.TOP_K)
+        terms = self.terms
+        depth = len(prefix)
+        # term equal to prefix sorts first, other terms are grouped by next character.
+        position = low + (terms[low] == prefix)
+        while position < high:
+            child = prefix + terms[position][depth]
+            end = _prefix_end(terms, child, position, high)
+            self._precompute(child, position, end)
+            position = end
+        return
+
+    def _best(self, low : int, high : int, k : int) -> np.ndarray:
+        '''
+            Private function for internal purpose. Term numbers of k terms of
+            range low:high with highest document frequency, ties in term order.
+        '''
+        doc_freqs = self.doc_freqs[low:high]
+        if len(doc_freqs) > k:
+            kth = np.partition(doc_freqs, len(doc_freqs) - k)[len(doc_freqs) - k]
+            candidates = np.flatnonzero(doc_freqs >= kth)
+        else:
+            candidates = np.arange(len(doc_freqs))
+        order = np.lexsort((candidates, -doc_freqs[candidates]))[:k]
+        return low + candidates[order]
+
+    def prefix_range(self, prefix : str) -> tuple:
+        ''' Returns (low, high) range of sorted terms starting with prefix. '''
+        low = bisect.bisect_left(self.terms, prefix)
+        return low, _prefix_end(self.terms, prefix, low, len(self.terms))
+
+    def autocomplete(self, prefix : str, k : int = 10) -> list:
+        '''
+        Returns terms starting with prefix, most frequent first.
+
+        Parameters
+        ----------
+        prefix : str
+            beginning of term, '' matches every term.
+        k : int
+            number of terms to return.
+
+        Returns
+        -------
+        list
+            at most k terms sorted by document frequency (highest first),
+            terms with same frequency in sorted order.
+
+        '''
+        if k <= 0:
+            return []
+        top = self._tops.get(prefix)
+        if top is not None and k <= len(top):
+            best = top[:k]
+        else:
+            low, high = self.prefix_range(prefix)
+            best = self._best(low, high, k)
+        terms = self.terms
+        return [terms[i] for i in best.tolist()]
+
+    def expand(self, prefix : str) -> list:
+        ''' Returns terms of trailing wildcard prefix*, at most MAX_EXPANSIONS terms. '''
+        return self.autocomplete(prefix, self.MAX_EXPANSIONS)
+
+    def document_frequency(self, term : str) -> int:
+        ''' Returns number of documents of term, 0 if term is unknown. '''
+        position = bisect.bisect_left(self.terms, term)
+        if position < len(self.terms) and self.terms[position] == term:
+            return int(self.doc_freqs[position])
+        return 0
+
+    def __contains__(self, term : str) -> bool:
+        return self.document_frequency(term) > 0
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+
+def _prefix_end(terms : list, prefix : str, low : int, high : int) -> int:
+    '''
+        Private function for internal purpose. End of range of sorted terms
+        starting with prefix, range starts at low and ends before high.
+    '''
+    # smallest string greater than every string starting with prefix.
+    last = prefix.rstrip('\U0010ffff')
+    if not last:
+        return high
+    return bisect.bisect_left(terms, last[:-1] + chr(ord(last[-1]) + 1), low, high)
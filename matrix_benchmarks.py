@@ -0,0 +1,495 @@
+# -*- coding: utf-8 -*-
+
+# Author: Venkata Ravi Kumar
+# File name: matrix_benchmarks.py
+# References: Trefethen and Bau, Numerical Linear Algebra (lectures 8, 10, 20, 21).
+
+# Benchmarks for matrix utilities of this repository. Every benchmark works on
+# random matrices generated here.
+#
+# usage: python matrix_benchmarks.py <benchmark> [--size N]
+#        python matrix_benchmarks.py gsbatch --size 20000
+#        python matrix_benchmarks.py incremental --size 2000
+#        python matrix_benchmarks.py rank --size 100000
+#        python matrix_benchmarks.py outofcore --size 2000000
+#        python matrix_benchmarks.py singular --size 100000
+#        python matrix_benchmarks.py classify --size 2000
+#        python matrix_benchmarks.py condition --size 2000
+#        python matrix_benchmarks.py sparse --size 1000000
+#        python matrix_benchmarks.py screen --size 1000000
+
+import argparse
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import scipy.sparse as sps
+
+from GrahmSchmidtOrthonormal import GrahmSchmidtOrthonormal, IncrementalOrthonormalBasis
+from IdentifyingSpecialMatrices import MatrixScreener, SpecialMatrix
+
+
+def orthogonalityError(bases) :
+    # Largest |Q^T Q - I| entry over all matrices, zero (dependent) columns left out.
+    worst = 0.0
+    for basis in bases :
+        columns = basis[:, np.linalg.norm(basis, axis=0) > 0.5]
+        gram = columns.T @ columns
+        worst = max(worst, np.abs(gram - np.eye(gram.shape[0])).max())
+    return worst
+
+
+def illConditionedStack(numMatrices, size, numVectors, seed=3) :
+    # Matrices with singular values from 1 down to 1e-10, Gram-Schmidt loses orthogonality on them.
+    rng = np.random.default_rng(seed)
+    left, _ = np.linalg.qr(rng.standard_normal((numMatrices, size, numVectors)))
+    right, _ = np.linalg.qr(rng.standard_normal((numMatrices, numVectors, numVectors)))
+    singular = np.logspace(0, -10, numVectors)
+    return (left * singular) @ right
+
+
+def benchGsBatch(size=20000) :
+    # Throughput (matrices/sec) of looping gsBasis vs batched Modified Gram-Schmidt and Householder.
+    GrahmSchmidtAlgo = GrahmSchmidtOrthonormal()
+    rng = np.random.default_rng(7)
+    for shape in [(8, 6), (16, 16), (32, 16)] :
+        stack = rng.standard_normal((size,) + shape)
+        # every 10th matrix has a dependent vector.
+        stack[::10, :, -1] = stack[::10, :, 0] - 2 * stack[::10, :, 1]
+        loopCount = min(size, 2000)
+        start = time.perf_counter()
+        reference = [GrahmSchmidtAlgo.gsBasis(matrix) for matrix in stack[:loopCount]]
+        loopTime = (time.perf_counter() - start) / loopCount
+        referenceRanks = np.array([round(dimensions) for _, dimensions in reference])
+        print('%d matrices of shape %s, gsBasis loop %10.0f matrices/sec'
+              % (size, shape, 1.0 / loopTime))
+        for method in ['mgs', 'householder'] :
+            start = time.perf_counter()
+            bases, ranks = GrahmSchmidtAlgo.gsBasisBatch(stack, method)
+            batchTime = (time.perf_counter() - start) / size
+            same = (np.array_equal(ranks[:loopCount], referenceRanks)
+                    and all(np.allclose(bases[i], reference[i][0], atol=1e-8) for i in range(loopCount)))
+            print('  %-12s %10.0f matrices/sec  speed up %6.1fx  same as gsBasis %s'
+                  % (method, 1.0 / batchTime, loopTime / batchTime, same))
+
+    stack = illConditionedStack(1000, 32, 16)
+    print('ill conditioned (cond 1e10) 1000 matrices 32 x 16, max |Q^T Q - I|')
+    print('  %-12s %.2e' % ('gsBasis', orthogonalityError(
+        [GrahmSchmidtAlgo.gsBasis(matrix)[0] for matrix in stack])))
+    for method in ['mgs', 'householder'] :
+        bases, ranks = GrahmSchmidtAlgo.gsBasisBatch(stack, method)
+        print('  %-12s %.2e' % (method, orthogonalityError(bases)))
+    return
+
+
+def benchIncremental(size=2000) :
+    # Cost per inserted vector of rebuilding basis with gsBasis after every insert vs
+    # IncrementalOrthonormalBasis.add and extend, on a stream of vectors of length size.
+    rng = np.random.default_rng(11)
+    GrahmSchmidtAlgo = GrahmSchmidtOrthonormal()
+    for numVectors in [50, 200] :
+        # columns of about unit length, gsBasis detects dependent vectors with absolute threshold.
+        stream = rng.standard_normal((size, numVectors)) / np.sqrt(size)
+        # every 10th vector is in span of earlier ones.
+        for dependent in range(10, numVectors, 10) :
+            stream[:, dependent] = stream[:, dependent - 10] - 2 * stream[:, dependent - 9]
+        # rebuilding is O(k^2) per insert, time only first rebuildCount inserts.
+        rebuildCount = min(numVectors, 100)
+        start = time.perf_counter()
+        for count in range(1, rebuildCount + 1) :
+            rebuilt, rebuiltDimension = GrahmSchmidtAlgo.gsBasis(stream[:, :count])
+        rebuildTime = (time.perf_counter() - start) / rebuildCount
+        
+        start = time.perf_counter()
+        incremental = IncrementalOrthonormalBasis(size)
+        for count in range(numVectors) :
+            incremental.add(stream[:, count])
+        addTime = (time.perf_counter() - start) / numVectors
+        
+        start = time.perf_counter()
+        blocked = IncrementalOrthonormalBasis(size)
+        for first in range(0, numVectors, 16) :
+            blocked.extend(stream[:, first:first + 16])
+        extendTime = (time.perf_counter() - start) / numVectors
+        
+        sameBasis = np.allclose(incremental.basis[:, :round(rebuiltDimension)],
+                                rebuilt[:, np.linalg.norm(rebuilt, axis=0) > 0.5], atol=1e-8)
+        print('vectors of length %d, %d inserts, dimension %d (rebuild %d, extend %d)'
+              % (size, numVectors, incremental.dimension, round(rebuiltDimension), blocked.dimension))
+        print('  %-22s %10.1f us/insert (first %d inserts)' % ('gsBasis rebuild', 1e6 * rebuildTime, rebuildCount))
+        print('  %-22s %10.1f us/insert  speed up %6.1fx  same basis %s'
+              % ('add', 1e6 * addTime, rebuildTime / addTime, sameBasis))
+        print('  %-22s %10.1f us/insert  speed up %6.1fx'
+              % ('extend (16 columns)', 1e6 * extendTime, rebuildTime / extendTime))
+        print('  max |Q^T Q - I| add %.2e extend %.2e, reorthogonalisations %d'
+              % (orthogonalityError([incremental.basis]), orthogonalityError([blocked.basis]),
+                 incremental.reorthogonalisations))
+    return
+
+
+def benchRank(size=100000, numVectors=500) :
+    # Rank, basis and condition estimate of tall matrices (size x numVectors) by column
+    # pivoted QR (deterministic and randomized) vs SVD.
+    rng = np.random.default_rng(13)
+    GrahmSchmidtAlgo = GrahmSchmidtOrthonormal()
+    eps = np.finfo(np.float64).eps
+    cases = [
+        # columns scaled from 1e-4 to 1e4, full rank.
+        ('full rank, scaled columns', lambda : rng.standard_normal((size, numVectors))
+                                                * np.logspace(-4, 4, numVectors)),
+        # 50 independent directions, every column mix of them, scaled by 1e-20.
+        ('rank 50, scaled by 1e-20', lambda : 1e-20 * (rng.standard_normal((size, 50))
+                                                       @ rng.standard_normal((50, numVectors)))),
+    ]
+    for name, makeMatrix in cases :
+        matrix = makeMatrix()
+        print('%s, %d x %d' % (name, size, numVectors))
+        start = time.perf_counter()
+        left, singular, _ = np.linalg.svd(matrix, full_matrices=False)
+        svdTime = time.perf_counter() - start
+        svdRank = int(np.sum(singular > max(matrix.shape) * eps * singular[0]))
+        svdCondition = singular[0] / singular[svdRank - 1]
+        del left
+        print('  %-16s %8.2f s  rank %4d  condition %.2e' % ('svd', svdTime, svdRank, svdCondition))
+        for method, randomized in [('pivoted qr', False), ('randomized', True)] :
+            start = time.perf_counter()
+            result = GrahmSchmidtAlgo.gsBasisRankRevealing(matrix, randomized=randomized, seed=1)
+            methodTime = time.perf_counter() - start
+            basis = result.basis
+            # relative distance of columns of matrix from span of basis.
+            residual = np.abs(matrix - basis @ (basis.T @ matrix)).max() / np.abs(matrix).max()
+            print('  %-16s %8.2f s  rank %4d  condition estimate %.2e  speed up %5.1fx'
+                  '  |Q^T Q - I| %.1e  residual %.1e'
+                  % (method, methodTime, result.rank, result.conditionEstimate, svdTime / methodTime,
+                     orthogonalityError([basis]), residual))
+            del basis, result
+        # gsBasis with fixed threshold 1e-14 on first 2000 rows and 100 columns.
+        print('  %-16s rank %4.0f (svd %d) on 2000 x 100 part'
+              % ('gsBasis', GrahmSchmidtAlgo.gsBasis(matrix[:2000, :100])[1],
+                 np.linalg.matrix_rank(matrix[:2000, :100])))
+        del matrix
+    return
+
+
+def benchOutOfCore(size=2000000, numVectors=64, blockRows=100000) :
+    # Time and peak RAM (tracemalloc, numpy arrays are traced) of out-of-core TSQR of
+    # size x numVectors .npy file vs numpy.linalg.qr of matrix loaded into RAM.
+    rng = np.random.default_rng(17)
+    GrahmSchmidtAlgo = GrahmSchmidtOrthonormal()
+    workDir = tempfile.mkdtemp(prefix='matrixbench')
+    inputPath = os.path.join(workDir, 'input.npy')
+    outputPath = os.path.join(workDir, 'q.npy')
+    try :
+        matrix = np.lib.format.open_memmap(inputPath, mode='w+', dtype=np.float64, shape=(size, numVectors))
+        for start in range(0, size, blockRows) :
+            stop = min(start + blockRows, size)
+            matrix[start:stop] = rng.standard_normal((stop - start, numVectors))
+        matrix.flush()
+        del matrix
+        print('%d x %d matrix, %.0f MB on disk, row blocks of %d rows (%.0f MB)'
+              % (size, numVectors, 8.0 * size * numVectors / 2**20, blockRows,
+                 8.0 * blockRows * numVectors / 2**20))
+        
+        tracemalloc.start()
+        start = time.perf_counter()
+        orthoNormalMatrix, upper = GrahmSchmidtAlgo.gsBasisOutOfCore(inputPath, outputPath, blockRows)
+        outOfCoreTime = time.perf_counter() - start
+        outOfCorePeak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        
+        # check Q^T Q = I and Q R = A block by block.
+        matrix = np.load(inputPath, mmap_mode='r')
+        gram = np.zeros((numVectors, numVectors))
+        residual = 0.0
+        for start in range(0, size, blockRows) :
+            block = np.asarray(orthoNormalMatrix[start:start + blockRows])
+            gram += block.T @ block
+            residual = max(residual, np.abs(block @ upper - matrix[start:start + blockRows]).max())
+        print('  %-14s %8.2f s  peak RAM %8.1f MB  |Q^T Q - I| %.1e  |QR - A| %.1e'
+              % ('out of core', outOfCoreTime, outOfCorePeak / 2**20,
+                 np.abs(gram - np.eye(numVectors)).max(), residual))
+        del orthoNormalMatrix, matrix, block
+        
+        tracemalloc.start()
+        start = time.perf_counter()
+        inMemory, inMemoryUpper = np.linalg.qr(np.load(inputPath))
+        inMemoryTime = time.perf_counter() - start
+        inMemoryPeak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print('  %-14s %8.2f s  peak RAM %8.1f MB  |R - R numpy| %.1e'
+              % ('numpy qr', inMemoryTime, inMemoryPeak / 2**20,
+                 np.abs(np.abs(inMemoryUpper) - np.abs(upper)).max()))
+        del inMemory
+    finally :
+        for name in os.listdir(workDir) :
+            os.remove(os.path.join(workDir, name))
+        os.rmdir(workDir)
+    return
+
+
+def singularStack(numMatrices, size, seed=19) :
+    # Random matrices, every 3rd has a row which is combination of two other rows,
+    # every 7th is scaled by 1e-30 and every 11th is zero.
+    rng = np.random.default_rng(seed)
+    stack = rng.standard_normal((numMatrices, size, size))
+    if size > 1 :
+        stack[::3, -1] = stack[::3, 0] + 0.3 * stack[::3, 1]
+    stack[1::7] *= 1e-30
+    stack[2::11] = 0.0
+    return stack
+
+
+def benchSingular(size=100000) :
+    # Matrices/sec of looping isSingular vs isSingularBatch, answers compared with
+    # numpy.linalg.matrix_rank (SVD, tolerance n * epsilon * largest singular value).
+    specMat = SpecialMatrix()
+    for matrixSize in [4, 16] :
+        stack = singularStack(size, matrixSize)
+        expected = np.linalg.matrix_rank(stack) < matrixSize
+        start = time.perf_counter()
+        looped = np.array([specMat.isSingular(matrix) for matrix in stack])
+        loopTime = time.perf_counter() - start
+        start = time.perf_counter()
+        batched = specMat.isSingularBatch(stack)
+        batchTime = time.perf_counter() - start
+        print('%d matrices %d x %d, %d singular' % (size, matrixSize, matrixSize, expected.sum()))
+        print('  %-16s %10.0f matrices/sec  differences with matrix_rank %d'
+              % ('isSingular loop', size / loopTime, np.sum(looped != expected)))
+        print('  %-16s %10.0f matrices/sec  differences with matrix_rank %d  speed up %6.1fx'
+              % ('isSingularBatch', size / batchTime, np.sum(batched != expected), loopTime / batchTime))
+    return
+
+
+def benchClassify(size=2000, matrixSize=64) :
+    # isSingular followed by np.linalg.cond, det, inv and solve (each factors matrix again)
+    # vs classify (one factorization) followed by det, inverse and solve of its factorization.
+    rng = np.random.default_rng(23)
+    specMat = SpecialMatrix()
+    stack = singularStack(size, matrixSize)
+    rhs = rng.standard_normal(matrixSize)
+    
+    start = time.perf_counter()
+    for matrix in stack :
+        if not specMat.isSingular(matrix) :
+            condition = np.linalg.cond(matrix, 1)
+            determinant = np.linalg.det(matrix)
+            inverse = np.linalg.inv(matrix)
+            solution = np.linalg.solve(matrix, rhs)
+    separateTime = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    numFactorizations = 0
+    for matrix in stack :
+        report = specMat.classify(matrix, spectral=False)
+        if not report.singular :
+            condition = report.conditionEstimate
+            determinant = report.factorization.determinant()
+            inverse = report.factorization.inverse()
+            solution = report.factorization.solve(rhs)
+        numFactorizations += report.factorization.numFactorizations
+    classifyTime = time.perf_counter() - start
+    
+    print('%d matrices %d x %d: singular check, condition, det, inv, solve' % (size, matrixSize, matrixSize))
+    print('  %-26s %10.0f matrices/sec  factorizations per matrix up to 5'
+          % ('isSingular + numpy', size / separateTime))
+    print('  %-26s %10.0f matrices/sec  factorizations per matrix %.0f  speed up %5.1fx'
+          % ('classify + factorization', size / classifyTime, numFactorizations / size, separateTime / classifyTime))
+    return
+
+
+def benchCondition(size=2000) :
+    # Condition estimate of isSingular elimination (Hager / Higham) vs np.linalg.cond (SVD)
+    # and exact 1-norm condition number (np.linalg.cond(A, 1), computes inverse).
+    rng = np.random.default_rng(29)
+    specMat = SpecialMatrix()
+    for matrixSize in sorted({min(200, size), min(500, size), size}) :
+        matrix = rng.standard_normal((matrixSize, matrixSize))
+        start = time.perf_counter()
+        specMat.isSingular(matrix)
+        eliminationTime = time.perf_counter() - start
+        start = time.perf_counter()
+        estimate = specMat.conditionEstimate()
+        estimateTime = time.perf_counter() - start
+        start = time.perf_counter()
+        svdCondition = np.linalg.cond(matrix)
+        svdTime = time.perf_counter() - start
+        exact = np.linalg.cond(matrix, 1)
+        print('%d x %d: elimination %.3f s + estimate %.4f s, SVD %.3f s (speed up %.1fx)'
+              % (matrixSize, matrixSize, eliminationTime, estimateTime, svdTime,
+                 svdTime / (eliminationTime + estimateTime)))
+        print('  1-norm condition estimate %.3e  exact %.3e  (2-norm %.3e)' % (estimate, exact, svdCondition))
+    
+    # screening, singular values from 1 to 10^-k.
+    numMatrices, matrixSize = 200, 100
+    ratios = []
+    differences = 0
+    numSingular = 0
+    for _ in range(numMatrices) :
+        left, _ = np.linalg.qr(rng.standard_normal((matrixSize, matrixSize)))
+        right, _ = np.linalg.qr(rng.standard_normal((matrixSize, matrixSize)))
+        matrix = (left * np.logspace(0, -rng.uniform(0, 12), matrixSize)) @ right
+        exact = np.linalg.cond(matrix, 1)
+        estimate = specMat.conditionEstimate(matrix)
+        if np.isinf(estimate) :
+            # pivot below tolerance of isSingular.
+            numSingular += 1
+        else :
+            ratios.append(estimate / exact)
+        differences += specMat.isNearSingular(matrix) != (exact > specMat.conditionLimit)
+    print('%d matrices %d x %d with condition up to 1e12 (%d singular for isSingular):'
+          % (numMatrices, matrixSize, matrixSize, numSingular))
+    print('  estimate / exact min %.2f median %.2f max %.2f, near singular (limit %.1e) differs from'
+          ' exact for %d matrices' % (min(ratios), np.median(ratios), max(ratios),
+                                     specMat.conditionLimit, differences))
+    return
+
+
+def bandedSparse(size, rng) :
+    # Random sparse matrix with nonzeros on 5 diagonals.
+    offsets = [-3, -1, 0, 1, 4]
+    return sps.diags([rng.standard_normal(size - abs(offset)) for offset in offsets], offsets, format='csc')
+
+
+def gridLaplacian(gridSize, neumann) :
+    # 5 point Laplacian on gridSize x gridSize grid. With Neumann boundary every row sums
+    # to zero, so it is singular although no row or column is empty.
+    second = sps.diags([-np.ones(gridSize - 1), 2 * np.ones(gridSize), -np.ones(gridSize - 1)],
+                       [-1, 0, 1], format='lil')
+    if neumann :
+        second[0, 0] = second[-1, -1] = 1.0
+    identity = sps.identity(gridSize)
+    return (sps.kron(second, identity) + sps.kron(identity, second)).tocsc()
+
+
+def benchSparse(size=1000000) :
+    # Time and memory of isSingular and gsBasisRankRevealing on scipy.sparse matrices with
+    # about size rows, dense copies would not fit in memory.
+    rng = np.random.default_rng(31)
+    specMat = SpecialMatrix()
+    banded = bandedSparse(size, rng)
+    emptyColumn = banded.tolil()
+    emptyColumn[:, size // 2] = 0.0
+    duplicatedRow = banded.tolil()
+    duplicatedRow[size // 2] = duplicatedRow[size // 2 - 1]
+    gridSize = int(np.sqrt(size / 2))
+    cases = [('banded', banded, False),
+             ('banded, empty column', emptyColumn.tocsc(), True),
+             ('banded, row repeated', duplicatedRow.tocsc(), True),
+             ('grid Laplacian, Dirichlet', gridLaplacian(gridSize, False), False),
+             ('grid Laplacian, Neumann', gridLaplacian(gridSize, True), True)]
+    del emptyColumn, duplicatedRow
+    print('isSingular on sparse n x n matrices')
+    for name, matrix, expected in cases :
+        start = time.perf_counter()
+        singular = specMat.isSingular(matrix)
+        seconds = time.perf_counter() - start
+        factorization = specMat.sparseFactorization
+        if factorization is not None :
+            factorNonzeros = factorization.L.nnz + factorization.U.nnz
+        else :
+            factorNonzeros = 0
+        print('  %-26s n %8d nnz %8d  singular %-5s (expected %-5s) %7.2f s  LU nnz %10d (%6.0f MB)'
+              '  dense %8.0f GB' % (name, matrix.shape[0], matrix.nnz, singular, expected, seconds,
+                                   factorNonzeros, 12.0 * factorNonzeros / 2**20,
+                                   8.0 * matrix.shape[0] ** 2 / 2**30))
+    del cases, banded
+    
+    # tall sparse matrix, 100 columns, 10 of them combinations of others and 5 empty.
+    numVectors = 100
+    tall = sps.random(size, numVectors, density=0.005, random_state=37, format='lil')
+    for column in range(85, 95) :
+        tall[:, column] = tall[:, column - 85] - 2.0 * tall[:, column - 84]
+    for column in range(95, 100) :
+        tall[:, column] = 0.0
+    tall = tall.tocsc()
+    GrahmSchmidtAlgo = GrahmSchmidtOrthonormal()
+    start = time.perf_counter()
+    result = GrahmSchmidtAlgo.gsBasisRankRevealing(tall, seed=1)
+    sparseTime = time.perf_counter() - start
+    print('gsBasisRankRevealing on sparse %d x %d (nnz %d): rank %d (expected 85) %.2f s,'
+          ' |Q^T Q - I| %.1e, basis %.0f MB, dense input would be %.0f MB'
+          % (size, numVectors, tall.nnz, result.rank, sparseTime, orthogonalityError([result.basis]),
+             result.basis.nbytes / 2**20, 8.0 * size * numVectors / 2**20))
+    del tall, result
+    
+    # square sparse matrices have large structural rank, rank comes from sparse LU of
+    # matched submatrix without dense basis. Rank deficient one needs dense sketch, it is
+    # refused when sketch does not fit in sparseDenseBytes.
+    neumann = gridLaplacian(gridSize, True)
+    squares = [('identity', sps.identity(size, format='csc'), size),
+               ('banded', bandedSparse(size, rng), size),
+               ('grid Laplacian, Neumann', neumann, neumann.shape[0] - 1)]
+    for name, matrix, expected in squares :
+        start = time.perf_counter()
+        try :
+            result = GrahmSchmidtAlgo.gsBasisRankRevealing(matrix)
+            outcome = 'rank %d (expected %d) condition estimate %.1e' % (result.rank, expected,
+                                                                        result.conditionEstimate)
+        except ValueError as error :
+            outcome = 'refused: %s' % error
+        print('gsBasisRankRevealing on sparse %-24s n %8d nnz %8d  %7.2f s  %s'
+              % (name, matrix.shape[0], matrix.nnz, time.perf_counter() - start, outcome))
+    print('peak resident memory of process %.0f MB' % (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0))
+    return
+
+
+def benchScreen(size=1000000, matrixSize=4) :
+    # Throughput of MatrixScreener for chunk sizes and thread counts vs serial isSingular loop.
+    stack = singularStack(size, matrixSize)
+    specMat = SpecialMatrix()
+    expected = specMat.isSingularBatch(stack)
+    loopCount = min(size, 50000)
+    start = time.perf_counter()
+    for matrix in stack[:loopCount] :
+        specMat.isSingular(matrix)
+    loopRate = loopCount / (time.perf_counter() - start)
+    print('%d matrices %d x %d, %d cpus' % (size, matrixSize, matrixSize, os.cpu_count() or 1))
+    print('  %-30s %10.0f matrices/sec' % ('isSingular loop', loopRate))
+    for numThreads in sorted({1, os.cpu_count() or 1}) :
+        for chunkSize in [256, 1024, 4096, 16384] :
+            screener = MatrixScreener(chunkSize, numThreads)
+            singular = np.concatenate(list(screener.screen(stack)))
+            stats = screener.stats()
+            print('  %2d threads chunk %6d %10.0f matrices/sec  speed up %6.1fx  chunk p50 %7.2f ms'
+                  '  p99 %7.2f ms  same %s'
+                  % (numThreads, chunkSize, stats['matricesPerSecond'], stats['matricesPerSecond'] / loopRate,
+                     1e3 * stats['p50ChunkSeconds'], 1e3 * stats['p99ChunkSeconds'],
+                     np.array_equal(singular, expected)))
+    # matrices one by one from a generator, like from a queue.
+    screener = MatrixScreener(4096)
+    singular = np.concatenate(list(screener.screen(iter(stack))))
+    print('  %-30s %10.0f matrices/sec  same %s'
+          % ('one by one from generator', screener.stats()['matricesPerSecond'],
+             np.array_equal(singular, expected)))
+    return
+
+
+BENCHMARKS = {
+    'classify' : benchClassify,
+    'condition' : benchCondition,
+    'gsbatch' : benchGsBatch,
+    'incremental' : benchIncremental,
+    'outofcore' : benchOutOfCore,
+    'rank' : benchRank,
+    'screen' : benchScreen,
+    'singular' : benchSingular,
+    'sparse' : benchSparse,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='matrix utilities benchmarks')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS) + ['all'])
+    parser.add_argument('--size', type=int, default=None,
+                        help='problem size, meaning and default depend on benchmark')
+    args = parser.parse_args()
+    names = sorted(BENCHMARKS) if args.benchmark == 'all' else [args.benchmark]
+    for name in names :
+        print('==== %s ====' % name)
+        if args.size :
+            BENCHMARKS[name](args.size)
+        else :
+            BENCHMARKS[name]()